@@ -1,43 +1,46 @@
+import asyncio
+import itertools
+
 import psutil
-import pynvml
-import wmi
-import time
+
+from rendimiento.almacenamiento import CapacityPoller, DiskIoCollector
+from rendimiento.asincrono import AsyncCollectionCore
+from rendimiento.cpu import CpuSampler
+from rendimiento.exportador import MetricsExporter
+from rendimiento.motor import Collector
+from rendimiento.red import NetworkRateCollector
+from rendimiento.sensores import default_provider
+from rendimiento.sesiones import NvmlSession, WmiSession
+
+# Sesiones de WMI y NVML compartidas por los colectores
+wmi_session = WmiSession()
+nvml_session = NvmlSession()
+cpu_sampler = CpuSampler()
+sensor_provider = default_provider(wmi_session)
 
 def get_cpu_usage():
-    cpu_usage = psutil.cpu_percent(interval=1)
+    cpu_usage = cpu_sampler.sample().total
     return cpu_usage
 
 def get_cpu_temperature():
-    w = wmi.WMI(namespace="root/OpenHardwareMonitor")
-    temperature_infos = w.Sensor()
-    for sensor in temperature_infos:
-        if sensor.SensorType == 'Temperature' and sensor.Name == 'CPU Package':
-            return sensor.Value
-    return None
+    return sensor_provider.cpu_temperature()
 
 def get_cpu_model():
-    w = wmi.WMI(namespace="root/CIMV2")
-    processors = w.Win32_Processor()
+    processors = wmi_session.query('Win32_Processor')
     cpu_model = processors[0].Name
     return cpu_model
 
 def get_gpu_usage():
-    pynvml.nvmlInit()
-    handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-    gpu_info = pynvml.nvmlDeviceGetUtilizationRates(handle)
+    gpu_info = nvml_session.call('nvmlDeviceGetUtilizationRates', 0)
     gpu_usage = gpu_info.gpu
     return gpu_usage
 
 def get_gpu_temperature():
-    pynvml.nvmlInit()
-    handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-    gpu_temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+    gpu_temp = nvml_session.call('nvmlDeviceGetTemperature', 0, nvml_session.nvml.NVML_TEMPERATURE_GPU)
     return gpu_temp
 
 def get_gpu_model():
-    pynvml.nvmlInit()
-    handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-    gpu_name = pynvml.nvmlDeviceGetName(handle)
+    gpu_name = nvml_session.call('nvmlDeviceGetName', 0)
     return gpu_name
 
 def get_memory_usage():
@@ -46,17 +49,21 @@ def get_memory_usage():
     memory_usage = ((memory - memory_free) / memory) * 100
     return memory_usage
 
+# Capacidad por montaje con timeout y E/S de disco por diferencia
+capacity_poller = CapacityPoller()
+disk_io = DiskIoCollector()
+
 def get_storage_usage():
-    partitions = psutil.disk_partitions()
-    storage_usage = []
-    for partition in partitions:
-        partition_usage = psutil.disk_usage(partition.mountpoint)
-        storage_usage.append((partition.device, partition_usage.used, partition_usage.free, partition_usage.percent))
-    return storage_usage
+    return capacity_poller.poll()
+
+def get_disk_io():
+    return disk_io.sample().total
+
+network_rates = NetworkRateCollector()
 
 def get_network_usage():
-    network = psutil.net_io_counters()
-    network_usage = network.bytes_sent + network.bytes_recv
+    # Bytes/s enviados y recibidos desde la lectura anterior
+    network_usage = network_rates.sample().total
     return network_usage
 
 # Tiempo total de ejecución en segundos
@@ -64,36 +71,80 @@ tiempo_total = 60
 # Intervalo de tiempo entre cada lectura en segundos
 intervalo = 20
 
-# Ciclo de ejecución
-num_lecturas = tiempo_total // intervalo
-for i in range(num_lecturas):
+# Cada dato se muestrea con su propio periodo en el núcleo de asyncio; el
+# modelo de CPU y de GPU sólo se consultan una vez y el almacenamiento, que
+# cambia poco, cada minuto
+core = AsyncCollectionCore([
+    Collector('cpu_usage', get_cpu_usage, period=intervalo, cost=0.0001),
+    Collector('cpu_temperature', get_cpu_temperature, period=intervalo),
+    Collector('cpu_model', get_cpu_model, period=None),
+    Collector('gpu_usage', get_gpu_usage, period=intervalo),
+    Collector('gpu_temperature', get_gpu_temperature, period=intervalo),
+    Collector('gpu_model', get_gpu_model, period=None),
+    Collector('memory_usage', get_memory_usage, period=intervalo, cost=0.0001),
+    Collector('storage_usage', get_storage_usage, period=60),
+    Collector('network_usage', get_network_usage, period=intervalo, cost=0.0001),
+    Collector('disk_io', get_disk_io, period=intervalo, cost=0.0001),
+])
+
+def redondear(value, digits):
+    return None if value is None else round(value, digits)
+
+rondas = itertools.count(1)
+
+def mostrar_lectura(snapshot):
     # Obtener y mostrar los datos
-    cpu_usage = get_cpu_usage()
-    cpu_temperature = get_cpu_temperature()
-    cpu_model = get_cpu_model()
-    gpu_usage = get_gpu_usage()
-    gpu_temperature = get_gpu_temperature()
-    gpu_model = get_gpu_model()
-    memory_usage = get_memory_usage()
-    storage_usage = get_storage_usage()
-    network_usage = get_network_usage()
-
-    print("Ronda de lectura", i+1)
-    print("Uso de CPU:", round(cpu_usage, 1), "%")
-    print("Temperatura del CPU:", round(cpu_temperature, 1), "°C")
+    cpu_usage = snapshot.value('cpu_usage')
+    cpu_temperature = snapshot.value('cpu_temperature')
+    cpu_model = snapshot.value('cpu_model')
+    gpu_usage = snapshot.value('gpu_usage')
+    gpu_temperature = snapshot.value('gpu_temperature')
+    gpu_model = snapshot.value('gpu_model')
+    memory_usage = snapshot.value('memory_usage')
+    storage_usage = snapshot.value('storage_usage', [])
+    network_usage = snapshot.value('network_usage')
+    disk_io_usage = snapshot.value('disk_io')
+
+    print("Ronda de lectura", next(rondas))
+    print("Uso de CPU:", redondear(cpu_usage, 1), "%")
+    print("Temperatura del CPU:", redondear(cpu_temperature, 1), "°C")
     print("Modelo del CPU:", cpu_model)
-    print("Uso de GPU:", round(gpu_usage, 1), "%")
-    print("Temperatura de GPU:", round(gpu_temperature, 1), "°C")
+    print("Uso de GPU:", redondear(gpu_usage, 1), "%")
+    print("Temperatura de GPU:", redondear(gpu_temperature, 1), "°C")
     print("Modelo de GPU:", gpu_model)
-    print("Uso de memoria RAM:", round(memory_usage, 2), "%")
+    print("Uso de memoria RAM:", redondear(memory_usage, 2), "%")
     print("Uso de almacenamiento:")
     for partition in storage_usage:
-        print("Partición:", partition[0])
-        print("Espacio usado:", round(partition[1] / (1024**3), 2), "GB")
-        print("Espacio libre:", round(partition[2] / (1024**3), 2), "GB")
-        print("Porcentaje de uso:", round(partition[3], 2), "%")
-    print("Uso de red:", round(network_usage / (1024**2), 2), "MB")
+        print("Partición:", partition.device, "en", partition.mountpoint)
+        if partition.total is None:
+            print("Sin respuesta")
+            continue
+        print("Espacio usado:", round(partition.used / (1024**3), 2), "GB")
+        print("Espacio libre:", round(partition.free / (1024**3), 2), "GB")
+        print("Porcentaje de uso:", round(partition.percent, 2), "%", "(sin actualizar)" if partition.stale else "")
+    if disk_io_usage is not None:
+        print("Disco leído:", round(disk_io_usage.read_mb_s, 2), "MB/s", round(disk_io_usage.read_iops), "IOPS")
+        print("Disco escrito:", round(disk_io_usage.write_mb_s, 2), "MB/s", round(disk_io_usage.write_iops), "IOPS")
+        print("Latencia de disco:", round(disk_io_usage.await_ms, 2), "ms")
+    if network_usage is not None:
+        print("Red recibida:", round(network_usage.bytes_recv / 1024, 2), "KB/s")
+        print("Red enviada:", round(network_usage.bytes_sent / 1024, 2), "KB/s")
     print("--------------------------------------")
 
-    # Esperar el intervalo de tiempo antes de la próxima lectura
-    time.sleep(intervalo)
+# Ciclo de ejecución: una lectura cada intervalo con horario fijo, la primera
+# en cuanto llegan los datos
+core.add_consumer(mostrar_lectura, intervalo, delay=1)
+
+# Exportador para Prometheus en http://127.0.0.1:9101/metrics (host='0.0.0.0'
+# para que lo lean otras máquinas); sirve la última instantánea ya renderizada
+exporter = MetricsExporter(core.publisher, port=9101)
+exporter.start()
+
+asyncio.run(core.run(duration=tiempo_total))
+
+exporter.stop()
+
+capacity_poller.close()
+sensor_provider.close()
+nvml_session.close()
+wmi_session.close()
@@ -1,262 +1,465 @@
-import psutil
-import pynvml
-import wmi
+import argparse
+import os
 import time
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 from tkinter import *
 
-cpu_usage_history = []
-memory_usage_history = []
-gpu_usage_history = []
-cpu_temperature_history = []
-gpu_temperature_history = []
-
-# Inicializar pynvml
-pynvml.nvmlInit()
+from rendimiento.almacenamiento import CapacityPoller, DiskIoCollector, disk_name, windows_disk_map
+from rendimiento.base_datos import SqliteSink
+from rendimiento.colectores import Backends
+from rendimiento.cpu import CpuSampler
+from rendimiento.gpu_procesos import GpuProcessAccounting
+from rendimiento.graficos import MetricChart
+from rendimiento.grupos import ProcessGroups
+from rendimiento.historial import MetricHistory
+from rendimiento.instrumentacion import Instrumentation, RunProfiler, SelfMonitor, format_summary
+from rendimiento.inventario import InventoryCache, probe
+from rendimiento.motor import CollectionEngine, Collector
+from rendimiento.planificador import TkScheduler
+from rendimiento.procesos import ProcessRegistry
+from rendimiento.ranking import rank_processes, top_processes
+from rendimiento.red import NetworkRateCollector
+from rendimiento.rollup import MultiResolutionHistory
+from rendimiento.sensores import default_provider
+from rendimiento.series import TimeSeriesStore, default_store_path, process_columns
+from rendimiento.sesiones import NvmlSession, WmiSession
+from rendimiento.traza import TraceRecorder, TraceReplayer
+
+# python BuenoBueno9_1_8_ConTiempoFuncionesyGraficos.py --profile perfil.pstats
+# guarda un perfil de cProfile de toda la ejecución (interfaz y colectores)
+# --record sesion.rtr graba lo que respondieron psutil, WMI, NVML y los
+# sensores; --replay sesion.rtr vuelve a mostrar esa sesión (en cualquier
+# máquina, sin WMI ni GPU) al ritmo original
+parser = argparse.ArgumentParser()
+parser.add_argument('--profile', default=None, metavar='ARCHIVO')
+parser.add_argument('--record', default=None, metavar='TRAZA')
+parser.add_argument('--replay', default=None, metavar='TRAZA')
+args, _ = parser.parse_known_args()
+profiler = RunProfiler() if args.profile else None
+if profiler is not None:
+    profiler.enable_thread()
+
+NUM_PROCESSES = 5
+
+# Fuentes de datos de todos los colectores: el sistema, o una traza. La traza
+# lleva en meta lo que `python -m rendimiento replay` necesita para armar sus
+# colectores equivalentes
+TRACE_META = {'source': 'gui', 'interval': 1, 'processes': NUM_PROCESSES, 'process_detail': 'adaptive',
+              'group_by': 'tree', 'group_patterns': [],
+              'collectors': ['cpu', 'cpu_temperature', 'gpu', 'gpu_temperature', 'memory', 'network',
+                             'top_processes', 'disk_io', 'storage', 'inventory']}
+recorder = replayer = None
+if args.replay:
+    replayer = TraceReplayer(args.replay)
+    backends = replayer.backends()
+elif args.record:
+    recorder = TraceRecorder(args.record, meta=TRACE_META)
+    backends = recorder.backends()
+else:
+    backends = Backends()
+
+# Tramos medidos (colectores y etapas de la interfaz) con p50/p95/p99, y el
+# CPU y la memoria del propio monitor
+instrumentation = Instrumentation()
+self_monitor = SelfMonitor()
+
+# Historial de las gráficas: buffer circular con capacidad fija
+HISTORY_DEPTH = 50
+history = MetricHistory(('cpu', 'memory', 'gpu', 'cpu_temperature', 'gpu_temperature', 'net_recv', 'net_sent'),
+                        capacity=HISTORY_DEPTH)
+# Historial largo (horas o días) resumido en intervalos de 1 s, 10 s, 1 min y 1 h
+rollups = MultiResolutionHistory(history.metrics)
+# Ventanas que se pueden graficar: la corta sale del historial en memoria y
+# las largas del resumido, con el nivel más fino que cubre la ventana
+CHART_WINDOWS = {f'Last {HISTORY_DEPTH} s': None, 'Last 10 min': 600, 'Last hour': 3600,
+                 'Last day': 86400, 'Last week': 7 * 86400}
+
+# Sesiones de WMI y NVML: una conexión y un nvmlInit para todo el programa
+wmi_session = WmiSession(backends.wmi, clock=backends.clock)
+nvml_session = NvmlSession(backends.nvml, clock=backends.clock)
+
+# Sensores de la plataforma (hwmon en Linux, OpenHardwareMonitor en Windows):
+# las rutas o los identificadores se resuelven una vez al arrancar
+sensor_provider = backends.wrap('sensors', lambda: default_provider(wmi_session))
+
+# Uso de GPU por proceso: unas pocas llamadas a NVML por tick, indexadas por PID
+gpu_accounting = GpuProcessAccounting(nvml_session)
+
+# Tabla de procesos persistente entre ticks; E/S, hilos y descriptores sólo
+# para los candidatos al top dentro de un presupuesto de CPU por tick
+process_registry = ProcessRegistry(pids=backends.psutil.pids, process_factory=backends.psutil.Process,
+                                   virtual_memory=backends.psutil.virtual_memory, detail='adaptive',
+                                   detail_k=NUM_PROCESSES, clock=backends.clock, cpu_clock=backends.cpu_clock)
+# Aplicaciones: cada proceso con el ancestro más alto del mismo nombre (el
+# navegador con sus hijos, el pool de trabajadores con su maestro)
+process_groups = ProcessGroups(process_registry, mode='tree')
+
+# Muestreador de CPU sin bloqueo: calcula el uso entre un tick y el siguiente
+cpu_sampler = CpuSampler(backends.psutil.cpu_times)
+
+# Inventario de hardware: se consulta una vez (o se lee de la caché en disco)
+# y después se sirve desde memoria
+inventory = backends.wrap('inventory', lambda: InventoryCache(probe=lambda: probe(wmi_session, nvml_session)))
 
 def get_cpu_usage():
-    cpu_usage = psutil.cpu_percent(interval=1)
+    cpu_usage = cpu_sampler.sample().total
     return cpu_usage
 
 def get_cpu_temperature():
-    w = wmi.WMI(namespace="root/OpenHardwareMonitor")
-    temperature_infos = w.Sensor()
-    for sensor in temperature_infos:
-        if sensor.SensorType == 'Temperature' and sensor.Name == 'CPU Package':
-            return sensor.Value
-    return None
-
-def get_cpu_model():
-    w = wmi.WMI(namespace="root/CIMV2")
-    processors = w.Win32_Processor()
-    cpu_model = processors[0].Name
-    return cpu_model
+    return sensor_provider.cpu_temperature()
 
 def get_gpu_usage():
-    handle = pynvml.nvmlDeviceGetHandleByIndex(0)  # 0 para la GPU 0
-    mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
+    mem_info = nvml_session.call('nvmlDeviceGetMemoryInfo', 0)  # 0 para la GPU 0
     return round(mem_info.used / mem_info.total * 100, 1)
 
 def get_gpu_temperature():
-    pynvml.nvmlInit()
-    handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-    gpu_temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+    gpu_temp = nvml_session.call('nvmlDeviceGetTemperature', 0, nvml_session.nvml.NVML_TEMPERATURE_GPU)
     return gpu_temp
 
-def get_gpu_model():
-    pynvml.nvmlInit()
-    handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-    gpu_name = pynvml.nvmlDeviceGetName(handle)
-    return gpu_name
-
 def get_memory_usage():
-    memory = psutil.virtual_memory().total
-    memory_free = psutil.virtual_memory().available
+    memory = backends.psutil.virtual_memory().total
+    memory_free = backends.psutil.virtual_memory().available
     memory_usage = ((memory - memory_free) / memory) * 100
     return round(memory_usage, 1)
 
-def get_total_ram():
-    w = wmi.WMI()
-    ram_modules = w.Win32_PhysicalMemory()
-    total_ram = sum((int(module.Capacity) for module in ram_modules))/1024**3
-    return total_ram
-
-def get_ram_speed():
-    w = wmi.WMI()
-    ram_modules = w.Win32_PhysicalMemory()
-    ram_speeds = [int(module.Speed) for module in ram_modules]
-    if len(ram_speeds) > 0:
-        return max(ram_speeds)
-    return None
+# Capacidad de cada montaje (lenta, con timeout por montaje) y tasas de E/S de
+# disco (rápidas, por diferencia entre lecturas)
+capacity_poller = CapacityPoller(backends.psutil.disk_partitions, backends.psutil.disk_usage, timeout=2.0)
+disk_io = DiskIoCollector(backends.psutil.disk_io_counters, clock=backends.clock)
+# En Windows disk_io_counters es por disco físico: cada unidad (C:) se asocia
+# a su disco por WMI una sola vez
+disk_map = windows_disk_map(wmi_session) if os.name == 'nt' else None
 
 def get_storage_usage():
-    partitions = psutil.disk_partitions()
     storage_usage = []
-    for partition in partitions:
-        partition_usage = psutil.disk_usage(partition.mountpoint)
-        used_gb = partition_usage.used / (1024**3)  # Convertir a GB
-        free_gb = partition_usage.free / (1024**3)  # Convertir a GB
-        storage_usage.append((partition.device, used_gb, free_gb, partition_usage.percent))
+    for mount in capacity_poller.poll():
+        if mount.total is None:
+            storage_usage.append((mount.device, mount.mountpoint, None, None, None))
+            continue
+        used_gb = mount.used / (1024**3)  # Convertir a GB
+        free_gb = mount.free / (1024**3)  # Convertir a GB
+        storage_usage.append((mount.device, mount.mountpoint, used_gb, free_gb, mount.percent))
     return storage_usage
 
+def get_disk_io():
+    return disk_io.sample()
+
+# Tasas de red por interfaz calculadas contra la lectura anterior
+network_rates = NetworkRateCollector(backends.psutil.net_io_counters, clock=backends.clock)
+
 def get_network_usage():
-    network = psutil.net_io_counters()
-    network_usage = network.bytes_sent + network.bytes_recv
+    # Bytes/s enviados y recibidos sumando todas las interfaces
+    network_usage = network_rates.sample().total
     return network_usage
 
 def get_top_processes_by_resource_usage(num_processes):
+    with instrumentation.span('top_processes.nvml'):
+        gpu_usage_by_pid = gpu_accounting.collect()  # Una sola consulta por tick
+    # Un solo recorrido de los procesos, quedándose con los K de más CPU
+    with instrumentation.span('top_processes.registry'):
+        rankings = top_processes(process_registry, num_processes, keys=('cpu',), gpu_usage_by_pid=gpu_usage_by_pid)
     processes = []
-    for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_percent']):
-        try:
-            pid = proc.pid
-            name = proc.info['name']
-            cpu_percent = round(proc.info['cpu_percent'], 1)
-            memory_percent = round(proc.info['memory_percent'], 1)
-            gpu_percent = get_gpu_usage()  # Obtener el uso de GPU del sistema
-            processes.append((pid, name, cpu_percent, memory_percent, gpu_percent))
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    processes.sort(key=lambda x: x[2], reverse=True)
-    return processes[:num_processes]
-
-def update_data(interval, num_processes):
-    cpu_usage = get_cpu_usage()
-    cpu_temperature = get_cpu_temperature()
-
-    gpu_usage = get_gpu_usage()
-    gpu_temperature = get_gpu_temperature()
-
-    memory_usage = get_memory_usage()
-    total_ram = get_total_ram()
-    ram_speed = get_ram_speed()
-
-    gpu_model = get_gpu_model()
-    cpu_model = get_cpu_model()
-    storage_usage = get_storage_usage()
-    network_usage = get_network_usage()
-
-    cpu_usage_history.append(cpu_usage)
-    memory_usage_history.append(memory_usage)
-    gpu_usage_history.append(gpu_usage)
-    cpu_temperature_history.append(cpu_temperature)
-    gpu_temperature_history.append(gpu_temperature)
-
-    cpu_label.config(text=f"CPU Usage: {cpu_usage:.1f}%")
-    cpu_temperature_label.config(text=f"CPU Temperature: {cpu_temperature}°C")
-    gpu_usage_label.config(text=f"GPU Usage: {gpu_usage:.1f}%")
-    gpu_temperature_label.config(text=f"GPU Temperature: {gpu_temperature}°C")
-    memory_label.config(text=f"Memory Usage: {memory_usage:.1f}%")
-    total_ram_label.config(text=f"Total RAM: {total_ram} GB")
-    ram_speed_label.config(text=f"RAM Speed: {ram_speed} MHz")
-    gpu_model_label.config(text=f"GPU Model: {gpu_model}")
-    cpu_model_label.config(text=f"CPU Model: {cpu_model}")
-    network_info_label.config(text=f"Network Usage: {network_usage} kbs")
-
-    process_info_label.config(text="Top Processes:")
-    top_processes = get_top_processes_by_resource_usage(num_processes)
-    for i, process in enumerate(top_processes):
-        pid, name, cpu_percent, memory_percent, gpu_percent = process
-        process_labels[i].config(text=f"{pid} - {name} - CPU: {cpu_percent:.1f}% - Memory: {memory_percent:.1f}% - GPU: {gpu_percent:.1f}%")
-
-    storage_info_label.config(text="Storage Usage:")
-    for i, storage in enumerate(storage_usage):
-        device, used_gb, free_gb, percent = storage
-        storage_labels[i].config(text=f"{device} - Used: {used_gb:.2f} GB - Free: {free_gb:.2f} GB - Usage: {percent}%")
-
-    if len(cpu_usage_history) > 50:
-        cpu_usage_history.pop(0)
-    if len(memory_usage_history) > 50:
-        memory_usage_history.pop(0)
-    if len(gpu_usage_history) > 50:
-        gpu_usage_history.pop(0)
-    if len(cpu_temperature_history) > 50:
-        cpu_temperature_history.pop(0)
-    if len(gpu_temperature_history) > 50:
-        gpu_temperature_history.pop(0)
-
-    # Actualizar gráfico
-    plt.clf()
-    plt.subplot(2, 1, 1)
-    plt.plot(cpu_usage_history, label='CPU')
-    plt.plot(memory_usage_history, label='Memory')
-    plt.plot(gpu_usage_history, label='GPU')
-    plt.xlabel('Time (s)')
-    plt.ylabel('Usage (%)')
-    plt.title('CPU, Memory, and GPU Usage Over Time')
-    plt.legend()
-    plt.grid()
-
-    plt.subplot(2, 1, 2)
-    plt.plot(cpu_temperature_history, label='CPU')
-    plt.plot(gpu_temperature_history, label='GPU')
-    plt.xlabel('Time (s)')
-    plt.ylabel('Temperature (°C)')
-    plt.title('CPU and GPU Temperature Over Time')
-    plt.legend()
-    plt.grid()
-
-    plt.tight_layout()
-    plt.pause(interval)
-
-    root.after(int(interval * 1000), update_data, interval, num_processes)
+    for proc in rankings['cpu']:
+        processes.append((proc.pid, proc.name, round(proc.cpu_percent, 1), round(proc.memory_percent, 1),
+                          proc.gpu_percent, proc.gpu_memory_mb, proc.read_rate + proc.write_rate,
+                          proc.num_threads, proc.num_fds))
+    # Las sumas por grupo se corrigen sólo con lo que cambió en este tick
+    with instrumentation.span('top_processes.groups'):
+        process_groups.update()
+    groups = []
+    for group in rank_processes(process_groups.groups(), num_processes, ('cpu',))['cpu']:
+        groups.append((group.name, group.count, round(group.cpu_percent, 1), round(group.memory_percent, 1),
+                       group.gpu_percent))
+    return processes, groups
+
+# Cada tick se guarda en disco (métricas del sistema y los procesos
+# principales) en un almacén por columnas que sólo agrega al final. Al
+# reproducir una traza no se guarda nada: esos datos no son de esta máquina
+# ni de esta hora
+store = None if replayer else TimeSeriesStore(default_store_path(), history.metrics + process_columns(NUM_PROCESSES))
+
+# Archivo opcional en SQLite (por ejemplo "metricas.sqlite"); None lo desactiva
+ARCHIVE_PATH = None
+archive = SqliteSink(ARCHIVE_PATH) if ARCHIVE_PATH and not replayer else None
+
+# Cada colector corre en el motor con su propio periodo (los baratos en el
+# loop de asyncio, los bloqueantes en su pool de hilos); la interfaz sólo lee
+# la última instantánea publicada. Al reproducir, cada colector toma sus
+# respuestas de la traza en orden, así los periodos del motor dan el ritmo
+engine = CollectionEngine(backends.collectors([
+    Collector('cpu', get_cpu_usage, period=1, cost=0.0001),
+    Collector('cpu_temperature', get_cpu_temperature, period=1),
+    Collector('gpu', get_gpu_usage, period=1),
+    Collector('gpu_temperature', get_gpu_temperature, period=1),
+    Collector('memory', get_memory_usage, period=1, cost=0.0001),
+    Collector('network', get_network_usage, period=1, cost=0.0001),
+    Collector('top_processes', lambda: get_top_processes_by_resource_usage(NUM_PROCESSES), period=2),
+    Collector('disk_io', get_disk_io, period=1, cost=0.0001),
+    Collector('storage', get_storage_usage, period=30),
+    Collector('inventory', inventory.get, period=None),
+    Collector('self', self_monitor.sample, period=1, cost=0.0001),
+]), instrumentation=instrumentation, thread_initializer=profiler.enable_thread if profiler else None)
+
+def stale_mark(snapshot, name):
+    return " (stale)" if snapshot.is_stale(name) and name in snapshot.readings else ""
+
+def set_rows(frame, labels, texts, font):
+    # Filas dinámicas: se crean las que falten y se ocultan las que sobren
+    while len(labels) < len(texts):
+        labels.append(Label(frame, font=font))
+    for label, text in zip(labels, texts):
+        label.config(text=text)
+        label.pack()
+    for label in labels[len(texts):]:
+        label.pack_forget()
+
+def storage_row(storage, disk_rates, total_rates):
+    device, mountpoint, used_gb, free_gb, percent = storage
+    if used_gb is None:
+        text = f"{device} ({mountpoint}) - not responding"
+    else:
+        text = f"{device} ({mountpoint}) - Used: {used_gb:.2f} GB - Free: {free_gb:.2f} GB - Usage: {percent}%"
+    name = disk_name(device, disk_map)
+    rates = disk_rates.get(name)
+    if rates is not None:
+        text += f" - R {rates.read_mb_s:.1f} / W {rates.write_mb_s:.1f} MB/s"
+        if disk_map:
+            text += f" ({name})"
+    elif disk_map is not None and total_rates is not None:
+        # Sin el mapa de WMI no se sabe de qué disco es la unidad: se muestra
+        # el total y se indica
+        text += f" - R {total_rates.read_mb_s:.1f} / W {total_rates.write_mb_s:.1f} MB/s (all disks)"
+    return text
+
+def update_data():
+    stage = time.perf_counter_ns()
+    snapshot = engine.latest()
+
+    cpu_usage = snapshot.value('cpu')
+    cpu_temperature = snapshot.value('cpu_temperature')
+    gpu_usage = snapshot.value('gpu')
+    gpu_temperature = snapshot.value('gpu_temperature')
+    memory_usage = snapshot.value('memory')
+    network_usage = snapshot.value('network')
+    hardware = snapshot.value('inventory')
+
+    sample = {
+        'cpu': cpu_usage,
+        'memory': memory_usage,
+        'gpu': gpu_usage,
+        'cpu_temperature': cpu_temperature,
+        'gpu_temperature': gpu_temperature,
+        'net_recv': network_usage.bytes_recv / 1024 if network_usage else None,
+        'net_sent': network_usage.bytes_sent / 1024 if network_usage else None,
+    }
+    history.append(sample)
+    rollups.append(sample)
+    stage = instrumentation.lap('ui.history', stage)
+
+    top, top_groups = snapshot.value('top_processes', ([], []))
+    if store is not None:
+        record = dict(sample)
+        for i, (pid, name, cpu_percent, memory_percent, gpu_percent, gpu_memory, *_) in enumerate(top):
+            record.update({f'proc{i}_pid': pid, f'proc{i}_cpu': cpu_percent, f'proc{i}_memory': memory_percent,
+                           f'proc{i}_gpu': gpu_percent, f'proc{i}_gpu_memory': gpu_memory})
+            store.set_label(pid, name)
+        store.append(record)
+    if archive is not None:
+        archive.append(record)
+    stage = instrumentation.lap('ui.store', stage)
+
+    cpu_label.config(text=f"CPU Usage: {cpu_usage or 0.0:.1f}%{stale_mark(snapshot, 'cpu')}")
+    cpu_temperature_label.config(text=f"CPU Temperature: {cpu_temperature}°C{stale_mark(snapshot, 'cpu_temperature')}")
+    gpu_usage_label.config(text=f"GPU Usage: {gpu_usage or 0.0:.1f}%{stale_mark(snapshot, 'gpu')}")
+    gpu_temperature_label.config(text=f"GPU Temperature: {gpu_temperature}°C{stale_mark(snapshot, 'gpu_temperature')}")
+    memory_label.config(text=f"Memory Usage: {memory_usage or 0.0:.1f}%{stale_mark(snapshot, 'memory')}")
+    if hardware is not None:
+        total_ram_label.config(text=f"Total RAM: {hardware.total_ram} GB")
+        ram_speed_label.config(text=f"RAM Speed: {hardware.ram_speed} MHz")
+        gpu_model_label.config(text=f"GPU Model: {hardware.gpu_model}")
+        cpu_model_label.config(text=f"CPU Model: {hardware.cpu_model}")
+    if network_usage is not None:
+        network_info_label.config(text=f"Network: Down {network_usage.bytes_recv / 1024:.1f} KB/s - "
+                                       f"Up {network_usage.bytes_sent / 1024:.1f} KB/s{stale_mark(snapshot, 'network')}")
+
+    process_info_label.config(text=f"Top Processes:{stale_mark(snapshot, 'top_processes')}")
+    for i, process in enumerate(top):
+        pid, name, cpu_percent, memory_percent, gpu_percent, gpu_memory, io_rate, threads, fds = process
+        process_labels[i].config(text=f"{pid} - {name} - CPU: {cpu_percent:.1f}% - Memory: {memory_percent:.1f}% - GPU: {gpu_percent:.1f}% - VRAM: {gpu_memory:.0f} MB"
+                                      f" - I/O: {io_rate / 1024:.1f} KB/s - Threads: {threads} - FDs: {fds}")
+
+    group_info_label.config(text=f"Top Applications:{stale_mark(snapshot, 'top_processes')}")
+    for i, (name, count, cpu_percent, memory_percent, gpu_percent) in enumerate(top_groups):
+        group_labels[i].config(text=f"{name} - {count} processes - CPU: {cpu_percent:.1f}% - Memory: {memory_percent:.1f}% - GPU: {gpu_percent:.1f}%")
+
+    storage_info_label.config(text=f"Storage Usage:{stale_mark(snapshot, 'storage')}")
+    io_sample = snapshot.value('disk_io')
+    disk_rates, total_rates = (io_sample.per_disk, io_sample.total) if io_sample is not None else ({}, None)
+    set_rows(storage_frame, storage_labels,
+             [storage_row(storage, disk_rates, total_rates) for storage in snapshot.value('storage', [])],
+             ("Arial", 12))
+    if io_sample is not None:
+        io = io_sample.total
+        disk_io_label.config(text=f"Disk I/O: R {io.read_mb_s:.1f} MB/s ({io.read_iops:.0f} IOPS) - "
+                                  f"W {io.write_mb_s:.1f} MB/s ({io.write_iops:.0f} IOPS) - "
+                                  f"Await: {io.await_ms:.1f} ms - Queue: {io.queue_depth:.2f}"
+                                  f"{stale_mark(snapshot, 'disk_io')}")
+
+    stage = instrumentation.lap('ui.labels', stage)
+
+    # Actualizar gráfico: sólo cambian los datos de las líneas; el dibujo
+    # completo (cuando cambian los ejes) se mide aparte del blit
+    full_draws = chart.full_draws
+    seconds = CHART_WINDOWS[chart_window.get()]
+    if seconds is None:
+        chart.update_from_history(history)
+    else:
+        chart.update_from_rollups(rollups, seconds, max_points=chart.max_points)
+    stage = instrumentation.lap('ui.chart.full_draw' if chart.full_draws != full_draws else 'ui.chart.blit', stage)
+
+    jitter = scheduler.jitter()
+    scheduler_label.config(text=f"Refresh: {scheduler.period() * 1000:.0f} ms - Jitter p95: {jitter['p95_ms']:.1f} ms")
+
+    if overlay_visible:
+        usage = snapshot.value('self')
+        lines = [f"monitor: CPU {usage.cpu_percent:.1f}% - RSS {usage.rss_mb:.1f} MB - {usage.threads} threads"
+                 if usage is not None else "monitor: -"]
+        overlay_label.config(text='\n'.join(lines + format_summary(instrumentation.summary(), limit=15)))
+        instrumentation.lap('ui.overlay', stage)
+
+def toggle_overlay(event=None):
+    global overlay_visible
+    overlay_visible = not overlay_visible
+    if overlay_visible:
+        overlay_label.place(relx=1.0, rely=0.0, anchor='ne')
+        overlay_label.lift()
+    else:
+        overlay_label.place_forget()
 
 # Crear ventana principal
 root = Tk()
 root.title("System Monitor")
-root.geometry("800x600")
+root.geometry("1400x700")
+
+# Etiquetas a la izquierda, gráficas a la derecha
+info_frame = Frame(root)
+info_frame.pack(side=LEFT, fill=Y)
 
 # Etiquetas de CPU
-cpu_label = Label(root, font=("Arial", 14))
+cpu_label = Label(info_frame, font=("Arial", 14))
 cpu_label.pack()
-cpu_temperature_label = Label(root, font=("Arial", 14))
+cpu_temperature_label = Label(info_frame, font=("Arial", 14))
 cpu_temperature_label.pack()
 
 # Etiquetas de GPU
-gpu_usage_label = Label(root, font=("Arial", 14))
+gpu_usage_label = Label(info_frame, font=("Arial", 14))
 gpu_usage_label.pack()
-gpu_temperature_label = Label(root, font=("Arial", 14))
+gpu_temperature_label = Label(info_frame, font=("Arial", 14))
 gpu_temperature_label.pack()
 
 # Etiqueta de uso de memoria
-memory_label = Label(root, font=("Arial", 14))
+memory_label = Label(info_frame, font=("Arial", 14))
 memory_label.pack()
 
 #Network
-network_info_label = Label(root, text="Network Usage:", font=("Arial", 14))
+network_info_label = Label(info_frame, text="Network Usage:", font=("Arial", 14))
 network_info_label.pack()
 
 # Etiqueta de RAM total
-total_ram_label = Label(root, font=("Arial", 14))
+total_ram_label = Label(info_frame, font=("Arial", 14))
 total_ram_label.pack()
 
 # Etiqueta de velocidad de RAM
-ram_speed_label = Label(root, font=("Arial", 14))
+ram_speed_label = Label(info_frame, font=("Arial", 14))
 ram_speed_label.pack()
 
 # Etiqueta de modelo de GPU
-gpu_model_label = Label(root, font=("Arial", 14))
+gpu_model_label = Label(info_frame, font=("Arial", 14))
 gpu_model_label.pack()
 
 # Etiqueta de modelo de CPU
-cpu_model_label = Label(root, font=("Arial", 14))
+cpu_model_label = Label(info_frame, font=("Arial", 14))
 cpu_model_label.pack()
 
 # Etiqueta de información de procesos
-process_info_label = Label(root, font=("Arial", 14))
+process_info_label = Label(info_frame, font=("Arial", 14))
 process_info_label.pack()
 
 # Etiquetas de procesos
 process_labels = []
-for _ in range(5):
-    process_label = Label(root, font=("Arial", 12))
+for _ in range(NUM_PROCESSES):
+    process_label = Label(info_frame, font=("Arial", 12))
     process_label.pack()
     process_labels.append(process_label)
 
+# Etiqueta de información de aplicaciones (procesos agrupados)
+group_info_label = Label(info_frame, font=("Arial", 14))
+group_info_label.pack()
+
+# Etiquetas de aplicaciones
+group_labels = []
+for _ in range(NUM_PROCESSES):
+    group_label = Label(info_frame, font=("Arial", 12))
+    group_label.pack()
+    group_labels.append(group_label)
+
 # Etiqueta de información de almacenamiento
-storage_info_label = Label(root, font=("Arial", 14))
+storage_info_label = Label(info_frame, font=("Arial", 14))
 storage_info_label.pack()
 
-# Etiquetas de almacenamiento
+# Etiquetas de almacenamiento: una fila por montaje, se crean al llegar los datos
+storage_frame = Frame(info_frame)
+storage_frame.pack()
 storage_labels = []
-for _ in range(3):
-    storage_label = Label(root, font=("Arial", 12))
-    storage_label.pack()
-    storage_labels.append(storage_label)
-
-# Historial de uso de CPU y memoria
-cpu_usage_history = []
-memory_usage_history = []
-cpu_temperature_history = []
-gpu_temperature_history = []
-
-# Configuración de gráfico
-plt.rcParams["figure.figsize"] = (8, 4)
-plt.ion()
 
-# Ejecutar función de actualización de datos
-update_data(1, 5)
+# Etiqueta de E/S de disco
+disk_io_label = Label(info_frame, font=("Arial", 12))
+disk_io_label.pack()
+
+# Etiqueta del periodo real de actualización
+scheduler_label = Label(info_frame, font=("Arial", 10))
+scheduler_label.pack()
+
+# Selector de la ventana de las gráficas
+chart_window = StringVar(root, value=next(iter(CHART_WINDOWS)))
+chart_window_menu = OptionMenu(info_frame, chart_window, *CHART_WINDOWS)
+chart_window_menu.pack()
+
+# Gráficas dentro de la ventana principal
+figure = Figure(figsize=(8, 6))
+canvas = FigureCanvasTkAgg(figure, master=root)
+canvas.get_tk_widget().pack(side=RIGHT, fill=BOTH, expand=True)
+chart = MetricChart(figure)
+
+# Overlay de depuración sobre las gráficas (F12): CPU y memoria del monitor y
+# p50/p95/p99 de cada colector y etapa de la interfaz
+overlay_visible = False
+overlay_label = Label(root, font=("Courier", 9), justify=LEFT, anchor='nw', bg='#fffbe6', relief=SOLID, bd=1)
+root.bind('<F12>', toggle_overlay)
+
+# Arrancar la recolección en segundo plano y refrescar la interfaz cada
+# segundo desde el mainloop
+engine.start()
+scheduler = TkScheduler(root, 1, instrumentation.wrap('ui.update_data', update_data))
+scheduler.start()
 
 root.mainloop()
 
-# Finalizar pynvml
-pynvml.nvmlShutdown()
+engine.stop()
+if profiler is not None:
+    profiler.dump(args.profile)
+capacity_poller.close()
+if store is not None:
+    store.close()
+if archive is not None:
+    archive.close()
+
+# Cerrar los sensores y las sesiones de NVML y WMI
+sensor_provider.close()
+nvml_session.close()
+wmi_session.close()
+if recorder is not None:
+    recorder.close()
+if replayer is not None:
+    replayer.close()
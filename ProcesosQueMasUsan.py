@@ -1,64 +1,58 @@
-import psutil
-import pynvml
+import time
 
-def get_gpu_usage():
-    pynvml.nvmlInit()
-    handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-    gpu_info = pynvml.nvmlDeviceGetUtilizationRates(handle)
-    gpu_usage = gpu_info.gpu
-    pynvml.nvmlShutdown()
-    return gpu_usage
+from rendimiento.gpu_procesos import GpuProcessAccounting
+from rendimiento.procesos import ProcessRegistry
+from rendimiento.ranking import top_processes
+from rendimiento.sesiones import NvmlSession
+
+# Sesión de NVML compartida por todas las consultas
+nvml_session = NvmlSession()
+gpu_accounting = GpuProcessAccounting(nvml_session)
+process_registry = ProcessRegistry()
+
+# Intervalo entre la lectura base y la que se ordena
+SAMPLE_INTERVAL = 1.0
 
 def get_top_processes_by_resource_usage(num_processes):
     processes = []
 
-    # Obtener el uso de GPU
-    gpu_usage = get_gpu_usage()
+    # El CPU por proceso es un delta entre dos lecturas: la primera sólo
+    # deja la base, la segunda (un intervalo después) es la que se ordena
+    process_registry.update()
+    time.sleep(SAMPLE_INTERVAL)
+
+    # Obtener el uso de GPU de cada proceso con una sola consulta
+    gpu_usage_by_pid = gpu_accounting.collect()
 
-    # Obtener los procesos por uso de CPU
-    cpu_processes = sorted(psutil.process_iter(attrs=["pid", "name", "cpu_percent"]), key=lambda x: x.info["cpu_percent"], reverse=True)[:num_processes]
-    for process in cpu_processes:
-        pid = process.info["pid"]
-        name = process.info["name"]
-        cpu_usage = process.info["cpu_percent"]
-        memory_usage = psutil.Process(pid).memory_percent()
-        processes.append({
-            "pid": pid,
-            "name": name,
-            "resource": "CPU",
-            "usage": cpu_usage,
-            "gpu_usage": gpu_usage,
-            "memory_usage": memory_usage
-        })
-    
-    # Obtener los procesos por uso de memoria RAM
-    ram_processes = sorted(psutil.process_iter(attrs=["pid", "name", "memory_percent"]), key=lambda x: x.info["memory_percent"], reverse=True)[:num_processes]
-    for process in ram_processes:
-        pid = process.info["pid"]
-        name = process.info["name"]
-        cpu_usage = psutil.Process(pid).cpu_percent()
-        memory_usage = process.info["memory_percent"]
-        processes.append({
-            "pid": pid,
-            "name": name,
-            "resource": "RAM",
-            "usage": memory_usage,
-            "gpu_usage": gpu_usage,
-            "memory_usage": memory_usage
-        })
+    # Un solo recorrido de los procesos para los rankings de CPU y de RAM
+    rankings = top_processes(process_registry, num_processes, keys=('cpu', 'rss'), gpu_usage_by_pid=gpu_usage_by_pid)
+    for resource, key in (("CPU", 'cpu'), ("RAM", 'rss')):
+        for process in rankings[key]:
+            processes.append({
+                "pid": process.pid,
+                "name": process.name,
+                "resource": resource,
+                "usage": process.cpu_percent if resource == "CPU" else process.memory_percent,
+                "gpu_usage": process.gpu_percent,
+                "gpu_memory_mb": process.gpu_memory_mb,
+                "memory_usage": process.memory_percent
+            })
 
     # Ordenar los procesos por el recurso utilizado
     processes = sorted(processes, key=lambda x: x["usage"], reverse=True)
-    
+
     return processes[:num_processes]
 
 # Obtener y mostrar los principales 3 procesos que consumen recursos en general
-top_processes = get_top_processes_by_resource_usage(3)
+top_consumers = get_top_processes_by_resource_usage(3)
 print("Principales procesos que consumen recursos:")
-for process in top_processes:
+for process in top_consumers:
     print("Nombre:", process["name"])
     print("Recurso:", process["resource"])
     print("Uso de CPU:", process["usage"], "%")
     print("Uso de GPU:", process["gpu_usage"], "%")
+    print("Memoria de GPU:", round(process["gpu_memory_mb"], 1), "MB")
     print("Uso de RAM:", process["memory_usage"], "%")
     print()
+
+nvml_session.close()
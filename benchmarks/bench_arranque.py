@@ -0,0 +1,87 @@
+# Tiempo de arranque del modo sin interfaz: desde lanzar el proceso hasta
+# recibir el primer registro por stdout, contra un presupuesto. Además corre
+# una vez con `python -X importtime` para listar los módulos que más pesan y
+# revisar que no se importe nada de la interfaz ni de los backends pesados.
+# Termina con código 1 si se pasa del presupuesto:
+#   python -m benchmarks.bench_arranque --presupuesto 150
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+COMMAND = [sys.executable, '-m', 'rendimiento', 'collect', '--collectors', 'cpu,memory',
+           '--interval', '0.001', '--count', '1', '--line-buffered']
+
+# Módulos que el modo sin interfaz nunca debe importar
+FORBIDDEN = ('tkinter', 'matplotlib', 'numpy', 'pynvml', 'wmi', 'pythoncom')
+
+
+def first_sample_ms(command):
+    inicio = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    line = process.stdout.readline()
+    elapsed = (time.perf_counter() - inicio) * 1000
+    process.stdout.close()
+    process.wait()
+    if not line:
+        raise RuntimeError(f"{' '.join(command)} no escribió ningún registro")
+    return elapsed
+
+
+def interpreter_ms():
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def import_times(command):
+    # (módulo, profundidad, acumulado en ms) de cada importación
+    result = subprocess.run([command[0], '-X', 'importtime'] + command[1:],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # la línea de encabezados
+        # La indentación del nombre marca la profundidad: dos espacios por nivel
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(cumulative) / 1000))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeticiones', type=int, default=15)
+    parser.add_argument('--presupuesto', type=float, default=150.0, help='ms hasta el primer registro (mediana)')
+    args = parser.parse_args()
+
+    # Una ejecución de calentamiento para que el disco no cuente
+    first_sample_ms(COMMAND)
+    tiempos = sorted(first_sample_ms(COMMAND) for _ in range(args.repeticiones))
+    base = statistics.median(interpreter_ms() for _ in range(args.repeticiones))
+    mediana = statistics.median(tiempos)
+    p90 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.9))]
+    print(f"python -c pass:            {base:.1f} ms")
+    print(f"primer registro (mediana): {mediana:.1f} ms, p90 {p90:.1f} ms, presupuesto {args.presupuesto:.0f} ms")
+
+    modules = import_times(COMMAND)
+    top_level = [(name, ms) for name, depth, ms in modules if depth == 0]
+    print("importaciones de primer nivel más lentas (-X importtime, acumulado):")
+    for name, ms in sorted(top_level, key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {ms:7.1f} ms  {name}")
+
+    imported = {name.split('.')[0] for name, _, _ in modules}
+    forbidden = [name for name in FORBIDDEN if name in imported]
+    if forbidden:
+        print(f"ERROR: el modo sin interfaz importó {', '.join(forbidden)}")
+    if mediana > args.presupuesto:
+        print(f"ERROR: el arranque ({mediana:.1f} ms) rebasa el presupuesto de {args.presupuesto:.0f} ms")
+    if forbidden or mediana > args.presupuesto:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+# Compara la latencia por tick de psutil.cpu_percent(interval=1) contra
+# CpuSampler. Ejecutar desde la raíz del repositorio:
+#   python -m benchmarks.bench_cpu
+import argparse
+import time
+
+import psutil
+
+from rendimiento.cpu import CpuSampler
+
+
+def measure(func, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        func()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return sum(tiempos) / len(tiempos), max(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ticks', type=int, default=1000)
+    parser.add_argument('--ticks-bloqueantes', type=int, default=2)
+    args = parser.parse_args()
+
+    promedio, maximo = measure(lambda: psutil.cpu_percent(interval=1), args.ticks_bloqueantes)
+    print(f"psutil.cpu_percent(interval=1): {promedio:.2f} ms/tick (máx {maximo:.2f} ms)")
+
+    sampler = CpuSampler()
+    promedio, maximo = measure(sampler.sample, args.ticks)
+    print(f"CpuSampler.sample():            {promedio:.3f} ms/tick (máx {maximo:.3f} ms)")
+
+
+if __name__ == '__main__':
+    main()
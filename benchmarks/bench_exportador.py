@@ -0,0 +1,82 @@
+# Latencia de scrape de MetricsExporter contra localhost con varios scrapers
+# concurrentes, mientras un hilo publica lecturas nuevas sin parar:
+#   python -m benchmarks.bench_exportador
+import argparse
+import http.client
+import threading
+import time
+
+import numpy as np
+
+from rendimiento.almacenamiento import ZERO_DISK_RATES, DiskIoSample
+from rendimiento.exportador import MetricsExporter
+from rendimiento.motor import Reading, SnapshotPublisher
+from rendimiento.red import ZERO_RATES, NetworkSample
+
+
+def publish_forever(publisher, stop):
+    rnd = np.random.default_rng(0)
+    per_nic = {f'eth{i}': ZERO_RATES._replace(bytes_recv=float(i)) for i in range(8)}
+    per_disk = {f'sd{chr(97 + i)}': ZERO_DISK_RATES for i in range(4)}
+    while not stop.is_set():
+        now = time.time()
+        for name in ('cpu', 'memory', 'gpu', 'cpu_temperature', 'gpu_temperature'):
+            publisher.publish(name, Reading(float(rnd.uniform(0, 100)), now, 0.001, False, None))
+        publisher.publish('network', Reading(NetworkSample(ZERO_RATES, per_nic, 1.0), now, 0.0002, False, None))
+        publisher.publish('disk_io', Reading(DiskIoSample(ZERO_DISK_RATES, per_disk, 1.0), now, 0.0001, False, None))
+        time.sleep(0.01)
+
+
+def scrape(port, count, latencies):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for _ in range(count):
+        inicio = time.perf_counter()
+        connection.request('GET', '/metrics')
+        response = connection.getresponse()
+        response.read()
+        latencies.append((time.perf_counter() - inicio) * 1000)
+        assert response.status == 200
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scrapers', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--scrapes', type=int, default=200)
+    args = parser.parse_args()
+
+    publisher = SnapshotPublisher()
+    stop = threading.Event()
+    publisher_thread = threading.Thread(target=publish_forever, args=(publisher, stop), daemon=True)
+    publisher_thread.start()
+    exporter = MetricsExporter(publisher, port=0, min_interval=0.5)
+    port = exporter.start()
+    time.sleep(0.2)
+
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('GET', '/metrics')
+    body = connection.getresponse().read()
+    connection.close()
+    lines = body.count(b'\n')
+    print(f"/metrics en el puerto {port}: {len(body)} bytes, {lines} líneas")
+
+    for scrapers in args.scrapers:
+        latencies = []
+        threads = [threading.Thread(target=scrape, args=(port, args.scrapes, latencies))
+                   for _ in range(scrapers)]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        total = time.perf_counter() - inicio
+        print(f"{scrapers:3d} scrapers: p50 {np.percentile(latencies, 50):.2f} ms, "
+              f"p99 {np.percentile(latencies, 99):.2f} ms, {len(latencies) / total:,.0f} scrapes/s")
+
+    print(f"renders: {exporter.renders}, publicaciones: {publisher.latest.sequence}")
+    stop.set()
+    exporter.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Cuenta las llamadas a NVML por tick para la tabla de procesos: la versión
+# anterior consultaba la GPU una vez por proceso, GpuProcessAccounting hace
+# tres llamadas por GPU sin importar cuántos procesos haya.
+#   python -m benchmarks.bench_gpu_procesos --procesos 600
+import argparse
+import time
+
+from rendimiento.falsos import FakeGpu, FakeNvml
+from rendimiento.gpu_procesos import GpuProcessAccounting
+from rendimiento.sesiones import NvmlSession
+
+
+def fake_gpus(num_gpus, num_procesos):
+    gpus = []
+    for index in range(num_gpus):
+        pids = range(1000 + index, 1000 + num_procesos, num_gpus * 10)
+        gpus.append(FakeGpu(
+            name=f'Fake GPU {index}',
+            compute_processes=[(pid, 256 * 1024**2) for pid in pids],
+            graphics_processes=[(pid, 64 * 1024**2) for pid in pids[::2]],
+            process_samples=[(pid, 1000, pid % 100, pid % 50) for pid in pids],
+        ))
+    return gpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--procesos', type=int, default=600)
+    parser.add_argument('--gpus', type=int, default=1)
+    parser.add_argument('--ticks', type=int, default=100)
+    args = parser.parse_args()
+
+    nvml = FakeNvml(fake_gpus(args.gpus, args.procesos))
+    session = NvmlSession(nvml)
+    session.handles()
+    nvml.calls.clear()
+    inicio = time.perf_counter()
+    for _ in range(args.ticks):
+        # Lo que hacía get_top_processes_by_resource_usage: una consulta por proceso
+        for _ in range(args.procesos):
+            session.call('nvmlDeviceGetMemoryInfo', 0)
+    ms = (time.perf_counter() - inicio) * 1000 / args.ticks
+    print(f"una consulta por proceso: {sum(nvml.calls.values()) / args.ticks:.0f} llamadas/tick, {ms:.3f} ms/tick")
+    assert sum(nvml.calls.values()) == args.procesos * args.ticks
+
+    accounting = GpuProcessAccounting(session)
+    nvml.calls.clear()
+    inicio = time.perf_counter()
+    for _ in range(args.ticks):
+        usage = accounting.collect()
+    ms = (time.perf_counter() - inicio) * 1000 / args.ticks
+    print(f"GpuProcessAccounting:     {sum(nvml.calls.values()) / args.ticks:.0f} llamadas/tick, {ms:.3f} ms/tick, "
+          f"{len(usage)} procesos con GPU")
+    # Tres llamadas por GPU y por tick, sin importar cuántos procesos haya
+    assert sum(nvml.calls.values()) == 3 * args.gpus * args.ticks, nvml.calls
+    session.close()
+
+
+if __name__ == '__main__':
+    main()
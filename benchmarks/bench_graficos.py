@@ -0,0 +1,86 @@
+# Tiempo por cuadro de las gráficas: el redibujo completo que hacía
+# update_data (plt.clf, subplots, leyendas, tight_layout) contra MetricChart
+# con set_data y blitting. Usa el backend Agg, sin ventana:
+#   python -m benchmarks.bench_graficos
+import argparse
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from rendimiento.graficos import MetricChart
+from rendimiento.historial import MetricHistory
+
+METRICS = ('cpu', 'memory', 'gpu', 'cpu_temperature', 'gpu_temperature')
+
+
+def fill_history(points, seed=0):
+    rnd = np.random.default_rng(seed)
+    history = MetricHistory(METRICS, capacity=points)
+    for i in range(points):
+        history.append([rnd.uniform(0, 100), rnd.uniform(0, 100), rnd.uniform(0, 100),
+                        rnd.uniform(40, 60), rnd.uniform(40, 60)], timestamp=float(i))
+    return history
+
+
+def redibujo_completo(history):
+    # Copia del bloque de gráficas de update_data antes de MetricChart
+    plt.clf()
+    plt.subplot(2, 1, 1)
+    plt.plot(history.series('cpu'), label='CPU')
+    plt.plot(history.series('memory'), label='Memory')
+    plt.plot(history.series('gpu'), label='GPU')
+    plt.xlabel('Time (s)')
+    plt.ylabel('Usage (%)')
+    plt.title('CPU, Memory, and GPU Usage Over Time')
+    plt.legend()
+    plt.grid()
+
+    plt.subplot(2, 1, 2)
+    plt.plot(history.series('cpu_temperature'), label='CPU')
+    plt.plot(history.series('gpu_temperature'), label='GPU')
+    plt.xlabel('Time (s)')
+    plt.ylabel('Temperature (°C)')
+    plt.title('CPU and GPU Temperature Over Time')
+    plt.legend()
+    plt.grid()
+
+    plt.tight_layout()
+    plt.gcf().canvas.draw()
+
+
+def measure(func, frames):
+    func()
+    inicio = time.perf_counter()
+    for _ in range(frames):
+        func()
+    ms = (time.perf_counter() - inicio) * 1000 / frames
+    return ms, 1000 / ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--puntos', type=int, nargs='+', default=[50, 5000, 50000])
+    parser.add_argument('--cuadros', type=int, default=30)
+    args = parser.parse_args()
+
+    for points in args.puntos:
+        history = fill_history(points)
+
+        plt.figure(figsize=(8, 4))
+        ms, fps = measure(lambda: redibujo_completo(history), args.cuadros)
+        plt.close('all')
+        print(f"{points:>6} puntos  redibujo completo: {ms:8.2f} ms/cuadro {fps:8.1f} fps")
+
+        figure = plt.figure(figsize=(8, 4))
+        chart = MetricChart(figure)
+        ms, fps = measure(lambda: chart.update_from_history(history), args.cuadros)
+        plt.close('all')
+        print(f"{points:>6} puntos  MetricChart (blit): {ms:7.2f} ms/cuadro {fps:8.1f} fps "
+              f"({chart.full_draws} dibujos completos)")
+
+
+if __name__ == '__main__':
+    main()
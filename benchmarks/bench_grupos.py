@@ -0,0 +1,93 @@
+# Compara corregir las sumas por grupo con las diferencias de cada tick
+# (ProcessGroups.update, sólo con las filas que el registro reporta como
+# cambiadas) contra revisar todas las filas y contra recalcularlas desde cero
+# (resync), sobre una tabla sintética donde sólo una fracción de los procesos
+# cambia por tick:
+#   python -m benchmarks.bench_grupos --procesos 10000 --cambian 0.05
+import argparse
+import random
+import time
+
+from benchmarks.bench_ranking import synthetic_table
+from rendimiento.grupos import GROUP_FIELDS, ProcessGroups
+from rendimiento.procesos import ProcessEvents
+
+
+class SyntheticRegistry:
+    # Lo que ProcessGroups usa de ProcessRegistry
+
+    def __init__(self, rows):
+        self._rows = {row.pid: row for row in rows}
+        self.on_start = []
+        self.on_exit = []
+        self.events = ProcessEvents([], [], [])
+        self.updates = 0
+
+    def rows(self):
+        return self._rows.values()
+
+    def get(self, pid):
+        return self._rows.get(pid)
+
+
+def build_registry(num_procesos, seed=0):
+    rnd = random.Random(seed)
+    rows = synthetic_table(num_procesos, seed)
+    # Árboles de 1 a 64 procesos con el mismo nombre bajo un maestro
+    index = 0
+    while index < len(rows):
+        master = rows[index]
+        master.ppid = 1
+        size = rnd.choice((1, 1, 1, 4, 16, 64))
+        for child in rows[index + 1:index + size]:
+            child.name = master.name
+            child.ppid = master.pid
+        index += size
+    return SyntheticRegistry(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--procesos', type=int, default=10000)
+    parser.add_argument('--cambian', type=float, default=0.05, help='fracción de procesos que cambian por tick')
+    parser.add_argument('--ticks', type=int, default=50)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    registry = build_registry(args.procesos)
+    groups = ProcessGroups(registry, mode='tree', resync_every=0)
+    rows = list(registry.rows())
+    changed = max(1, int(len(rows) * args.cambian))
+
+    incremental = scan = recompute = 0.0
+    for tick in range(2 * args.ticks):
+        sample = rnd.sample(rows, changed)
+        for row in sample:
+            row.cpu_percent = rnd.random() * 100
+            row.rss = rnd.randrange(1, 4 * 1024**3)
+        # Los ticks impares simulan un update perdido: se revisan todas
+        registry.events = ProcessEvents([], [], sample)
+        registry.updates += 1 + tick % 2
+        inicio = time.perf_counter()
+        groups.update()
+        if tick % 2:
+            scan += time.perf_counter() - inicio
+        else:
+            incremental += time.perf_counter() - inicio
+        sums = {group.key: (group.cpu_percent, group.rss) for group in groups.groups()}
+        inicio = time.perf_counter()
+        groups.resync()
+        recompute += time.perf_counter() - inicio
+        for group in groups.groups():
+            cpu, rss = sums[group.key]
+            assert rss == group.rss and abs(cpu - group.cpu_percent) < 1e-6
+
+    print(f"{args.procesos} procesos en {len(groups)} grupos, {changed} cambian por tick, "
+          f"{len(GROUP_FIELDS)} campos por grupo")
+    print(f"filas cambiadas:      {incremental * 1000 / args.ticks:.2f} ms")
+    print(f"revisar todas:        {scan * 1000 / args.ticks:.2f} ms")
+    print(f"recalcular todo:      {recompute * 1000 / args.ticks / 2:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Costo de medir un tramo: una función vacía sola, envuelta con wrap(), dentro
+# de un bloque span() y con lap(), en nanosegundos por llamada:
+#   python -m benchmarks.bench_instrumentacion --llamadas 200000
+import argparse
+import time
+
+from rendimiento.instrumentacion import Instrumentation
+
+
+def per_call_ns(func, llamadas):
+    inicio = time.perf_counter_ns()
+    func(llamadas)
+    return (time.perf_counter_ns() - inicio) / llamadas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--llamadas', type=int, default=200000)
+    args = parser.parse_args()
+
+    instrumentation = Instrumentation()
+
+    def work():
+        pass
+
+    timed = instrumentation.wrap('wrap', work)
+
+    def plain(n):
+        for _ in range(n):
+            work()
+
+    def wrapped(n):
+        for _ in range(n):
+            timed()
+
+    def spanned(n):
+        span = instrumentation.span
+        for _ in range(n):
+            with span('span'):
+                work()
+
+    def lapped(n):
+        lap = instrumentation.lap
+        stage = time.perf_counter_ns()
+        for _ in range(n):
+            work()
+            stage = lap('lap', stage)
+
+    base = per_call_ns(plain, args.llamadas)
+    print(f"sin medir:  {base:6.0f} ns por llamada")
+    for name, func in (('wrap()', wrapped), ('span()', spanned), ('lap()', lapped)):
+        print(f"{name:<10}  {per_call_ns(func, args.llamadas) - base:6.0f} ns extra por llamada")
+    summary = instrumentation.summary()['span']
+    print(f"span: p50 {summary.p50_ms * 1e6:.0f} ns, p99 {summary.p99_ms * 1e6:.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# Costo de CPU por tick de ProcessRegistry.update() con los tres modos de
+# detalle, sobre los procesos reales de la máquina más N procesos dormidos
+# lanzados por el benchmark:
+#   python -m benchmarks.bench_procesos --lanzar 300 --presupuesto 5
+import argparse
+import subprocess
+import sys
+import time
+
+from rendimiento.procesos import DETAIL_MODES, ProcessRegistry
+
+
+def spawn(num_procesos):
+    command = [sys.executable, '-c', 'import time; time.sleep(3600)']
+    return [subprocess.Popen(command, stdin=subprocess.DEVNULL) for _ in range(num_procesos)]
+
+
+def measure(registry, ticks):
+    # El primer update llena la tabla; no cuenta
+    registry.update()
+    cpu = []
+    detailed = []
+    for _ in range(ticks):
+        inicio = time.process_time()
+        registry.update()
+        cpu.append((time.process_time() - inicio) * 1000)
+        detailed.append({'basic': 0, 'full': len(registry), 'adaptive': registry.detailed}[registry.detail])
+    return sum(cpu) / ticks, max(cpu), sum(detailed) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lanzar', type=int, default=300, help='procesos dormidos extra')
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--presupuesto', type=float, default=5.0, help='ms de CPU para el detalle en modo adaptativo')
+    args = parser.parse_args()
+
+    children = spawn(args.lanzar)
+    try:
+        time.sleep(0.5)
+        for mode in DETAIL_MODES:
+            registry = ProcessRegistry(detail=mode, detail_k=args.top, detail_budget=args.presupuesto / 1000)
+            promedio, maximo, detallados = measure(registry, args.ticks)
+            print(f"{mode:>8}: {promedio:6.2f} ms de CPU por tick (máx {maximo:.2f}), "
+                  f"{detallados:.0f} de {len(registry.rows())} procesos con detalle")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+
+if __name__ == '__main__':
+    main()
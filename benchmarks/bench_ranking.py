@@ -0,0 +1,56 @@
+# Compara ordenar la tabla completa una vez por criterio contra el ranking en
+# una sola pasada con heaps acotados, sobre una tabla sintética de procesos:
+#   python -m benchmarks.bench_ranking --procesos 10000
+import argparse
+import random
+import time
+
+from rendimiento.procesos import ProcessRow
+from rendimiento.ranking import RANKING_KEYS, rank_processes
+
+
+def synthetic_table(num_procesos, seed=0):
+    rnd = random.Random(seed)
+    rows = []
+    for pid in range(1, num_procesos + 1):
+        row = ProcessRow(pid, 0.0, f'proc{pid}')
+        row.cpu_percent = rnd.random() * 100
+        row.memory_percent = rnd.random() * 10
+        row.rss = rnd.randrange(1, 4 * 1024**3)
+        row.io_bytes = rnd.randrange(0, 1024**3)
+        row.gpu_percent = rnd.random() * 100 if pid % 20 == 0 else 0.0
+        rows.append(row)
+    return rows
+
+
+def sort_per_key(rows, k, keys):
+    return {name: sorted(rows, key=RANKING_KEYS[name], reverse=True)[:k] for name in keys}
+
+
+def measure(func, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = func()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--procesos', type=int, default=10000)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = synthetic_table(args.procesos)
+    keys = tuple(RANKING_KEYS)
+    ms_sort, esperado = measure(lambda: sort_per_key(rows, args.top, keys), args.repeticiones)
+    ms_heap, obtenido = measure(lambda: rank_processes(rows, args.top, keys), args.repeticiones)
+    for name in keys:
+        assert [RANKING_KEYS[name](r) for r in esperado[name]] == [RANKING_KEYS[name](r) for r in obtenido[name]]
+    print(f"{args.procesos} procesos, top {args.top}, criterios {', '.join(keys)}")
+    print(f"sorted() por criterio: {ms_sort:.2f} ms")
+    print(f"heaps en una pasada:   {ms_heap:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Lectura de sensores por tick. En un árbol sysfs falso (o el real con
+# --sysfs /sys/class) compara recorrer hwmon con glob y open en cada tick
+# contra HwmonProvider, que deja los archivos abiertos y hace un pread por
+# sensor. Con FakeWmi cuenta los objetos Sensor que recorre el colector
+# anterior contra el índice de WmiSensorProvider:
+#   python -m benchmarks.bench_sensores
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+from rendimiento.falsos import FakeWmi, write_fake_sysfs
+from rendimiento.sensores import HwmonProvider, WmiSensorProvider
+from rendimiento.sesiones import WmiSession
+
+
+def scan_every_tick(hwmon_root):
+    # Lo que haría un colector sin estado: buscar y abrir todo cada vez
+    values = {}
+    for path in glob.glob(os.path.join(hwmon_root, 'hwmon*', '*_input')):
+        with open(path) as file:
+            values[path] = int(file.read())
+    return values
+
+
+def measure(func, ticks):
+    inicio = time.perf_counter()
+    for _ in range(ticks):
+        func()
+    return (time.perf_counter() - inicio) / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ticks', type=int, default=2000)
+    parser.add_argument('--sysfs', default=None, help='directorio con hwmon/ y thermal/ (por omisión uno falso)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.sysfs:
+            hwmon_root, thermal_root = os.path.join(args.sysfs, 'hwmon'), os.path.join(args.sysfs, 'thermal')
+        else:
+            hwmon_root, thermal_root = write_fake_sysfs(directory)
+        provider = HwmonProvider(hwmon_root, thermal_root)
+        print(f"{len(provider.sensors())} sensores, CPU: {provider.cpu_key} = {provider.cpu_temperature()}")
+        print(f"glob + open por tick:    {measure(lambda: scan_every_tick(hwmon_root), args.ticks):.3f} ms/tick")
+        print(f"HwmonProvider.read():    {measure(provider.read, args.ticks):.3f} ms/tick")
+        print(f"cpu_temperature():       {measure(provider.cpu_temperature, args.ticks) * 1000:.1f} us/tick")
+        provider.close()
+
+    # WMI: objetos Sensor completos que se recorren por tick
+    wmi = FakeWmi()
+    session = WmiSession(wmi)
+
+    def linear_scan():
+        for sensor in session.query('Sensor', namespace="root/OpenHardwareMonitor"):
+            if sensor.SensorType == 'Temperature' and sensor.Name == 'CPU Package':
+                return sensor.Value
+        return None
+
+    for _ in range(args.ticks):
+        linear_scan()
+    scanned = wmi.calls[('root/OpenHardwareMonitor', 'Sensor')] * len(wmi.classes['root/OpenHardwareMonitor']['Sensor'])
+    print(f"WMI recorrido lineal:    {scanned / args.ticks:.1f} objetos Sensor completos por tick")
+
+    wmi.calls.clear()
+    provider = WmiSensorProvider(session)
+    for _ in range(args.ticks):
+        provider.cpu_temperature()
+    print(f"WmiSensorProvider:       1 consulta por clave ({provider.cpu_key}), "
+          f"{wmi.calls[('root/OpenHardwareMonitor', 'query', 'Sensor')] / args.ticks:.0f} fila por tick "
+          f"+ {wmi.calls[('root/OpenHardwareMonitor', 'Sensor')]} recorrido al arrancar")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Escritura y consultas por rango de TimeSeriesStore con una semana de datos a
+# 1 Hz (604 800 registros) en un directorio temporal:
+#   python -m benchmarks.bench_series
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from rendimiento.series import TimeSeriesStore, process_columns
+
+METRICS = ('cpu', 'memory', 'gpu', 'cpu_temperature', 'gpu_temperature', 'net_recv', 'net_sent')
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dias', type=float, default=7)
+    parser.add_argument('--procesos', type=int, default=5)
+    parser.add_argument('--consultas', type=int, default=50)
+    args = parser.parse_args()
+
+    metrics = METRICS + process_columns(args.procesos)
+    records = int(args.dias * 86400)
+    rnd = np.random.default_rng(0)
+    rows = rnd.uniform(0, 100, size=(1024, len(metrics))).astype(np.float32)
+    start = 1_700_000_000.0
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = TimeSeriesStore(directory, metrics)
+        inicio = time.perf_counter()
+        for i in range(records):
+            store.append(rows[i % len(rows)], timestamp=start + i)
+        store.flush()
+        escritura = time.perf_counter() - inicio
+        print(f"append: {escritura / records * 1e6:.1f} us/registro, "
+              f"{records} registros x {len(metrics)} métricas, "
+              f"{directory_size(directory) / 1024**2:.1f} MB en disco")
+        store.close()
+
+        store = TimeSeriesStore(directory, metrics)
+        for nombre, segundos in (('1 hora', 3600), ('1 día', 86400), ('semana completa', records)):
+            tiempos = []
+            for _ in range(args.consultas):
+                desde = start + rnd.uniform(0, max(1, records - segundos))
+                inicio = time.perf_counter()
+                timestamps, values = store.query('cpu', desde, desde + segundos)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            print(f"query {nombre:>16}: {np.median(tiempos):.2f} ms (máx {max(tiempos):.2f} ms), "
+                  f"{len(timestamps)} puntos")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
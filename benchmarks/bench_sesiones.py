@@ -0,0 +1,64 @@
+# Compara abrir una conexión WMI / llamar a nvmlInit en cada consulta (como
+# hacían los scripts) contra las sesiones persistentes, usando los backends
+# falsos con una latencia de conexión simulada:
+#   python -m benchmarks.bench_sesiones
+import argparse
+import time
+
+from rendimiento.falsos import FakeNvml, FakeWmi
+from rendimiento.sesiones import NvmlSession, WmiSession
+
+
+def tick_por_llamada(wmi, nvml):
+    # Copia de lo que hacía update_data con conexiones nuevas cada vez
+    w = wmi.WMI(namespace="root/OpenHardwareMonitor")
+    for sensor in w.Sensor():
+        if sensor.SensorType == 'Temperature' and sensor.Name == 'CPU Package':
+            break
+    nvml.nvmlInit()
+    handle = nvml.nvmlDeviceGetHandleByIndex(0)
+    nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU)
+    nvml.nvmlInit()
+    handle = nvml.nvmlDeviceGetHandleByIndex(0)
+    nvml.nvmlDeviceGetName(handle)
+
+
+def tick_con_sesion(wmi_session, nvml_session):
+    for sensor in wmi_session.query('Sensor', namespace="root/OpenHardwareMonitor"):
+        if sensor.SensorType == 'Temperature' and sensor.Name == 'CPU Package':
+            break
+    nvml_session.call('nvmlDeviceGetTemperature', 0, nvml_session.nvml.NVML_TEMPERATURE_GPU)
+    nvml_session.call('nvmlDeviceGetName', 0)
+
+
+def run(nombre, tick, ticks, wmi, nvml, conexiones, inits):
+    inicio = time.perf_counter()
+    for _ in range(ticks):
+        tick()
+    ms = (time.perf_counter() - inicio) * 1000 / ticks
+    print(f"{nombre}: {ms:.3f} ms/tick, conexiones WMI={wmi.calls['WMI']}, "
+          f"nvmlInit={nvml.calls['nvmlInit']}")
+    assert wmi.calls['WMI'] == conexiones and nvml.calls['nvmlInit'] == inits, (wmi.calls, nvml.calls)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--latencia-ms', type=float, default=2.0,
+                        help='latencia simulada de cada conexión WMI / nvmlInit')
+    args = parser.parse_args()
+    latencia = args.latencia_ms / 1000
+
+    wmi, nvml = FakeWmi(connect_latency=latencia), FakeNvml(init_latency=latencia)
+    run('conexión por llamada', lambda: tick_por_llamada(wmi, nvml), args.ticks, wmi, nvml,
+        args.ticks, 2 * args.ticks)
+
+    wmi, nvml = FakeWmi(connect_latency=latencia), FakeNvml(init_latency=latencia)
+    wmi_session, nvml_session = WmiSession(wmi), NvmlSession(nvml)
+    run('sesión persistente  ', lambda: tick_con_sesion(wmi_session, nvml_session), args.ticks, wmi, nvml, 1, 1)
+    wmi_session.close()
+    nvml_session.close()
+
+
+if __name__ == '__main__':
+    main()
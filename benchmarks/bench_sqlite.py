@@ -0,0 +1,58 @@
+# Ingesta sostenida de SqliteSink: muestras simuladas de varias métricas a
+# 1 Hz, lo más rápido posible, con lotes de flush_interval segundos de datos y
+# la retención activa. Reporta filas por segundo en un archivo temporal:
+#   python -m benchmarks.bench_sqlite
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from rendimiento.base_datos import SqliteSink
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ticks', type=int, default=86400)
+    parser.add_argument('--metricas', type=int, default=32)
+    parser.add_argument('--lote', type=int, default=300, help='ticks por lote (segundos de datos a 1 Hz)')
+    parser.add_argument('--retencion', type=float, default=6 * 3600, help='segundos de datos crudos')
+    args = parser.parse_args()
+
+    names = [f'metric{i}' for i in range(args.metricas)]
+    rnd = np.random.default_rng(0)
+    rows = rnd.uniform(0, 100, size=(1024, args.metricas)).tolist()
+    start = 1_700_000_000.0
+    now = [start]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'archivo.sqlite')
+        # Reloj simulado: la retención avanza con los datos
+        sink = SqliteSink(path, flush_interval=3600, retention_seconds=args.retencion,
+                          clock=lambda: now[0])
+        inicio = time.perf_counter()
+        lotes = []
+        for i in range(args.ticks):
+            now[0] = start + i
+            sink.append(dict(zip(names, rows[i % len(rows)])), timestamp=now[0])
+            if (i + 1) % args.lote == 0:
+                lote = time.perf_counter()
+                sink.flush()
+                lotes.append((time.perf_counter() - lote) * 1000)
+        sink.flush()
+        total = time.perf_counter() - inicio
+        print(f"{sink.rows_written} filas en {total:.2f} s: {sink.rows_written / total:,.0f} filas/s")
+        print(f"lote de {args.lote * args.metricas} filas: mediana {np.median(lotes):.1f} ms, "
+              f"máx {max(lotes):.1f} ms; {sink.rows_trimmed} filas borradas por retención")
+        print(f"append: {total / args.ticks * 1e6:.1f} us/tick incluyendo lotes; "
+              f"base de {os.path.getsize(path) / 1024**2:.1f} MB, error: {sink.last_error}")
+        inicio = time.perf_counter()
+        datos = sink.query('metric0', start + args.ticks - 3600)
+        print(f"query 1 hora: {(time.perf_counter() - inicio) * 1000:.2f} ms, {len(datos)} filas; "
+              f"rollups por hora: {len(sink.query_rollup('metric0', 3600, start))}")
+        sink.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# Graba una sesión contra los backends falsos (FakePsutil con procesos que
+# terminan y arrancan, FakeNvml) y la reproduce tan rápido como se pueda por
+# los mismos colectores. Reporta el costo de grabar, el tamaño de la traza,
+# el tiempo por tick de la reproducción y verifica que cada lectura
+# reproducida sea idéntica a la grabada:
+#   python -m benchmarks.bench_traza --procesos 500 --ticks 60 --churn 5
+import argparse
+import os
+import tempfile
+import time
+
+from rendimiento.colectores import Backends, Resources, build_collectors
+from rendimiento.falsos import FakeNvml, FakePsutil
+from rendimiento.motor import Collector, SnapshotPublisher
+from rendimiento.salida import to_plain
+from rendimiento.traza import TraceRecorder, TraceReplayer
+
+COLLECTORS = ('cpu', 'memory', 'network', 'disk_io', 'storage', 'top_processes', 'top_groups', 'gpu',
+              'gpu_temperature')
+
+
+def capturing(collectors, values):
+    # Copias de los colectores que guardan (nombre, valor) de cada lectura
+    def capture(collector):
+        def func():
+            value = collector.func()
+            values.append((collector.name, to_plain(value)))
+            return value
+        return func
+    return [Collector(collector.name, capture(collector), period=collector.period, cost=collector.cost)
+            for collector in collectors]
+
+
+def run_ticks(fake, collectors, ticks):
+    for _ in range(ticks):
+        fake.advance()
+        for collector in collectors:
+            try:
+                collector.func()
+            except Exception:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--procesos', type=int, default=500)
+    parser.add_argument('--ticks', type=int, default=60)
+    parser.add_argument('--churn', type=int, default=5, help='procesos que terminan y arrancan por tick')
+    parser.add_argument('--detalle', choices=('basic', 'full', 'adaptive'), default='adaptive')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sesion.rtr')
+
+        # Sin grabar, como referencia del costo de los colectores
+        fake = FakePsutil(num_processes=args.procesos, churn=args.churn)
+        resources = Resources(process_detail=args.detalle, backends=Backends(
+            psutil_module=fake, nvml_module=FakeNvml(), clock=fake.clock))
+        collectors = build_collectors(COLLECTORS, 1, resources)
+        inicio = time.perf_counter()
+        run_ticks(fake, collectors, args.ticks)
+        live = time.perf_counter() - inicio
+        resources.close()
+
+        fake = FakePsutil(num_processes=args.procesos, churn=args.churn)
+        base = Backends(psutil_module=fake, nvml_module=FakeNvml(), clock=fake.clock)
+        recorder = TraceRecorder(path, meta={'collectors': COLLECTORS})
+        resources = Resources(process_detail=args.detalle, backends=recorder.backends(base))
+        recorded = []
+        collectors = resources.backends.collectors(
+            capturing(build_collectors(COLLECTORS, 1, resources), recorded))
+        inicio = time.perf_counter()
+        run_ticks(fake, collectors, args.ticks)
+        recording = time.perf_counter() - inicio
+        resources.close()
+        recorder.close()
+        size = os.path.getsize(path)
+
+        replayer = TraceReplayer(path)
+        resources = Resources(process_detail=args.detalle, backends=replayer.backends())
+        replayed = []
+        inicio = time.perf_counter()
+        replayer.run(capturing(build_collectors(COLLECTORS, 1, resources), replayed), SnapshotPublisher())
+        replay = time.perf_counter() - inicio
+        resources.close()
+        replayer.close()
+
+    mismatches = sum(1 for a, b in zip(recorded, replayed) if a != b) + abs(len(recorded) - len(replayed))
+    print(f"{args.procesos} procesos, churn {args.churn}, {args.ticks} ticks, {len(COLLECTORS)} colectores, "
+          f"detalle {args.detalle}")
+    print(f"sin grabar:  {live * 1000 / args.ticks:.2f} ms por tick")
+    print(f"grabando:    {recording * 1000 / args.ticks:.2f} ms por tick, {recorder.records} registros, "
+          f"{size / 1024:.0f} KiB ({size / args.ticks / 1024:.1f} KiB por tick)")
+    print(f"reproducir:  {replay * 1000 / args.ticks:.2f} ms por tick ({recording / replay:.1f}x la grabación)")
+    print(f"lecturas: {len(recorded)} grabadas, {len(replayed)} reproducidas, {mismatches} distintas")
+
+
+if __name__ == '__main__':
+    main()
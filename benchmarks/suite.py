@@ -0,0 +1,381 @@
+# Suite de benchmarks reproducible: colectores contra los backends falsos
+# (FakePsutil, FakeWmi, FakeNvml, sysfs falso), ranking con 500, 5k y 50k
+# procesos sintéticos, historial (append y cortes) y tiempo por cuadro de las
+# gráficas. Cada caso se calibra para que una ronda dure al menos --tiempo-min
+# segundos y se reporta el mínimo y la mediana de --rondas rondas en ns por
+# operación. Cada caso arranca con las semillas fijas y el recolector de
+# basura apagado mientras se mide.
+#   python -m benchmarks.suite -o resultados.json
+#   python -m benchmarks.suite --comparar base.json --umbral 10
+# Con --comparar termina con código 1 si algún caso es más lento que en el
+# archivo base por más del umbral (en porcentaje, sobre el mínimo, que es lo
+# menos sensible al ruido de la máquina) y la diferencia pasa del ruido
+# medido (la suma de las desviaciones estándar). Comparar requiere al menos
+# MIN_RONDAS rondas en las dos corridas, y un caso que parece más lento se
+# vuelve a medir hasta --reintentos veces (una racha lenta de la máquina
+# afecta todas las rondas seguidas) antes de marcarlo como regresión.
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_ranking import synthetic_table
+from rendimiento.almacenamiento import CapacityPoller, DiskIoCollector
+from rendimiento.cpu import CpuSampler
+from rendimiento.falsos import FakeGpu, FakeNvml, FakePsutil, FakeWmi, write_fake_sysfs
+from rendimiento.gpu_procesos import GpuProcessAccounting
+from rendimiento.grupos import ProcessGroups
+from rendimiento.historial import MetricHistory
+from rendimiento.procesos import ProcessRegistry
+from rendimiento.ranking import RANKING_KEYS, rank_processes, top_processes
+from rendimiento.red import NetworkRateCollector
+from rendimiento.rollup import MultiResolutionHistory
+from rendimiento.sensores import HwmonProvider, WmiSensorProvider
+from rendimiento.sesiones import NvmlSession, WmiSession
+
+SEED = 0
+MIN_RONDAS = 5
+
+HISTORY_METRICS = ('cpu', 'memory', 'gpu', 'cpu_temperature', 'gpu_temperature', 'net_recv', 'net_sent')
+
+# nombre: función que prepara el caso y regresa (operación, limpieza o None)
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+@case('collector.cpu')
+def _cpu():
+    fake = FakePsutil()
+    sampler = CpuSampler(cpu_times=fake.cpu_times)
+
+    def op():
+        fake.advance()
+        sampler.sample()
+    return op, None
+
+
+@case('collector.network')
+def _network():
+    fake = FakePsutil()
+    collector = NetworkRateCollector(net_io_counters=fake.net_io_counters, clock=fake.clock)
+
+    def op():
+        fake.advance()
+        collector.sample()
+    return op, None
+
+
+@case('collector.disk_io')
+def _disk_io():
+    fake = FakePsutil()
+    collector = DiskIoCollector(fake.disk_io_counters, clock=fake.clock)
+
+    def op():
+        fake.advance()
+        collector.sample()
+    return op, None
+
+
+@case('collector.storage')
+def _storage():
+    fake = FakePsutil()
+    poller = CapacityPoller(fake.disk_partitions, fake.disk_usage)
+    return poller.poll, poller.close
+
+
+def _process_case(detail, churn=2, groups=False, num_procesos=500):
+    def setup():
+        fake = FakePsutil(num_processes=num_procesos, churn=churn)
+        registry = ProcessRegistry(pids=fake.pids, process_factory=fake.Process,
+                                   virtual_memory=fake.virtual_memory, detail=detail, clock=fake.clock)
+        aggregator = ProcessGroups(registry, mode='tree') if groups else None
+        registry.update()
+
+        def op():
+            fake.advance()
+            top_processes(registry, 5, keys=('cpu', 'rss'))
+            if aggregator is not None:
+                aggregator.update()
+                rank_processes(aggregator.groups(), 5, ('cpu',))
+        return op, None
+    return setup
+
+
+case('collector.top_processes.basic')(_process_case('basic'))
+case('collector.top_processes.adaptive')(_process_case('adaptive'))
+case('collector.top_processes.full')(_process_case('full'))
+# Con 5k procesos el detalle de todos ya no cabe en el presupuesto y el modo
+# adaptativo sólo detalla candidatos y un turno; con 500 detalla todos como full
+case('collector.top_processes.adaptive.5k')(_process_case('adaptive', num_procesos=5000))
+case('collector.top_processes.full.5k')(_process_case('full', num_procesos=5000))
+case('collector.top_groups')(_process_case('basic', groups=True))
+
+
+@case('collector.gpu_processes')
+def _gpu_processes():
+    processes = [(pid, 256 * 1024**2) for pid in range(100, 140)]
+    samples = [(pid, 10 + pid, pid % 50, pid % 20) for pid in range(100, 140)]
+    nvml = FakeNvml([FakeGpu(compute_processes=processes[:20], graphics_processes=processes[20:],
+                             process_samples=samples)])
+    accounting = GpuProcessAccounting(NvmlSession(nvml))
+    return accounting.collect, None
+
+
+@case('collector.gpu')
+def _gpu():
+    session = NvmlSession(FakeNvml())
+
+    def op():
+        session.call('nvmlDeviceGetUtilizationRates', 0)
+        session.call('nvmlDeviceGetTemperature', 0, session.nvml.NVML_TEMPERATURE_GPU)
+    return op, session.close
+
+
+@case('collector.sensors.wmi')
+def _sensors_wmi():
+    session = WmiSession(FakeWmi())
+    provider = WmiSensorProvider(session)
+    return provider.read, session.close
+
+
+@case('collector.sensors.hwmon')
+def _sensors_hwmon():
+    directory = tempfile.TemporaryDirectory()
+    hwmon_root, thermal_root = write_fake_sysfs(directory.name)
+    provider = HwmonProvider(hwmon_root, thermal_root)
+
+    def cleanup():
+        provider.close()
+        directory.cleanup()
+    return provider.read, cleanup
+
+
+def _ranking_case(num_procesos):
+    def setup():
+        rows = synthetic_table(num_procesos)
+        keys = tuple(RANKING_KEYS)
+        return (lambda: rank_processes(rows, 5, keys)), None
+    return setup
+
+
+for _size in (500, 5000, 50000):
+    case(f'ranking.top5.{_size}')(_ranking_case(_size))
+
+
+def _filled_history(capacity):
+    rnd = np.random.default_rng(0)
+    history = MetricHistory(HISTORY_METRICS, capacity=capacity)
+    for i in range(capacity):
+        history.append(rnd.uniform(0, 100, len(HISTORY_METRICS)), timestamp=float(i))
+    return history
+
+
+@case('history.append')
+def _history_append():
+    history = _filled_history(3600)
+    values = dict.fromkeys(HISTORY_METRICS, 50.0)
+    clock = iter(range(10**9))
+    return (lambda: history.append(values, timestamp=float(next(clock)))), None
+
+
+@case('history.slice')
+def _history_slice():
+    history = _filled_history(3600)
+
+    def op():
+        history.timestamps(600)
+        for metric in HISTORY_METRICS:
+            history.series(metric, 600)
+    return op, None
+
+
+@case('history.rollup_append')
+def _rollup_append():
+    rollups = MultiResolutionHistory(HISTORY_METRICS)
+    values = dict.fromkeys(HISTORY_METRICS, 50.0)
+    clock = iter(range(10**9))
+    return (lambda: rollups.append(values, timestamp=float(next(clock)))), None
+
+
+@case('history.rollup_query')
+def _rollup_query():
+    rollups = MultiResolutionHistory(HISTORY_METRICS)
+    for i in range(86400):
+        rollups.append(dict.fromkeys(HISTORY_METRICS, float(i % 100)), timestamp=float(i))
+    return (lambda: rollups.query('cpu', 86400, max_points=1000, now=86400.0)), None
+
+
+def _chart_case(full):
+    def setup():
+        import matplotlib
+        matplotlib.use('Agg')
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        from rendimiento.graficos import MetricChart
+
+        figure = Figure(figsize=(8, 6))
+        FigureCanvasAgg(figure)
+        chart = MetricChart(figure)
+        history = _filled_history(3600)
+        chart.update_from_history(history)
+
+        def op():
+            if full:
+                # Forzar el dibujo completo como cuando cambian los ejes
+                chart._background = None
+            chart.update_from_history(history)
+        return op, None
+    return setup
+
+
+case('chart.frame.blit')(_chart_case(False))
+case('chart.frame.full')(_chart_case(True))
+
+
+def run_case(setup, rondas, tiempo_min):
+    random.seed(SEED)
+    np.random.seed(SEED)
+    gc.collect()
+    op, cleanup = setup()
+    gc.collect()
+    gc.disable()
+    try:
+        op()
+        # Calibración: duplicar las repeticiones hasta que una ronda dure
+        # al menos tiempo_min
+        number = 1
+        while True:
+            inicio = time.perf_counter_ns()
+            for _ in range(number):
+                op()
+            elapsed = time.perf_counter_ns() - inicio
+            if elapsed >= tiempo_min * 1e9 or number >= 1 << 20:
+                break
+            number *= 2
+        tiempos = []
+        for _ in range(rondas):
+            inicio = time.perf_counter_ns()
+            for _ in range(number):
+                op()
+            tiempos.append((time.perf_counter_ns() - inicio) / number)
+    finally:
+        gc.enable()
+        if cleanup is not None:
+            cleanup()
+    return {'median_ns': statistics.median(tiempos), 'min_ns': min(tiempos),
+            'stdev_ns': statistics.stdev(tiempos) if len(tiempos) > 1 else 0.0,
+            'rounds': rondas, 'number': number}
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def metadata():
+    return {'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(), 'cpu_count': os.cpu_count(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, base, umbral):
+    # Lista de (caso, base, actual, cambio %) y los que rebasan el umbral
+    rows = []
+    regressions = []
+    for name, result in results.items():
+        previous = base.get(name)
+        if previous is None:
+            continue
+        change = (result['min_ns'] / previous['min_ns'] - 1) * 100
+        rows.append((name, previous['min_ns'], result['min_ns'], change))
+        noise = result['stdev_ns'] + previous['stdev_ns']
+        if change > umbral and result['min_ns'] - previous['min_ns'] > noise:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_ns(ns):
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('us', 1e3)):
+        if ns >= scale:
+            return f'{ns / scale:.2f} {unit}'
+    return f'{ns:.0f} ns'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-o', '--salida', default=None, help='archivo JSON con los resultados')
+    parser.add_argument('--comparar', default=None, metavar='BASE', help='JSON de una corrida anterior')
+    parser.add_argument('--umbral', type=float, default=10.0, help='regresión máxima permitida en %%')
+    parser.add_argument('--filtro', nargs='*', default=[], help='sólo los casos que contengan alguno')
+    parser.add_argument('--rondas', type=int, default=7)
+    parser.add_argument('--tiempo-min', type=float, default=0.05, help='segundos mínimos por ronda')
+    parser.add_argument('--reintentos', type=int, default=2,
+                        help='veces que se vuelve a medir un caso que parece regresión')
+    parser.add_argument('--lista', action='store_true', help='listar los casos y salir')
+    args = parser.parse_args()
+    if args.comparar and args.rondas < MIN_RONDAS:
+        parser.error(f"--comparar requiere --rondas {MIN_RONDAS} o más")
+
+    names = [name for name in CASES if not args.filtro or any(text in name for text in args.filtro)]
+    if args.lista:
+        print('\n'.join(names))
+        return
+
+    results = {}
+    for name in names:
+        results[name] = run_case(CASES[name], args.rondas, args.tiempo_min)
+        result = results[name]
+        print(f"{name:<36} {format_ns(result['min_ns']):>10}  (mediana {format_ns(result['median_ns'])}, "
+              f"{result['number']} x {result['rounds']})")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as file:
+            json.dump({'meta': metadata(), 'results': results}, file, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as file:
+            base = json.load(file)
+        few = [name for name, result in base['results'].items() if result['rounds'] < MIN_RONDAS]
+        if few:
+            raise SystemExit(f"{args.comparar} tiene menos de {MIN_RONDAS} rondas en: {', '.join(few)}")
+        rows, regressions = compare(results, base['results'], args.umbral)
+        for _ in range(args.reintentos):
+            if not regressions:
+                break
+            for name in regressions:
+                # Se queda la medición más rápida
+                result = run_case(CASES[name], args.rondas, args.tiempo_min)
+                if result['min_ns'] < results[name]['min_ns']:
+                    results[name] = result
+            rows, regressions = compare(results, base['results'], args.umbral)
+        print(f"\ncontra {args.comparar} (commit {base['meta'].get('commit')}), umbral {args.umbral:.0f}%:")
+        for name, previous, current, change in rows:
+            mark = '  REGRESIÓN' if name in regressions else ''
+            print(f"{name:<36} {format_ns(previous):>10} -> {format_ns(current):>10}  {change:+6.1f}%{mark}")
+        if regressions:
+            print(f"ERROR: {len(regressions)} caso(s) más lentos que el umbral: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# Paquete con los colectores y utilidades del monitor de rendimiento.
+# Los scripts BuenoBueno* lo importan desde la raíz del repositorio.
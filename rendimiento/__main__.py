@@ -0,0 +1,270 @@
+import argparse
+import os
+import sys
+
+from rendimiento.colectores import CATALOG, DEFAULT_COLLECTORS, Resources, build_collectors
+from rendimiento.salida import WRITERS
+
+# Modo sin interfaz:
+#   python -m rendimiento collect --interval 1 --duration 60 --format jsonl
+#   python -m rendimiento collect --collectors cpu,memory,network --format csv -o datos.csv
+#   python -m rendimiento collect --record sesion.rtr -d 600
+#   python -m rendimiento replay sesion.rtr --speed 0 --format csv -o datos.csv
+# Los colectores corren en el núcleo de asyncio con horario fijo sobre el
+# reloj monotónico del loop (sin deriva); cada intervalo se escribe un
+# registro con la última lectura de cada colector. asyncio y los backends
+# (WMI, NVML, la tabla de procesos) se importan hasta que se necesitan, así
+# `--help` o un solo colector barato arrancan rápido; ver
+# benchmarks/bench_arranque. replay vuelve a pasar una traza grabada con
+# --record (rendimiento.traza) por los mismos colectores y escritores.
+
+# Retraso del primer registro en intervalos: los colectores corren en 0, 1,
+# 2... intervalos y los registros medio intervalo después de cada turno,
+# cuando ya se publicó lo de ese turno. Se empieza con el turno 1 porque el
+# turno 0 sólo cubre el rato entre Resources.prime() y el arranque
+RECORD_PHASE = 1.5
+
+
+def parse_collectors(text):
+    names = [name.strip() for name in text.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CATALOG]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"colectores desconocidos: {', '.join(unknown)} "
+                                         f"(disponibles: {', '.join(CATALOG)})")
+    return names
+
+
+def parse_listen(text):
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def parse_group_pattern(text):
+    name, separator, pattern = text.partition('=')
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"se esperaba NOMBRE=REGEX: {text}")
+    return name, pattern
+
+
+def add_output_arguments(command):
+    command.add_argument('-n', '--count', type=int, default=None, help='terminar después de N registros')
+    command.add_argument('-f', '--format', choices=sorted(WRITERS), default='jsonl')
+    command.add_argument('-o', '--output', default='-', help="archivo de salida o '-' para stdout")
+    command.add_argument('--line-buffered', action='store_true',
+                         help='vaciar el buffer en cada registro (para seguir la salida con tail o una tubería)')
+    command.add_argument('--listen', type=parse_listen, default=None, metavar='[HOST:]PORT',
+                         help='servir también /metrics para Prometheus')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m rendimiento')
+    commands = parser.add_subparsers(dest='command', required=True)
+    collect = commands.add_parser('collect', help='recolecta métricas y las escribe como registros')
+    collect.add_argument('-i', '--interval', type=float, default=1.0, help='segundos entre registros')
+    collect.add_argument('-d', '--duration', type=float, default=None,
+                         help='segundos de ejecución (por omisión hasta Ctrl+C)')
+    collect.add_argument('-c', '--collectors', type=parse_collectors, default=list(DEFAULT_COLLECTORS),
+                         help=f"lista separada por comas de: {', '.join(CATALOG)}")
+    add_output_arguments(collect)
+    collect.add_argument('--processes', type=int, default=5, help='procesos o grupos en top_processes y top_groups')
+    collect.add_argument('--process-detail', choices=('basic', 'full', 'adaptive'), default='adaptive',
+                         help='E/S, hilos, descriptores y cambios de contexto: ninguno, de todos los '
+                              'procesos o sólo de los candidatos al top dentro de un presupuesto de CPU')
+    collect.add_argument('--group-by', choices=('name', 'tree', 'cmdline', 'cgroup'), default='tree',
+                         help='cómo se agrupan los procesos en top_groups')
+    collect.add_argument('--group-pattern', type=parse_group_pattern, action='append', default=[],
+                         metavar='NOMBRE=REGEX', help='patrón de línea de comandos para --group-by cmdline')
+    collect.add_argument('--profile', default=None, metavar='ARCHIVO',
+                         help='guardar un perfil de cProfile (pstats) de toda la ejecución')
+    collect.add_argument('--record', default=None, metavar='TRAZA',
+                         help='grabar las respuestas de psutil, WMI, NVML y los sensores para reproducirlas '
+                              'después con replay')
+
+    replay = commands.add_parser('replay', help='reproduce una traza grabada con collect --record')
+    replay.add_argument('trace', metavar='TRAZA')
+    replay.add_argument('--speed', type=float, default=0.0,
+                        help='1 al ritmo original, 2 al doble; 0 (por omisión) tan rápido como se pueda')
+    replay.add_argument('-i', '--interval', type=float, default=None,
+                        help='segundos de la traza entre registros (por omisión los de la grabación)')
+    replay.add_argument('-c', '--collectors', type=parse_collectors, default=None,
+                        help='subconjunto de los colectores grabados (por omisión todos)')
+    add_output_arguments(replay)
+    return parser
+
+
+def open_output(path, binary):
+    if path == '-':
+        return sys.stdout.buffer if binary else sys.stdout
+    if binary:
+        return open(path, 'wb', buffering=1 << 16)
+    return open(path, 'w', buffering=1 << 16, encoding='utf-8', newline='')
+
+
+class RecordSink:
+    # Consumidor que escribe un registro con la última lectura de cada
+    # colector; lo comparten collect y replay. stop detiene la fuente al
+    # llegar a --count, si se cierra la tubería o si falla la escritura. Los
+    # demás errores del escritor (un valor que no se puede serializar) se
+    # propagan y detienen la fuente con ellos.
+
+    def __init__(self, args, names, stop):
+        self.stream = open_output(args.output, args.format == 'binary')
+        self.writer = WRITERS[args.format](self.stream, line_buffered=args.line_buffered)
+        self.names = names
+        self.count = args.count
+        self.stop = stop
+        self.written = 0
+        self.broken_pipe = False
+        self.error = None
+
+    def __call__(self, snapshot):
+        record = {'ts': snapshot.timestamp}
+        for name in self.names:
+            record[name] = snapshot.value(name)
+        try:
+            self.writer.write(record)
+        except BrokenPipeError:
+            # La tubería se cerró (por ejemplo `| head`): se termina sin error
+            self.broken_pipe = True
+            self.stop()
+            return
+        except OSError as error:
+            # Disco lleno, archivo inaccesible: finish() termina con error
+            self.error = error
+            self.stop()
+            return
+        self.written += 1
+        if self.count is not None and self.written >= self.count:
+            self.stop()
+
+    def close(self):
+        if not self.broken_pipe and self.error is None:
+            self.writer.close()
+        if self.stream not in (sys.stdout, sys.stdout.buffer):
+            try:
+                self.stream.close()
+            except OSError:
+                # El buffer pendiente falla igual que la escritura original
+                if self.error is None:
+                    raise
+
+    def finish(self):
+        if self.broken_pipe:
+            # Lo que quedó en el buffer va a devnull para que el cierre de
+            # stdout al salir no lance otro BrokenPipeError
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        elif self.error is not None:
+            raise SystemExit(f"no se pudo escribir la salida: {self.error}")
+
+
+def start_exporter(args, publisher):
+    if args.listen is None:
+        return None
+    from rendimiento.exportador import MetricsExporter
+    host, port = args.listen
+    exporter = MetricsExporter(publisher, host=host, port=port)
+    exporter.start()
+    return exporter
+
+
+def collect(args):
+    import asyncio
+
+    from rendimiento.asincrono import AsyncCollectionCore
+    from rendimiento.instrumentacion import Instrumentation, RunProfiler
+
+    if args.interval <= 0:
+        raise SystemExit("--interval debe ser mayor que cero")
+    instrumentation = Instrumentation()
+    profiler = RunProfiler() if args.profile else None
+    recorder = None
+    if args.record:
+        from rendimiento.traza import TraceRecorder
+        # Lo necesario para que replay arme los mismos colectores
+        recorder = TraceRecorder(args.record, meta={
+            'collectors': args.collectors, 'interval': args.interval, 'processes': args.processes,
+            'process_detail': args.process_detail, 'group_by': args.group_by,
+            'group_patterns': args.group_pattern})
+    resources = Resources(num_processes=args.processes, process_detail=args.process_detail,
+                          group_by=args.group_by, group_patterns=args.group_pattern,
+                          instrumentation=instrumentation,
+                          backends=recorder.backends() if recorder else None)
+    collectors = resources.backends.collectors(build_collectors(args.collectors, args.interval, resources))
+    resources.prime(args.collectors)
+    core = AsyncCollectionCore(collectors, instrumentation=instrumentation,
+                               thread_initializer=profiler.enable_thread if profiler else None)
+    sink = RecordSink(args, args.collectors, core.stop)
+    core.add_consumer(sink, args.interval, delay=args.interval * RECORD_PHASE)
+    exporter = start_exporter(args, core.publisher)
+
+    try:
+        asyncio.run(core.run(duration=args.duration))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        resources.close()
+        if recorder is not None:
+            recorder.close()
+        sink.close()
+        if profiler is not None:
+            profiler.dump(args.profile)
+    sink.finish()
+
+
+def replay(args):
+    from rendimiento.instrumentacion import Instrumentation
+    from rendimiento.motor import SnapshotPublisher
+    from rendimiento.traza import TraceMissing, TraceReplayer
+
+    try:
+        replayer = TraceReplayer(args.trace)
+    except (OSError, ValueError) as error:
+        raise SystemExit(f"no se pudo abrir la traza: {error}")
+    meta = replayer.meta
+    names = args.collectors or meta.get('collectors', DEFAULT_COLLECTORS)
+    interval = args.interval or meta.get('interval', 1.0)
+    # La tabla de procesos se arma como al grabar: otro modo de detalle
+    # pediría datos que no están en la traza. Lo que falte en meta (trazas
+    # viejas de la interfaz) toma los valores por omisión de collect
+    resources = Resources(num_processes=meta.get('processes', 5),
+                          process_detail=meta.get('process_detail', 'adaptive'),
+                          group_by=meta.get('group_by', 'tree'),
+                          group_patterns=[tuple(item) for item in meta.get('group_patterns', ())],
+                          instrumentation=Instrumentation(), backends=replayer.backends())
+    try:
+        resources.prime(names)
+    except TraceMissing:
+        # Traza grabada sin las lecturas de referencia: las tasas se crean
+        # en la primera lectura, como al grabar
+        pass
+    # Los registros llevan la hora de la grabación, no la de la reproducción
+    publisher = SnapshotPublisher(clock=lambda: replayer.now)
+    sink = RecordSink(args, names, replayer.stop)
+    exporter = start_exporter(args, publisher)
+
+    try:
+        replayer.run(build_collectors(names, interval, resources), publisher, speed=args.speed,
+                     consumers=[(sink, interval, interval * RECORD_PHASE)])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        resources.close()
+        replayer.close()
+        sink.close()
+    sink.finish()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'collect':
+        collect(args)
+    elif args.command == 'replay':
+        replay(args)
+
+
+if __name__ == '__main__':
+    main()
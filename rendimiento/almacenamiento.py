@@ -0,0 +1,232 @@
+import collections
+import concurrent.futures
+import os
+import re
+import time
+
+import psutil
+
+# Almacenamiento en dos partes:
+#   - CapacityPoller consulta disk_usage de cada punto de montaje con un
+#     periodo lento y un timeout por montaje; una unidad de red caída o un
+#     lector USB lento sólo deja su fila como obsoleta con el último valor, y
+#     no se lanza otra consulta sobre ella hasta que la anterior termine.
+#   - DiskIoCollector calcula IOPS, MB/s, ocupación, cola promedio y latencia
+#     promedio (await) por disco a partir de la diferencia entre dos lecturas
+#     de disk_io_counters(perdisk=True), sin bloquear.
+# Los sistemas de archivos virtuales (proc, tmpfs, overlay, ...) y los
+# montajes duplicados del mismo dispositivo (bind mounts, snaps) se descartan.
+
+PSEUDO_FSTYPES = frozenset((
+    'autofs', 'binfmt_misc', 'bpf', 'cgroup', 'cgroup2', 'configfs', 'debugfs', 'devpts',
+    'devtmpfs', 'efivarfs', 'fusectl', 'hugetlbfs', 'mqueue', 'nsfs', 'overlay', 'proc',
+    'pstore', 'ramfs', 'rpc_pipefs', 'securityfs', 'selinuxfs', 'squashfs', 'sysfs',
+    'tmpfs', 'tracefs',
+))
+
+# Dispositivos de bloque que no son discos reales
+PSEUDO_DISKS = re.compile(r'^(loop|ram|zram|dm-|md|sr|fd)\d')
+
+# sda1 -> sda, nvme0n1p2 -> nvme0n1, mmcblk0p1 -> mmcblk0
+_PARTITION = re.compile(r'^(.*\D)(\d+)$')
+
+# Win32_DiskPartition.DeviceID "Disk #0, Partition #1" -> disco 0, y la
+# DeviceID dentro de una ruta de WMI (...Win32_LogicalDisk.DeviceID="C:")
+_WMI_DISK = re.compile(r'Disk #(\d+)')
+_WMI_DEVICE_ID = re.compile(r'DeviceID="([^"]*)"')
+
+MountUsage = collections.namedtuple('MountUsage', ('device', 'mountpoint', 'fstype', 'total', 'used',
+                                                   'free', 'percent', 'stale'))
+
+DiskRates = collections.namedtuple('DiskRates', ('read_iops', 'write_iops', 'read_mb_s', 'write_mb_s',
+                                                 'busy_percent', 'queue_depth', 'await_ms'))
+DiskIoSample = collections.namedtuple('DiskIoSample', ('total', 'per_disk', 'interval'))
+
+ZERO_DISK_RATES = DiskRates(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def usable_partitions(partitions):
+    # Una fila por dispositivo físico: se queda con el punto de montaje más
+    # corto (/ antes que /var/snap/...) y descarta los virtuales
+    by_device = {}
+    for partition in partitions:
+        if not partition.fstype or partition.fstype in PSEUDO_FSTYPES:
+            continue
+        current = by_device.get(partition.device)
+        if current is None or len(partition.mountpoint) < len(current.mountpoint):
+            by_device[partition.device] = partition
+    return sorted(by_device.values(), key=lambda partition: partition.mountpoint)
+
+
+class CapacityPoller:
+
+    def __init__(self, disk_partitions=psutil.disk_partitions, disk_usage=psutil.disk_usage,
+                 timeout=2.0, max_workers=4):
+        self._disk_partitions = disk_partitions
+        self._disk_usage = disk_usage
+        self.timeout = timeout
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix='capacidad')
+        self._pending = {}
+        self._last = {}
+
+    def poll(self):
+        partitions = usable_partitions(self._disk_partitions(all=False))
+        futures = {}
+        for partition in partitions:
+            mountpoint = partition.mountpoint
+            pending = self._pending.get(mountpoint)
+            if pending is None or pending.done():
+                pending = self._executor.submit(self._disk_usage, mountpoint)
+                self._pending[mountpoint] = pending
+            futures[mountpoint] = pending
+        # Un solo plazo para todos: los montajes se consultan en paralelo
+        concurrent.futures.wait(futures.values(), timeout=self.timeout)
+
+        rows = []
+        for partition in partitions:
+            future = futures[partition.mountpoint]
+            usage = None
+            if future.done():
+                del self._pending[partition.mountpoint]
+                try:
+                    usage = future.result()
+                except OSError:
+                    usage = None
+            if usage is not None:
+                row = MountUsage(partition.device, partition.mountpoint, partition.fstype,
+                                 usage.total, usage.used, usage.free, usage.percent, False)
+                self._last[partition.mountpoint] = row
+            else:
+                last = self._last.get(partition.mountpoint)
+                if last is None:
+                    row = MountUsage(partition.device, partition.mountpoint, partition.fstype,
+                                     None, None, None, None, True)
+                else:
+                    row = last._replace(stale=True)
+            rows.append(row)
+        return rows
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def physical_disks(names):
+    # Descarta las particiones cuyo disco también aparece (para no sumar dos
+    # veces el mismo tráfico) y los dispositivos virtuales
+    names = set(names)
+    disks = []
+    for name in names:
+        if PSEUDO_DISKS.match(name):
+            continue
+        match = _PARTITION.match(name)
+        if match and match.group(1) in names:
+            continue
+        if match and match.group(1).endswith('p') and match.group(1)[:-1] in names:
+            continue
+        disks.append(name)
+    return frozenset(disks)
+
+
+class DiskIoCollector:
+
+    def __init__(self, disk_io_counters=psutil.disk_io_counters, clock=time.monotonic):
+        self._disk_io_counters = disk_io_counters
+        self._clock = clock
+        self._previous = self._read()
+        self._previous_time = clock()
+        self._names = None
+        self._disks = frozenset()
+
+    def _read(self):
+        return self._disk_io_counters(perdisk=True) or {}
+
+    def disks(self, names):
+        # La lista de discos casi nunca cambia: se recalcula sólo si cambian
+        # los nombres
+        names = frozenset(names)
+        if names != self._names:
+            self._names = names
+            self._disks = physical_disks(names)
+        return self._disks
+
+    def sample(self):
+        current = self._read()
+        now = self._clock()
+        interval = now - self._previous_time
+        previous = self._previous
+        disks = self.disks(current)
+
+        per_disk = {}
+        totals = [0.0] * len(ZERO_DISK_RATES)
+        ops_total = 0
+        time_total = 0
+        for name, counters in current.items():
+            old = previous.get(name)
+            if old is None or interval <= 0 or old == counters:
+                per_disk[name] = ZERO_DISK_RATES
+                continue
+            reads = max(0, counters.read_count - old.read_count)
+            writes = max(0, counters.write_count - old.write_count)
+            read_bytes = max(0, counters.read_bytes - old.read_bytes)
+            write_bytes = max(0, counters.write_bytes - old.write_bytes)
+            # read_time y write_time en ms acumulados por todas las
+            # operaciones; busy_time sólo existe en Linux y FreeBSD
+            io_ms = max(0, counters.read_time - old.read_time) + max(0, counters.write_time - old.write_time)
+            busy_ms = max(0, getattr(counters, 'busy_time', 0) - getattr(old, 'busy_time', 0))
+            ops = reads + writes
+            rates = DiskRates(reads / interval, writes / interval,
+                              read_bytes / interval / 1024**2, write_bytes / interval / 1024**2,
+                              min(100.0, busy_ms / (interval * 10)),
+                              io_ms / (interval * 1000),
+                              io_ms / ops if ops else 0.0)
+            per_disk[name] = rates
+            if name in disks:
+                for i, value in enumerate(rates):
+                    totals[i] += value
+                ops_total += ops
+                time_total += io_ms
+
+        # La ocupación del total es la del disco más ocupado y la latencia el
+        # promedio ponderado por operaciones
+        busy = max((per_disk[name].busy_percent for name in disks if name in per_disk), default=0.0)
+        total = DiskRates(totals[0], totals[1], totals[2], totals[3], busy, totals[5],
+                          time_total / ops_total if ops_total else 0.0)
+        self._previous = current
+        self._previous_time = now
+        return DiskIoSample(total, per_disk, interval)
+
+
+def disk_name(device, disk_map=None):
+    # /dev/sda1 -> sda1, la clave de disk_io_counters en Linux; en Windows
+    # la clave es el disco físico (PhysicalDrive0) y C:\ se busca en el mapa
+    # de windows_disk_map
+    if disk_map:
+        return disk_map.get(device.rstrip('\\/').upper())
+    return os.path.basename(device)
+
+
+def _wmi_device_id(reference):
+    # El módulo wmi resuelve las referencias de una asociación a objetos; si
+    # llega la ruta como texto se toma la DeviceID de ahí
+    device_id = getattr(reference, 'DeviceID', None)
+    if device_id is None:
+        match = _WMI_DEVICE_ID.search(str(reference))
+        device_id = match.group(1) if match else ''
+    return device_id
+
+
+def windows_disk_map(wmi_session):
+    # Unidad lógica (C:) -> disco físico con el nombre de disk_io_counters,
+    # a partir de Win32_LogicalDiskToPartition; vacío si WMI no responde
+    disk_map = {}
+    try:
+        links = wmi_session.query('Win32_LogicalDiskToPartition')
+    except Exception:
+        return disk_map
+    for link in links:
+        match = _WMI_DISK.search(_wmi_device_id(link.Antecedent))
+        drive = _wmi_device_id(link.Dependent).upper()
+        if match and drive:
+            disk_map[drive] = f'PhysicalDrive{match.group(1)}'
+    return disk_map
@@ -0,0 +1,179 @@
+import asyncio
+import concurrent.futures
+import inspect
+import time
+
+from rendimiento.motor import Reading, SnapshotPublisher
+
+# Núcleo de recolección con asyncio. Cada colector declara su periodo y un
+# costo estimado en segundos por llamada:
+#   - las funciones async se esperan directamente en el loop;
+#   - las baratas (costo <= inline_cost) corren en el propio loop;
+#   - las caras o bloqueantes (WMI, discos, tabla de procesos) van a un
+#     ThreadPoolExecutor.
+# Si un colector sigue corriendo cuando llega su siguiente turno, ese turno se
+# fusiona con el que está en curso (coalesce) en lugar de encolarse. Los
+# consumidores (la consola, los exportadores) se registran con su propio
+# periodo y reciben la última instantánea; la interfaz Tk la lee con
+# publisher.latest. Así el ciclo de muestreo existe en un solo lugar. Si un
+# consumidor lanza una excepción el núcleo se detiene y run() la relanza.
+#
+# Con `instrumentation` (rendimiento.instrumentacion) cada colector se mide
+# como el tramo collector.<nombre> dentro del hilo donde corre, sin contar la
+# espera en el pool, y cada consumidor como consumer.<nombre>.
+# `thread_initializer` se llama en el hilo del loop y en cada hilo del pool
+# (por ejemplo RunProfiler.enable_thread).
+
+
+class AsyncCollectionCore:
+
+    def __init__(self, collectors, publisher=None, max_workers=4, inline_cost=0.001, instrumentation=None,
+                 thread_initializer=None):
+        self.collectors = list(collectors)
+        self.publisher = publisher or SnapshotPublisher()
+        self.inline_cost = inline_cost
+        self.instrumentation = instrumentation
+        self.thread_initializer = thread_initializer
+        self._funcs = {}
+        for collector in self.collectors:
+            func = collector.func
+            if instrumentation is not None and not inspect.iscoroutinefunction(func):
+                func = instrumentation.wrap(f'collector.{collector.name}', func)
+            self._funcs[collector.name] = func
+        self._max_workers = max_workers
+        self._executor = None
+        self._consumers = []
+        self._in_flight = {}
+        self._stopping = None
+        self._stop_requested = False
+        self._consumer_error = None
+        self.coalesced = {collector.name: 0 for collector in self.collectors}
+
+    def latest(self):
+        return self.publisher.latest
+
+    def add_consumer(self, callback, period, delay=None):
+        # callback(snapshot) cada `period` segundos, la primera vez después de
+        # `delay` segundos (por omisión un periodo); puede ser async
+        if self.instrumentation is not None and not inspect.iscoroutinefunction(callback):
+            name = getattr(callback, '__name__', type(callback).__name__)
+            callback = self.instrumentation.wrap(f'consumer.{name}', callback)
+        self._consumers.append((callback, period, period if delay is None else delay))
+
+    async def run(self, duration=None):
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if self._stop_requested:
+            self._stopping.set()
+        if self.thread_initializer is not None:
+            self.thread_initializer()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers,
+                                                               thread_name_prefix='colector',
+                                                               initializer=self.thread_initializer)
+        start = loop.time()
+        tasks = [asyncio.create_task(self._collector_loop(collector, start))
+                 for collector in self.collectors]
+        tasks += [asyncio.create_task(self._consumer_loop(callback, period, start + delay))
+                  for callback, period, delay in self._consumers]
+        try:
+            if duration is None:
+                await self._stopping.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), duration)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            pending = [future for future in self._in_flight.values() if not future.done()]
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self._in_flight.clear()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._consumer_error is not None:
+            error, self._consumer_error = self._consumer_error, None
+            raise error
+
+    def stop(self):
+        # Se debe llamar desde el hilo del loop (o con call_soon_threadsafe)
+        self._stop_requested = True
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _sleep_until(self, deadline):
+        delay = deadline - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _collector_loop(self, collector, start):
+        loop = asyncio.get_running_loop()
+        deadline = start
+        while True:
+            await self._sleep_until(deadline)
+            running = self._in_flight.get(collector.name)
+            if running is not None and not running.done():
+                self.coalesced[collector.name] += 1
+            else:
+                self._in_flight[collector.name] = asyncio.ensure_future(self._collect(collector))
+            if collector.period is None:
+                return
+            # Horario fijo; si el loop se atrasó más de un periodo se saltan
+            # los turnos perdidos
+            deadline += collector.period
+            now = loop.time()
+            if deadline < now:
+                deadline += ((now - deadline) // collector.period + 1) * collector.period
+
+    async def _collect(self, collector):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        func = self._funcs[collector.name]
+        try:
+            if inspect.iscoroutinefunction(func):
+                value = await asyncio.wait_for(func(), collector.timeout)
+                if self.instrumentation is not None:
+                    self.instrumentation.record(f'collector.{collector.name}',
+                                                int((time.perf_counter() - start) * 1e9))
+            elif collector.cost <= self.inline_cost:
+                value = func()
+            else:
+                future = loop.run_in_executor(self._executor, func)
+                # shield: al vencer el timeout el hilo sigue corriendo y el
+                # colector queda "en curso" hasta que termine, así no se
+                # lanzan más hilos sobre un sensor colgado
+                self._in_flight[collector.name] = future
+                value = await asyncio.wait_for(asyncio.shield(future), collector.timeout)
+        except asyncio.TimeoutError:
+            self.publisher.mark_stale(collector.name, 'timeout')
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            self.publisher.mark_stale(collector.name, repr(error))
+            return
+        self.publisher.publish(collector.name,
+                               Reading(value, time.time(), time.perf_counter() - start, False, None))
+
+    async def _consumer_loop(self, callback, period, first):
+        loop = asyncio.get_running_loop()
+        deadline = first
+        while True:
+            await self._sleep_until(deadline)
+            try:
+                result = callback(self.publisher.latest)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as error:
+                # gather(return_exceptions=True) la escondería: se guarda
+                # para relanzarla desde run() después de apagar todo
+                if self._consumer_error is None:
+                    self._consumer_error = error
+                self.stop()
+                return
+            deadline += period
+            now = loop.time()
+            if deadline < now:
+                deadline += ((now - deadline) // period + 1) * period
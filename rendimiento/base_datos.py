@@ -0,0 +1,255 @@
+import collections
+import queue
+import sqlite3
+import threading
+import time
+
+# Archivo de métricas en SQLite, alternativa simple a rendimiento.series. Un
+# hilo escritor junta las muestras en memoria y cada flush_interval segundos
+# las inserta en una sola transacción con executemany; las transacciones se
+# abren y cierran a mano (isolation_level=None), así el lote con su resumen y
+# su borrado se guarda completo o no se guarda. La base está en modo
+# WAL, así las lecturas no bloquean al escritor. Cada lote también actualiza
+# las tablas resumidas (conteo, suma, mínimo y máximo por minuto y por hora)
+# con UPSERT, sin volver a leer los datos crudos; sólo cuentan las muestras
+# que sí se insertaron, un timestamp repetido se ignora. Los datos crudos más viejos
+# que retention_seconds se borran en trozos de a lo más retention_chunk filas
+# por métrica en cada lote, para que el borrado nunca detenga la ingesta.
+# Requiere SQLite 3.24 o posterior (ON CONFLICT ... DO UPDATE).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    metric_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (metric_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    metric_id INTEGER NOT NULL,
+    bucket REAL NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (resolution, metric_id, bucket)
+) WITHOUT ROWID;
+"""
+
+_INSERT_SAMPLE = 'INSERT OR IGNORE INTO samples (metric_id, ts, value) VALUES (?, ?, ?)'
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollups (resolution, metric_id, bucket, count, sum, min, max) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, metric_id, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    sum = sum + excluded.sum,
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max)
+"""
+
+# Borra las filas más viejas que el corte, a lo más `chunk` por métrica: el
+# límite es el timestamp de la fila número `chunk` (o el corte si hay menos)
+_TRIM = """
+DELETE FROM samples WHERE metric_id = ? AND ts < MIN(?, COALESCE(
+    (SELECT ts FROM samples WHERE metric_id = ? ORDER BY ts LIMIT 1 OFFSET ?), ?))
+"""
+
+ROLLUP_RESOLUTIONS = (60, 3600)
+
+
+class SqliteSink:
+
+    def __init__(self, path, flush_interval=5.0, resolutions=ROLLUP_RESOLUTIONS,
+                 retention_seconds=7 * 86400, retention_chunk=5000, clock=time.time):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.resolutions = tuple(resolutions)
+        self.retention_seconds = retention_seconds
+        self.retention_chunk = retention_chunk
+        self._clock = clock
+        self._queue = queue.SimpleQueue()
+        self._metric_ids = {}
+        self._wake = threading.Event()
+        self._flushed = threading.Condition()
+        self._requested = 0
+        self._served = 0
+        self._stop = False
+        self._running = True
+        self._read_lock = threading.Lock()
+        self._reader = None
+        self.rows_written = 0
+        self.batches = 0
+        self.rows_trimmed = 0
+        self.last_error = None
+        # El esquema se crea antes de arrancar el hilo para que las consultas
+        # funcionen desde el principio
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+        self._thread = threading.Thread(target=self._run, name='escritor-sqlite', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # En WAL, NORMAL sólo arriesga la última transacción ante un corte de
+        # energía y evita un fsync por lote
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def append(self, values, timestamp=None):
+        # values = {métrica: valor}; los None se omiten. No bloquea: sólo
+        # encola la muestra para el escritor
+        if timestamp is None:
+            timestamp = self._clock()
+        self._queue.put((timestamp, values))
+
+    def flush(self, timeout=None):
+        # Pide al escritor que guarde lo pendiente y espera a que termine
+        with self._flushed:
+            self._requested += 1
+            requested = self._requested
+            self._wake.set()
+            self._flushed.wait_for(lambda: self._served >= requested or not self._running, timeout)
+
+    def _run(self):
+        connection = None
+        try:
+            connection = self._connect()
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                stopping = self._stop
+                self._write_batch(connection)
+                if stopping:
+                    return
+        finally:
+            if connection is not None:
+                connection.close()
+            # Si el hilo termina (por close o por un error) nadie más va a
+            # atender los flush pendientes
+            with self._flushed:
+                self._running = False
+                self._flushed.notify_all()
+
+    def _drain(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def _metric_id(self, connection, name):
+        metric_id = self._metric_ids.get(name)
+        if metric_id is None:
+            connection.execute('INSERT OR IGNORE INTO metrics (name) VALUES (?)', (name,))
+            metric_id = connection.execute('SELECT id FROM metrics WHERE name = ?', (name,)).fetchone()[0]
+            self._metric_ids[name] = metric_id
+        return metric_id
+
+    def _write_batch(self, connection):
+        # Las peticiones de flush hechas antes de vaciar la cola quedan
+        # atendidas con este lote
+        with self._flushed:
+            serving = self._requested
+        pending = self._drain()
+        try:
+            inserted = self._write_transaction(connection, pending, one_by_one=False)
+            if inserted is None:
+                inserted = self._write_transaction(connection, pending, one_by_one=True)
+            self.rows_written += len(inserted)
+        except Exception as error:
+            # El lote se pierde; los ids nuevos pudieron quedar en la
+            # transacción revertida. Cualquier error (no sólo de sqlite3)
+            # queda en last_error y el hilo sigue vivo
+            connection.rollback()
+            self.last_error = repr(error)
+            self._metric_ids.clear()
+        with self._flushed:
+            self.batches += 1
+            self._served = serving
+            self._flushed.notify_all()
+
+    def _write_transaction(self, connection, pending, one_by_one):
+        # Regresa las muestras que sí se insertaron. Lo normal es que entren
+        # todas y basta un executemany; si el conteo de cambios no cuadra, se
+        # deshace la transacción y regresa None para repetirla fila por fila
+        # y saber cuáles se ignoraron
+        connection.execute('BEGIN')
+        samples = []
+        for timestamp, values in pending:
+            for name, value in values.items():
+                # None y NaN no se guardan (SQLite convierte NaN en NULL)
+                if value is not None and value == value:
+                    samples.append((self._metric_id(connection, name), timestamp, float(value)))
+        # OR IGNORE: un timestamp repetido conserva la primera muestra y no
+        # entra al resumen, para no contarla dos veces
+        if one_by_one:
+            samples = [sample for sample in samples if connection.execute(_INSERT_SAMPLE, sample).rowcount]
+        else:
+            before = connection.total_changes
+            connection.executemany(_INSERT_SAMPLE, samples)
+            if connection.total_changes - before != len(samples):
+                connection.rollback()
+                # Los ids nuevos se fueron con la transacción
+                self._metric_ids.clear()
+                return None
+        connection.executemany(_UPSERT_ROLLUP, self._rollup_rows(samples))
+        self._trim(connection)
+        connection.execute('COMMIT')
+        return samples
+
+    def _rollup_rows(self, samples):
+        # Resume el lote en memoria: una fila por (resolución, métrica, intervalo)
+        buckets = collections.defaultdict(lambda: [0, 0.0, float('inf'), float('-inf')])
+        for metric_id, timestamp, value in samples:
+            for resolution in self.resolutions:
+                bucket = buckets[resolution, metric_id, timestamp // resolution * resolution]
+                bucket[0] += 1
+                bucket[1] += value
+                bucket[2] = min(bucket[2], value)
+                bucket[3] = max(bucket[3], value)
+        return [key + tuple(bucket) for key, bucket in buckets.items()]
+
+    def _trim(self, connection):
+        if self.retention_seconds is None:
+            return
+        cutoff = self._clock() - self.retention_seconds
+        # Todas las métricas de la tabla, no sólo las que ya vio este proceso
+        for (metric_id,) in connection.execute('SELECT id FROM metrics').fetchall():
+            cursor = connection.execute(_TRIM, (metric_id, cutoff, metric_id, self.retention_chunk, cutoff))
+            self.rows_trimmed += cursor.rowcount
+
+    def _read(self, sql, parameters):
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+            return self._reader.execute(sql, parameters).fetchall()
+
+    def query(self, name, start, end=None):
+        # [(ts, valor), ...] crudos con start <= ts < end
+        end = float('inf') if end is None else end
+        return self._read('SELECT ts, value FROM samples JOIN metrics ON metrics.id = samples.metric_id '
+                          'WHERE metrics.name = ? AND ts >= ? AND ts < ? ORDER BY ts', (name, start, end))
+
+    def query_rollup(self, name, resolution, start, end=None):
+        # [(inicio, promedio, mínimo, máximo), ...] desde la tabla resumida
+        end = float('inf') if end is None else end
+        return self._read('SELECT bucket, sum / count, min, max FROM rollups '
+                          'JOIN metrics ON metrics.id = rollups.metric_id '
+                          'WHERE resolution = ? AND metrics.name = ? AND bucket >= ? AND bucket < ? '
+                          'ORDER BY bucket', (resolution, name, start, end))
+
+    def close(self):
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
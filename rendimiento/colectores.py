@@ -0,0 +1,284 @@
+import threading
+import time
+
+import psutil
+
+from rendimiento.motor import Collector
+
+# Catálogo de colectores para el modo sin interfaz (python -m rendimiento).
+# Cada colector crea sus dependencias la primera vez que se usa, así un
+# `--collectors cpu,memory` no abre WMI ni NVML ni recorre los procesos, y
+# nada de aquí importa Tk ni matplotlib.
+
+
+class Backends:
+    # Las fuentes de datos de los colectores: psutil, los módulos wmi y
+    # pynvml (None: se importan al usarse) y los relojes. rendimiento.traza
+    # las reemplaza para grabar una sesión o reproducirla. wrap() recibe los
+    # objetos que leen el sistema por su cuenta (sensores, inventario) y
+    # collectors() la lista final de colectores del motor.
+
+    def __init__(self, psutil_module=psutil, wmi_module=None, nvml_module=None, clock=time.monotonic,
+                 cpu_clock=time.process_time):
+        self.psutil = psutil_module
+        self.wmi = wmi_module
+        self.nvml = nvml_module
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+
+    def load_wmi(self):
+        if self.wmi is None:
+            import wmi
+            self.wmi = wmi
+        return self.wmi
+
+    def load_nvml(self):
+        if self.nvml is None:
+            import pynvml
+            self.nvml = pynvml
+        return self.nvml
+
+    def wrap(self, channel, factory):
+        return factory()
+
+    def collectors(self, collectors):
+        return collectors
+
+
+class Resources:
+    # Objetos compartidos por los colectores, creados bajo demanda
+
+    def __init__(self, num_processes=5, process_detail='adaptive', group_by='tree', group_patterns=(),
+                 instrumentation=None, backends=None):
+        self.num_processes = num_processes
+        self.backends = backends or Backends()
+        self.instrumentation = instrumentation
+        self.process_detail = process_detail
+        self.group_by = group_by
+        self.group_patterns = group_patterns
+        self._objects = {}
+        # top_processes y top_groups comparten la tabla de procesos y pueden
+        # correr en hilos distintos del motor
+        self._process_lock = threading.Lock()
+        self._processes_at = None
+
+    def _get(self, name, factory):
+        value = self._objects.get(name)
+        if value is None:
+            value = self._objects[name] = factory()
+        return value
+
+    @property
+    def wmi_session(self):
+        from rendimiento.sesiones import WmiSession
+        return self._get('wmi_session', lambda: WmiSession(self.backends.wmi, clock=self.backends.clock))
+
+    @property
+    def nvml_session(self):
+        from rendimiento.sesiones import NvmlSession
+        return self._get('nvml_session', lambda: NvmlSession(self.backends.nvml, clock=self.backends.clock))
+
+    @property
+    def sensor_provider(self):
+        from rendimiento.sensores import default_provider
+        return self._get('sensor_provider', lambda: self.backends.wrap(
+            'sensors', lambda: default_provider(self.wmi_session)))
+
+    @property
+    def cpu_sampler(self):
+        from rendimiento.cpu import CpuSampler
+        return self._get('cpu_sampler', lambda: CpuSampler(self.backends.psutil.cpu_times))
+
+    @property
+    def network_rates(self):
+        from rendimiento.red import NetworkRateCollector
+        return self._get('network_rates', lambda: NetworkRateCollector(
+            self.backends.psutil.net_io_counters, clock=self.backends.clock))
+
+    @property
+    def disk_io(self):
+        from rendimiento.almacenamiento import DiskIoCollector
+        return self._get('disk_io', lambda: DiskIoCollector(
+            self.backends.psutil.disk_io_counters, clock=self.backends.clock))
+
+    def prime(self, names):
+        # Crea antes de arrancar el motor los objetos que calculan tasas entre
+        # dos lecturas (CPU, red, disco); cada uno toma su lectura de
+        # referencia al crearse y la primera muestra no sale en cero
+        if 'cpu' in names:
+            self.cpu_sampler
+        if 'network' in names:
+            self.network_rates
+        if 'disk_io' in names:
+            self.disk_io
+
+    @property
+    def capacity_poller(self):
+        from rendimiento.almacenamiento import CapacityPoller
+        return self._get('capacity_poller', lambda: CapacityPoller(
+            self.backends.psutil.disk_partitions, self.backends.psutil.disk_usage))
+
+    @property
+    def process_registry(self):
+        from rendimiento.procesos import ProcessRegistry
+        backends = self.backends
+        return self._get('process_registry', lambda: ProcessRegistry(
+            pids=backends.psutil.pids, process_factory=backends.psutil.Process,
+            virtual_memory=backends.psutil.virtual_memory, detail=self.process_detail,
+            detail_k=self.num_processes, clock=backends.clock, cpu_clock=backends.cpu_clock))
+
+    @property
+    def process_groups(self):
+        from rendimiento.grupos import ProcessGroups
+        return self._get('process_groups', lambda: ProcessGroups(
+            self.process_registry, mode=self.group_by, patterns=self.group_patterns))
+
+    def ranked_processes(self, source, keys, max_age=0.5):
+        # Actualiza la tabla (y los grupos) si la última lectura tiene más de
+        # max_age segundos y regresa el ranking convertido con la tabla
+        # bloqueada; source es 'processes' o 'groups'
+        from rendimiento.ranking import rank_processes
+
+        with self._process_lock:
+            registry = self.process_registry
+            groups = self.process_groups if source == 'groups' else self._objects.get('process_groups')
+            now = self.backends.clock()
+            if self._processes_at is None or now - self._processes_at >= max_age:
+                try:
+                    gpu_usage_by_pid = self.gpu_accounting.collect()
+                except Exception:
+                    # Sin NVML el ranking sigue funcionando con GPU en cero
+                    gpu_usage_by_pid = None
+                registry.update(gpu_usage_by_pid)
+                if groups is not None:
+                    groups.update()
+                self._processes_at = now
+            rows = groups.groups() if source == 'groups' else registry.rows()
+            return rank_processes(rows, self.num_processes, keys)
+
+    @property
+    def gpu_accounting(self):
+        from rendimiento.gpu_procesos import GpuProcessAccounting
+        return self._get('gpu_accounting', lambda: GpuProcessAccounting(self.nvml_session))
+
+    @property
+    def self_monitor(self):
+        from rendimiento.instrumentacion import SelfMonitor
+        return self._get('self_monitor', SelfMonitor)
+
+    @property
+    def inventory(self):
+        from rendimiento.inventario import InventoryCache, probe
+        return self._get('inventory', lambda: self.backends.wrap('inventory', lambda: InventoryCache(
+            probe=lambda: probe(self._objects.get('wmi_session'), self._objects.get('nvml_session')))))
+
+    def close(self):
+        for name in ('sensor_provider', 'capacity_poller', 'nvml_session', 'wmi_session'):
+            value = self._objects.pop(name, None)
+            if value is not None:
+                value.close()
+
+
+def get_cpu_usage(resources):
+    return resources.cpu_sampler.sample().total
+
+
+def get_memory_usage(resources):
+    memory = resources.backends.psutil.virtual_memory()
+    return round((memory.total - memory.available) / memory.total * 100, 1)
+
+
+def get_cpu_temperature(resources):
+    return resources.sensor_provider.cpu_temperature()
+
+
+def get_sensors(resources):
+    # Todas las temperaturas, ventiladores y voltajes: {chip/etiqueta: valor}
+    return resources.sensor_provider.read()
+
+
+def get_gpu_usage(resources):
+    return resources.nvml_session.call('nvmlDeviceGetUtilizationRates', 0).gpu
+
+
+def get_gpu_temperature(resources):
+    nvml_session = resources.nvml_session
+    return nvml_session.call('nvmlDeviceGetTemperature', 0, nvml_session.nvml.NVML_TEMPERATURE_GPU)
+
+
+def get_network_usage(resources):
+    return resources.network_rates.sample()
+
+
+def get_disk_io(resources):
+    return resources.disk_io.sample()
+
+
+def get_storage_usage(resources):
+    return resources.capacity_poller.poll()
+
+
+def _usage(row):
+    return {'cpu': round(row.cpu_percent, 1), 'memory': round(row.memory_percent, 1), 'gpu': row.gpu_percent,
+            'gpu_memory_mb': row.gpu_memory_mb, 'read_bytes_s': round(row.read_rate),
+            'write_bytes_s': round(row.write_rate), 'threads': row.num_threads, 'fds': row.num_fds,
+            'ctx_switches_s': round(row.ctx_switch_rate, 1)}
+
+
+def get_top_processes(resources):
+    rankings = resources.ranked_processes('processes', ('cpu',))
+    return [{'pid': row.pid, 'name': row.name, **_usage(row)} for row in rankings['cpu']]
+
+
+def get_top_groups(resources):
+    # Aplicaciones (navegador con sus hijos, pools de trabajadores) sumadas
+    rankings = resources.ranked_processes('groups', ('cpu',))
+    return [{'name': group.name, 'processes': group.count, **_usage(group)} for group in rankings['cpu']]
+
+
+def get_inventory(resources):
+    return resources.inventory.get()
+
+
+def get_self_usage(resources):
+    # CPU y memoria del propio monitor
+    return resources.self_monitor.sample()
+
+
+def get_spans(resources):
+    # p50/p95/p99 de cada colector y consumidor: {tramo: SpanSummary}
+    if resources.instrumentation is None:
+        return {}
+    return resources.instrumentation.summary()
+
+
+# nombre: (función, periodo mínimo en segundos o None para una sola vez, costo)
+CATALOG = {
+    'cpu': (get_cpu_usage, 0, 0.0001),
+    'memory': (get_memory_usage, 0, 0.0001),
+    'cpu_temperature': (get_cpu_temperature, 0, 0.01),
+    'sensors': (get_sensors, 0, 0.01),
+    'gpu': (get_gpu_usage, 0, 0.01),
+    'gpu_temperature': (get_gpu_temperature, 0, 0.01),
+    'network': (get_network_usage, 0, 0.0001),
+    'disk_io': (get_disk_io, 0, 0.0001),
+    'storage': (get_storage_usage, 30, 0.01),
+    'top_processes': (get_top_processes, 2, 0.01),
+    'top_groups': (get_top_groups, 2, 0.01),
+    'inventory': (get_inventory, None, 0.01),
+    'self': (get_self_usage, 0, 0.0001),
+    'spans': (get_spans, 0, 0.0001),
+}
+
+DEFAULT_COLLECTORS = ('cpu', 'memory', 'network', 'disk_io', 'storage', 'top_processes')
+
+
+def build_collectors(names, interval, resources):
+    collectors = []
+    for name in names:
+        if name not in CATALOG:
+            raise ValueError(f"colector desconocido: {name} (disponibles: {', '.join(CATALOG)})")
+        func, minimum, cost = CATALOG[name]
+        period = None if minimum is None else max(interval, minimum)
+        collectors.append(Collector(name, lambda func=func: func(resources), period=period, cost=cost))
+    return collectors
@@ -0,0 +1,78 @@
+import psutil
+
+# Modos que se reportan por separado. Los que no existen en la plataforma
+# (iowait y steal en Windows, por ejemplo) se reportan como 0.0
+CPU_MODES = ('user', 'system', 'idle', 'iowait', 'steal')
+
+
+class CpuSample:
+    __slots__ = ('total', 'per_core', 'modes')
+
+    def __init__(self, total, per_core, modes):
+        self.total = total
+        self.per_core = per_core
+        self.modes = modes
+
+    def __repr__(self):
+        return f"CpuSample(total={self.total:.1f}, per_core={self.per_core}, modes={self.modes})"
+
+
+def _all_time(times):
+    # En Linux guest y guest_nice ya están contados dentro de user y nice
+    total = sum(times)
+    total -= getattr(times, 'guest', 0.0)
+    total -= getattr(times, 'guest_nice', 0.0)
+    return total
+
+
+def _busy_time(times):
+    return _all_time(times) - times.idle - getattr(times, 'iowait', 0.0)
+
+
+def _percent(busy_delta, all_delta):
+    if all_delta <= 0:
+        return 0.0
+    percent = busy_delta / all_delta * 100
+    return round(min(max(percent, 0.0), 100.0), 1)
+
+
+class CpuSampler:
+    # Calcula el uso de CPU con la diferencia entre dos lecturas de cpu_times,
+    # así cada llamada regresa de inmediato en lugar de dormir como
+    # psutil.cpu_percent(interval=1). El primer valor se calcula contra la
+    # lectura tomada al crear el objeto.
+
+    def __init__(self, cpu_times=psutil.cpu_times):
+        self._cpu_times = cpu_times
+        self._last_total = cpu_times()
+        self._last_cores = cpu_times(percpu=True)
+        self._last_sample = CpuSample(0.0, [0.0] * len(self._last_cores),
+                                      dict.fromkeys(CPU_MODES, 0.0))
+
+    def sample(self):
+        total = self._cpu_times()
+        cores = self._cpu_times(percpu=True)
+
+        all_delta = _all_time(total) - _all_time(self._last_total)
+        if all_delta <= 0:
+            # Dos lecturas dentro del mismo tick del kernel: no hay delta
+            return self._last_sample
+
+        busy_delta = _busy_time(total) - _busy_time(self._last_total)
+        modes = {}
+        for mode in CPU_MODES:
+            mode_delta = getattr(total, mode, 0.0) - getattr(self._last_total, mode, 0.0)
+            modes[mode] = _percent(mode_delta, all_delta)
+
+        # Si cambia el número de núcleos (hot-plug) se reinicia la referencia
+        if len(cores) != len(self._last_cores):
+            self._last_cores = cores
+        per_core = []
+        for core, last_core in zip(cores, self._last_cores):
+            per_core.append(_percent(_busy_time(core) - _busy_time(last_core),
+                                     _all_time(core) - _all_time(last_core)))
+
+        self._last_total = total
+        self._last_cores = cores
+        self._last_sample = CpuSample(_percent(busy_delta, all_delta), per_core, modes)
+        return self._last_sample
@@ -0,0 +1,181 @@
+import collections
+import gzip
+import http.server
+import numbers
+import re
+import threading
+import time
+
+# Exportador HTTP en formato de texto de Prometheus, sólo con la biblioteca
+# estándar. El texto se genera a partir de la última instantánea del
+# publicador en un hilo propio (a lo más una vez cada min_interval segundos y
+# sólo si llegó una instantánea nueva) y se guarda ya codificado, también
+# comprimido con gzip. Un scrape sólo copia ese buffer: nunca llama a WMI,
+# NVML ni psutil, y su latencia no depende de cuántos scrapers haya.
+#
+# Los valores se convierten así:
+#   - un número es un gauge rendimiento_<colector>;
+#   - una namedtuple da un gauge por campo: rendimiento_<colector>_<campo>;
+#   - un dict {nombre: namedtuple} usa el nombre como etiqueta `device`.
+# Cada colector además reporta su antigüedad, duración y si está obsoleto.
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_INVALID = re.compile(r'[^a-zA-Z0-9_:]')
+
+
+def metric_name(*parts):
+    name = _INVALID.sub('_', '_'.join(part for part in parts if part))
+    return '_' + name if name[:1].isdigit() else name
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Real)
+
+
+def flatten(name, value, labels=()):
+    # (nombre, etiquetas, valor) de cada serie que sale de un valor
+    if value is None:
+        return
+    if _is_number(value):
+        yield name, labels, value
+    elif hasattr(value, '_fields'):
+        for field, item in zip(value._fields, value):
+            yield from flatten(metric_name(name, field), item, labels)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if hasattr(item, '_fields') or _is_number(item):
+                yield from flatten(name, item, labels + (('device', key),))
+
+
+def render(snapshot, prefix='rendimiento', now=None):
+    now = time.time() if now is None else now
+    series = collections.defaultdict(list)
+    for collector, reading in snapshot.readings.items():
+        base = metric_name(prefix, collector)
+        for name, labels, value in flatten(base, reading.value):
+            series[name].append((labels, value))
+        collector_label = (('collector', collector),)
+        series[metric_name(prefix, 'collector_stale')].append((collector_label, int(bool(reading.stale))))
+        if reading.timestamp is not None:
+            series[metric_name(prefix, 'collector_age_seconds')].append((collector_label, now - reading.timestamp))
+        if reading.duration is not None:
+            series[metric_name(prefix, 'collector_duration_seconds')].append((collector_label, reading.duration))
+
+    lines = []
+    for name in sorted(series):
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in series[name]:
+            if labels:
+                text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f'{name}{{{text}}} {_format_value(value)}')
+            else:
+                lines.append(f'{name} {_format_value(value)}')
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeceras y cuerpo salen en dos escrituras; con Nagle activo el cuerpo
+    # espera el ACK retrasado del cliente (unos 40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body, compressed = self.server.exporter.cached
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        payload = compressed if use_gzip else body
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.exporter.scrapes += 1
+
+    def log_message(self, format, *args):
+        # Sin una línea en stderr por cada scrape
+        pass
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class MetricsExporter:
+
+    def __init__(self, publisher, host='127.0.0.1', port=9101, prefix='rendimiento', min_interval=1.0):
+        self.publisher = publisher
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self.min_interval = min_interval
+        self.renders = 0
+        self.scrapes = 0
+        self._rendered_sequence = None
+        self._changed = threading.Event()
+        self._stopping = threading.Event()
+        self._server = None
+        self._threads = []
+        self._refresh()
+        publisher.subscribe(self._on_publish)
+
+    def _on_publish(self, snapshot):
+        # Se llama desde el hilo del colector: sólo marca que hay algo nuevo
+        self._changed.set()
+
+    def _refresh(self):
+        snapshot = self.publisher.latest
+        if snapshot.sequence == self._rendered_sequence:
+            return
+        body = render(snapshot, self.prefix)
+        # Una sola asignación: los scrapes ven el par viejo o el nuevo
+        self.cached = (body, gzip.compress(body, compresslevel=5))
+        self._rendered_sequence = snapshot.sequence
+        self.renders += 1
+
+    def _render_loop(self):
+        while not self._stopping.is_set():
+            self._changed.wait()
+            self._changed.clear()
+            if self._stopping.is_set():
+                return
+            self._refresh()
+            # Limita la frecuencia de renderizado aunque se publique más seguido
+            self._stopping.wait(self.min_interval)
+
+    def start(self):
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.exporter = self
+        self.port = self._server.server_address[1]
+        self._threads = [threading.Thread(target=self._server.serve_forever, name='exportador-http', daemon=True),
+                         threading.Thread(target=self._render_loop, name='exportador-render', daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self.port
+
+    def stop(self):
+        self._stopping.set()
+        self._changed.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,437 @@
+import collections
+import contextlib
+import os
+import re
+import struct
+import time
+from types import SimpleNamespace
+
+import psutil
+
+# Backends falsos de WMI y NVML con la misma forma que los módulos wmi y
+# pynvml. Cuentan cada llamada para poder medir en Linux cuántas conexiones
+# y consultas hace cada colector sin los drivers reales. FakePsutil imita las
+# funciones de psutil que usan los colectores, con contadores deterministas
+# para que los benchmarks den lo mismo en cualquier máquina.
+
+
+# SELECT props FROM Clase [WHERE Prop = 'valor']: lo único que usa el código
+_WQL = re.compile(r"^SELECT\s+(.+?)\s+FROM\s+(\w+)(?:\s+WHERE\s+(\w+)\s*=\s*'([^']*)')?\s*$", re.I)
+
+
+class FakeWmiConnection:
+
+    def __init__(self, owner, namespace):
+        self._owner = owner
+        self._namespace = namespace
+
+    def query(self, wql):
+        match = _WQL.match(wql)
+        if match is None:
+            raise ValueError(f"WQL no soportado: {wql}")
+        properties, class_name, where, value = match.groups()
+        self._owner.calls[(self._namespace, 'query', class_name)] += 1
+        rows = self._owner.classes.get(self._namespace, {}).get(class_name, [])
+        if where:
+            rows = [row for row in rows if str(getattr(row, where)) == value]
+        if properties.strip() == '*':
+            return list(rows)
+        names = [name.strip() for name in properties.split(',')]
+        return [SimpleNamespace(**{name: getattr(row, name) for name in names}) for row in rows]
+
+    def __getattr__(self, class_name):
+        classes = self._owner.classes.get(self._namespace, {})
+        if class_name not in classes:
+            raise AttributeError(class_name)
+
+        def query():
+            self._owner.calls[(self._namespace, class_name)] += 1
+            return list(classes[class_name])
+        return query
+
+
+class FakeWmi:
+
+    def __init__(self, classes=None, connect_latency=0.0):
+        # classes = {namespace: {clase: [objetos]}}
+        self.classes = classes if classes is not None else default_wmi_classes()
+        self.calls = collections.Counter()
+        # Segundos que tarda en abrirse una conexión, para los benchmarks
+        self.connect_latency = connect_latency
+
+    def WMI(self, namespace="root/CIMV2"):
+        self.calls['WMI'] += 1
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+        return FakeWmiConnection(self, namespace)
+
+
+def default_wmi_classes():
+    sensors = [
+        SimpleNamespace(SensorType='Load', Name='CPU Total', Value=12.5,
+                        Identifier='/intelcpu/0/load/0', Parent='/intelcpu/0'),
+        SimpleNamespace(SensorType='Temperature', Name='CPU Core #1', Value=44.0,
+                        Identifier='/intelcpu/0/temperature/0', Parent='/intelcpu/0'),
+        SimpleNamespace(SensorType='Power', Name='CPU Package', Value=35.0,
+                        Identifier='/intelcpu/0/power/0', Parent='/intelcpu/0'),
+        SimpleNamespace(SensorType='Temperature', Name='CPU Package', Value=47.0,
+                        Identifier='/intelcpu/0/temperature/1', Parent='/intelcpu/0'),
+        SimpleNamespace(SensorType='Fan', Name='Fan #1', Value=1200.0,
+                        Identifier='/lpc/nct6798d/fan/0', Parent='/lpc/nct6798d'),
+    ]
+    memory = [
+        SimpleNamespace(Capacity='8589934592', Speed=3200),
+        SimpleNamespace(Capacity='8589934592', Speed=3200),
+    ]
+    return {
+        'root/OpenHardwareMonitor': {'Sensor': sensors},
+        'root/CIMV2': {
+            'Win32_Processor': [SimpleNamespace(Name='Fake CPU @ 3.60GHz')],
+            'Win32_PhysicalMemory': memory,
+            'Win32_LogicalDiskToPartition': [
+                SimpleNamespace(Antecedent=SimpleNamespace(DeviceID='Disk #0, Partition #1'),
+                                Dependent=SimpleNamespace(DeviceID='C:')),
+            ],
+        },
+    }
+
+
+class FakeNVMLError(Exception):
+
+    def __init__(self, value):
+        super().__init__(value)
+        self.value = value
+
+
+class FakeGpu:
+
+    def __init__(self, name='Fake GPU', temperature=50, utilization=30,
+                 memory_total=8 * 1024**3, memory_used=2 * 1024**3,
+                 compute_processes=(), graphics_processes=(), process_samples=()):
+        self.name = name
+        self.temperature = temperature
+        self.utilization = utilization
+        self.memory_total = memory_total
+        self.memory_used = memory_used
+        # Listas de (pid, bytes de memoria) y de (pid, timestamp, sm, mem)
+        self.compute_processes = list(compute_processes)
+        self.graphics_processes = list(graphics_processes)
+        self.process_samples = list(process_samples)
+
+
+class FakeNvml:
+    NVMLError = FakeNVMLError
+    NVML_TEMPERATURE_GPU = 0
+    NVML_ERROR_UNINITIALIZED = 1
+    NVML_ERROR_NOT_SUPPORTED = 3
+    NVML_ERROR_NOT_FOUND = 6
+    NVML_ERROR_DRIVER_NOT_LOADED = 9
+    NVML_ERROR_GPU_IS_LOST = 15
+
+    def __init__(self, gpus=None, init_latency=0.0):
+        self.gpus = gpus if gpus is not None else [FakeGpu()]
+        self.calls = collections.Counter()
+        self.init_latency = init_latency
+        self.initialized = False
+        # Si se asigna un código de error, la siguiente llamada a un
+        # dispositivo falla con él (para probar reconexiones)
+        self.fail_next = None
+
+    def _device_call(self, name, handle):
+        self.calls[name] += 1
+        if not self.initialized:
+            raise FakeNVMLError(self.NVML_ERROR_UNINITIALIZED)
+        if self.fail_next is not None:
+            code, self.fail_next = self.fail_next, None
+            if code in (self.NVML_ERROR_GPU_IS_LOST, self.NVML_ERROR_DRIVER_NOT_LOADED):
+                self.initialized = False
+            raise FakeNVMLError(code)
+        return handle
+
+    def nvmlInit(self):
+        self.calls['nvmlInit'] += 1
+        if self.init_latency:
+            time.sleep(self.init_latency)
+        self.initialized = True
+
+    def nvmlShutdown(self):
+        self.calls['nvmlShutdown'] += 1
+        self.initialized = False
+
+    def nvmlDeviceGetCount(self):
+        self.calls['nvmlDeviceGetCount'] += 1
+        return len(self.gpus)
+
+    def nvmlDeviceGetHandleByIndex(self, index):
+        self.calls['nvmlDeviceGetHandleByIndex'] += 1
+        return self.gpus[index]
+
+    def nvmlDeviceGetName(self, handle):
+        return self._device_call('nvmlDeviceGetName', handle).name
+
+    def nvmlDeviceGetTemperature(self, handle, sensor):
+        return self._device_call('nvmlDeviceGetTemperature', handle).temperature
+
+    def nvmlDeviceGetUtilizationRates(self, handle):
+        gpu = self._device_call('nvmlDeviceGetUtilizationRates', handle)
+        return SimpleNamespace(gpu=gpu.utilization, memory=0)
+
+    def nvmlDeviceGetMemoryInfo(self, handle):
+        gpu = self._device_call('nvmlDeviceGetMemoryInfo', handle)
+        return SimpleNamespace(total=gpu.memory_total, used=gpu.memory_used,
+                               free=gpu.memory_total - gpu.memory_used)
+
+    def nvmlDeviceGetComputeRunningProcesses(self, handle):
+        gpu = self._device_call('nvmlDeviceGetComputeRunningProcesses', handle)
+        return [SimpleNamespace(pid=pid, usedGpuMemory=used) for pid, used in gpu.compute_processes]
+
+    def nvmlDeviceGetGraphicsRunningProcesses(self, handle):
+        gpu = self._device_call('nvmlDeviceGetGraphicsRunningProcesses', handle)
+        return [SimpleNamespace(pid=pid, usedGpuMemory=used) for pid, used in gpu.graphics_processes]
+
+    def nvmlDeviceGetProcessUtilization(self, handle, last_seen_timestamp):
+        gpu = self._device_call('nvmlDeviceGetProcessUtilization', handle)
+        samples = [SimpleNamespace(pid=pid, timeStamp=ts, smUtil=sm, memUtil=mem, encUtil=0, decUtil=0)
+                   for pid, ts, sm, mem in gpu.process_samples if ts > last_seen_timestamp]
+        if not samples:
+            # El driver real responde NOT_FOUND cuando no hay muestras nuevas
+            raise FakeNVMLError(self.NVML_ERROR_NOT_FOUND)
+        return samples
+
+
+def default_hwmon_chips():
+    # {chip: [(archivo, valor, etiqueta o None)]} con valores en las unidades
+    # de sysfs (miligrados, milivolts, RPM)
+    return {
+        'coretemp': [(f'temp{i + 1}_input', 45000 + 1000 * i, 'Package id 0' if i == 0 else f'Core {i - 1}')
+                     for i in range(9)],
+        'nct6798': ([(f'in{i}_input', 1000 + 10 * i, None) for i in range(15)]
+                    + [(f'fan{i + 1}_input', 800 + 100 * i, None) for i in range(7)]
+                    + [(f'temp{i + 1}_input', 30000 + 500 * i, None) for i in range(10)]),
+        'nvme': [('temp1_input', 38850, 'Composite'), ('temp2_input', 41850, 'Sensor 1')],
+        'acpitz': [('temp1_input', 27800, None)],
+    }
+
+
+def write_fake_sysfs(root, chips=None, thermal_zones=(('acpitz', 27800), ('x86_pkg_temp', 46000))):
+    # Árbol con la forma de /sys/class/hwmon y /sys/class/thermal para
+    # probar HwmonProvider fuera de Linux o sin sensores
+    chips = default_hwmon_chips() if chips is None else chips
+    hwmon_root = os.path.join(root, 'hwmon')
+    thermal_root = os.path.join(root, 'thermal')
+    for index, (chip, files) in enumerate(chips.items()):
+        directory = os.path.join(hwmon_root, f'hwmon{index}')
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'name'), 'w') as file:
+            file.write(chip + '\n')
+        for filename, value, label in files:
+            with open(os.path.join(directory, filename), 'w') as file:
+                file.write(f'{value}\n')
+            if label is not None:
+                with open(os.path.join(directory, filename.replace('_input', '_label')), 'w') as file:
+                    file.write(label + '\n')
+    for index, (zone_type, value) in enumerate(thermal_zones):
+        directory = os.path.join(thermal_root, f'thermal_zone{index}')
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'type'), 'w') as file:
+            file.write(zone_type + '\n')
+        with open(os.path.join(directory, 'temp'), 'w') as file:
+            file.write(f'{value}\n')
+    return hwmon_root, thermal_root
+
+
+def smbios_memory_device(size, speed, extended_size=0, extended_speed=0, length=0x5C):
+    # Estructura SMBIOS tipo 17 (Memory Device) con los campos crudos: size y
+    # speed como los codifica el firmware (0x7FFF y 0xFFFF remiten a los
+    # campos extendidos), sin cadenas
+    device = bytearray(length)
+    device[0], device[1] = 17, length
+    struct.pack_into('<H', device, 0x0C, size)
+    if length >= 0x17:
+        struct.pack_into('<H', device, 0x15, speed)
+    if length >= 0x20:
+        struct.pack_into('<I', device, 0x1C, extended_size)
+    if length >= 0x58:
+        struct.pack_into('<I', device, 0x54, extended_speed)
+    return bytes(device) + b'\0\0'
+
+
+def write_fake_dmi(path, devices):
+    # Tabla con la forma de /sys/firmware/dmi/tables/DMI: la estructura del
+    # BIOS (tipo 0, con cadenas), los dispositivos dados y la de fin (tipo 127)
+    bios = bytes([0, 0x18]) + bytes(0x16) + b'Fake BIOS\0v1.0\0\0'
+    end = bytes([127, 4, 0, 0]) + b'\0\0'
+    with open(path, 'wb') as file:
+        file.write(bios + b''.join(devices) + end)
+    return path
+
+
+FakeCpuTimes = collections.namedtuple('FakeCpuTimes', ('user', 'nice', 'system', 'idle', 'iowait', 'irq',
+                                                       'softirq', 'steal'))
+FakeNetIo = collections.namedtuple('FakeNetIo', ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                                                 'errin', 'errout', 'dropin', 'dropout'))
+FakeDiskIo = collections.namedtuple('FakeDiskIo', ('read_count', 'write_count', 'read_bytes', 'write_bytes',
+                                                   'read_time', 'write_time', 'busy_time'))
+FakePartition = collections.namedtuple('FakePartition', ('device', 'mountpoint', 'fstype', 'opts'))
+FakeDiskUsage = collections.namedtuple('FakeDiskUsage', ('total', 'used', 'free', 'percent'))
+FakeMemory = collections.namedtuple('FakeMemory', ('total', 'available', 'percent', 'used', 'free'))
+FakeMemoryInfo = collections.namedtuple('FakeMemoryInfo', ('rss', 'vms'))
+FakeProcessIo = collections.namedtuple('FakeProcessIo', ('read_count', 'write_count', 'read_bytes', 'write_bytes'))
+FakeCtxSwitches = collections.namedtuple('FakeCtxSwitches', ('voluntary', 'involuntary'))
+
+
+class FakeProcess:
+    # Los valores dependen sólo del PID y del paso actual de FakePsutil
+
+    def __init__(self, owner, pid):
+        if pid not in owner.live_pids():
+            raise psutil.NoSuchProcess(pid)
+        self._owner = owner
+        self.pid = pid
+        # Como psutil, guarda el create_time del proceso que encontró
+        self._create_time = owner.create_time(pid)
+
+    def is_running(self):
+        return self.pid in self._owner.live_pids() and self._owner.create_time(self.pid) == self._create_time
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def _check(self):
+        if self.pid not in self._owner.live_pids():
+            raise psutil.NoSuchProcess(self.pid)
+        return self._owner.step
+
+    def create_time(self):
+        return self._create_time
+
+    def name(self):
+        return f'proc{self.pid % 97}'
+
+    def ppid(self):
+        # Árboles de hasta 16 procesos bajo el múltiplo de 16 anterior
+        return 1 if self.pid % 16 == 0 else self.pid - self.pid % 16
+
+    def cmdline(self):
+        return [f'/usr/bin/{self.name()}', f'--worker={self.pid % 16}']
+
+    def cpu_percent(self):
+        step = self._check()
+        return float((self.pid * 7 + step * 13) % 100) if self.pid % 10 == 0 else 0.0
+
+    def memory_info(self):
+        self._check()
+        rss = (self.pid % 256 + 1) * 1024**2
+        return FakeMemoryInfo(rss, rss * 4)
+
+    def io_counters(self):
+        step = self._check()
+        rate = self.pid % 5 * 4096
+        return FakeProcessIo(step * (self.pid % 3), step, step * rate, step * rate // 2)
+
+    def num_threads(self):
+        return self.pid % 32 + 1
+
+    def num_ctx_switches(self):
+        step = self._check()
+        return FakeCtxSwitches(step * (self.pid % 50), step * (self.pid % 3))
+
+    def num_fds(self):
+        return self.pid % 64 + 3
+
+    num_handles = num_fds
+
+
+class FakePsutil:
+    # advance() avanza un paso: un segundo en el reloj y en todos los
+    # contadores. Con churn > 0, en cada paso terminan los `churn` procesos
+    # más viejos y arrancan otros tantos con PIDs nuevos. reuse(pid) simula
+    # que el proceso terminó y otro arrancó con el mismo PID.
+
+    def __init__(self, num_processes=500, num_cpus=8, nics=('eth0', 'wlan0', 'lo'),
+                 disks=('sda', 'sda1', 'sda2', 'nvme0n1', 'nvme0n1p1', 'loop0'), churn=0):
+        self.num_processes = num_processes
+        self.num_cpus = num_cpus
+        self.nics = tuple(nics)
+        self.disks = tuple(disks)
+        self.churn = churn
+        self.step = 0
+        self.calls = collections.Counter()
+        self._reused = collections.Counter()
+
+    def advance(self, steps=1):
+        self.step += steps
+
+    def clock(self):
+        return float(self.step)
+
+    def live_pids(self):
+        first = 100 + self.step * self.churn
+        return range(first, first + self.num_processes)
+
+    def reuse(self, pid):
+        self._reused[pid] += 1
+
+    def create_time(self, pid):
+        return 1000.0 + pid + 1e6 * self._reused[pid]
+
+    def pids(self):
+        self.calls['pids'] += 1
+        return list(self.live_pids())
+
+    def Process(self, pid):
+        self.calls['Process'] += 1
+        return FakeProcess(self, pid)
+
+    def _cpu(self, index):
+        step = self.step
+        busy = step * (0.3 + 0.05 * (index % 8))
+        return FakeCpuTimes(busy * 0.7, 0.0, busy * 0.3, step - busy, step * 0.01, 0.0, 0.0, 0.0)
+
+    def cpu_times(self, percpu=False):
+        self.calls['cpu_times'] += 1
+        if percpu:
+            return [self._cpu(index) for index in range(self.num_cpus)]
+        cores = [self._cpu(index) for index in range(self.num_cpus)]
+        return FakeCpuTimes(*(sum(values) for values in zip(*cores)))
+
+    def net_io_counters(self, pernic=False, nowrap=True):
+        self.calls['net_io_counters'] += 1
+        step = self.step
+        counters = {name: FakeNetIo(step * 1500 * (index + 1), step * 9000 * (index + 1),
+                                    step * (index + 1), step * 6 * (index + 1), 0, 0, 0, 0)
+                    for index, name in enumerate(self.nics)}
+        if pernic:
+            return counters
+        return FakeNetIo(*(sum(values) for values in zip(*counters.values())))
+
+    def disk_io_counters(self, perdisk=False, nowrap=True):
+        self.calls['disk_io_counters'] += 1
+        step = self.step
+        counters = {name: FakeDiskIo(step * 40 * (index + 1), step * 25 * (index + 1),
+                                     step * 163840 * (index + 1), step * 102400 * (index + 1),
+                                     step * 30, step * 20, step * 45)
+                    for index, name in enumerate(self.disks)}
+        if perdisk:
+            return counters
+        return FakeDiskIo(*(sum(values) for values in zip(*counters.values())))
+
+    def disk_partitions(self, all=False):
+        self.calls['disk_partitions'] += 1
+        return [FakePartition('/dev/sda1', '/', 'ext4', 'rw'),
+                FakePartition('/dev/sda2', '/home', 'ext4', 'rw'),
+                FakePartition('/dev/nvme0n1p1', '/data', 'xfs', 'rw'),
+                FakePartition('/dev/loop0', '/snap/core/1', 'squashfs', 'ro')]
+
+    def disk_usage(self, path):
+        self.calls['disk_usage'] += 1
+        total = 512 * 1024**3
+        used = (len(path) * 37 % 90 + 5) * total // 100
+        return FakeDiskUsage(total, used, total - used, round(used / total * 100, 1))
+
+    def virtual_memory(self):
+        self.calls['virtual_memory'] += 1
+        total = 32 * 1024**3
+        available = 20 * 1024**3
+        return FakeMemory(total, available, round((total - available) / total * 100, 1),
+                          total - available, available)
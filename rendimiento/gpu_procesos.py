@@ -0,0 +1,99 @@
+# Uso de GPU por proceso. En lugar de consultar NVML una vez por cada
+# proceso de psutil, se hacen tres llamadas por GPU y por tick (procesos de
+# cómputo, procesos gráficos y muestras de utilización) y el resultado se
+# indexa por PID para unirlo con la tabla de procesos.
+
+_RUNNING_PROCESS_FUNCTIONS = (
+    'nvmlDeviceGetComputeRunningProcesses',
+    'nvmlDeviceGetGraphicsRunningProcesses',
+)
+
+
+class GpuProcessUsage:
+    __slots__ = ('pid', 'memory_bytes', 'sm_util', 'memory_util')
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.memory_bytes = 0
+        self.sm_util = 0.0
+        self.memory_util = 0.0
+
+    @property
+    def memory_mb(self):
+        return self.memory_bytes / 1024**2
+
+    def __repr__(self):
+        return (f"GpuProcessUsage(pid={self.pid}, memory_mb={self.memory_mb:.1f}, "
+                f"sm_util={self.sm_util}, memory_util={self.memory_util})")
+
+
+class GpuProcessAccounting:
+
+    def __init__(self, nvml_session):
+        self._session = nvml_session
+        # Último timestamp visto por GPU para pedir sólo muestras nuevas
+        self._last_timestamps = {}
+        # Última utilización conocida por GPU, para los ticks en los que el
+        # driver todavía no tiene muestras nuevas
+        self._last_utilization = {}
+
+    def collect(self):
+        try:
+            handles = self._session.handles()
+        except Exception:
+            # Sin NVML: ningún proceso usa la GPU
+            return {}
+
+        usage_by_pid = {}
+        for index, handle in enumerate(handles):
+            device_memory = {}
+            for function_name in _RUNNING_PROCESS_FUNCTIONS:
+                try:
+                    processes = self._session.call_with_handle(function_name, handle)
+                except Exception:
+                    continue
+                for process in processes:
+                    # Un proceso puede aparecer como de cómputo y gráfico a la vez
+                    used = process.usedGpuMemory or 0
+                    device_memory[process.pid] = max(device_memory.get(process.pid, 0), used)
+
+            utilization = self._device_utilization(index, handle, device_memory)
+
+            for pid, used in device_memory.items():
+                usage = usage_by_pid.get(pid)
+                if usage is None:
+                    usage = usage_by_pid[pid] = GpuProcessUsage(pid)
+                usage.memory_bytes += used
+                sm_util, memory_util = utilization.get(pid, (0.0, 0.0))
+                usage.sm_util += sm_util
+                usage.memory_util += memory_util
+        return usage_by_pid
+
+    def _device_utilization(self, index, handle, running_pids):
+        last_timestamp = self._last_timestamps.get(index, 0)
+        try:
+            samples = self._session.call_with_handle('nvmlDeviceGetProcessUtilization',
+                                                     handle, last_timestamp)
+        except Exception:
+            # NOT_FOUND (sin muestras nuevas) o NOT_SUPPORTED
+            samples = ()
+
+        if not samples:
+            utilization = self._last_utilization.get(index, {})
+        else:
+            # Los procesos sin muestras en la ventana no usaron la GPU
+            utilization = {}
+            newest = {}
+            for sample in samples:
+                previous = newest.get(sample.pid)
+                if previous is None or sample.timeStamp >= previous.timeStamp:
+                    newest[sample.pid] = sample
+                last_timestamp = max(last_timestamp, sample.timeStamp)
+            for pid, sample in newest.items():
+                utilization[pid] = (float(sample.smUtil), float(sample.memUtil))
+
+        # Se olvidan los procesos que ya no corren en esta GPU
+        utilization = {pid: value for pid, value in utilization.items() if pid in running_pids}
+        self._last_utilization[index] = utilization
+        self._last_timestamps[index] = last_timestamp
+        return utilization
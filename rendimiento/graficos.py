@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+
+from rendimiento.rollup import minmax_decimate
+
+# Gráficas persistentes. Los ejes, leyendas, rejillas y títulos se crean una
+# sola vez; en cada tick sólo se cambian los datos de las líneas con
+# set_data() y se redibujan con blitting sobre el fondo guardado. El dibujo
+# completo (y tight_layout) sólo ocurre cuando cambian los límites de algún eje
+# o cuando el backend redibuja la figura (por ejemplo al cambiar de tamaño).
+# Las series más largas que max_points se reducen con min/max antes de
+# dibujarse: una línea no necesita más puntos que píxeles tiene el eje.
+
+
+class ChartPanel:
+
+    def __init__(self, title, ylabel, lines, ylim=None, ystep=10):
+        # lines = [(métrica, etiqueta), ...]; ylim fijo opcional, si no se
+        # ajusta a múltiplos de ystep para que no cambie en cada tick
+        self.title = title
+        self.ylabel = ylabel
+        self.lines = tuple(lines)
+        self.ylim = ylim
+        self.ystep = ystep
+
+
+DEFAULT_PANELS = (
+    ChartPanel('CPU, Memory, and GPU Usage Over Time', 'Usage (%)',
+               (('cpu', 'CPU'), ('memory', 'Memory'), ('gpu', 'GPU')), ylim=(0, 100)),
+    ChartPanel('CPU and GPU Temperature Over Time', 'Temperature (°C)',
+               (('cpu_temperature', 'CPU'), ('gpu_temperature', 'GPU'))),
+    ChartPanel('Network Throughput Over Time', 'Throughput (KB/s)',
+               (('net_recv', 'Received'), ('net_sent', 'Sent')), ystep=100),
+)
+
+
+def _nice_span(span, step=10):
+    return max(step, math.ceil(span / step) * step)
+
+
+class MetricChart:
+
+    def __init__(self, figure, panels=DEFAULT_PANELS, xlabel='Time (s)', max_points=None):
+        self.figure = figure
+        # Por omisión un punto por píxel de ancho de la figura (un mínimo y
+        # un máximo cada dos píxeles)
+        self.max_points = max_points or int(figure.get_figwidth() * figure.dpi)
+        self.canvas = figure.canvas
+        self.panels = tuple(panels)
+        self.axes = []
+        self.lines = {}
+        for i, panel in enumerate(self.panels):
+            ax = figure.add_subplot(len(self.panels), 1, i + 1)
+            for metric, label in panel.lines:
+                # animated=True: las líneas no se pintan en el dibujo normal,
+                # sólo en el blit, así el fondo guardado queda sin ellas
+                line, = ax.plot([], [], label=label, animated=True)
+                self.lines[metric] = line
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(panel.ylabel)
+            ax.set_title(panel.title)
+            ax.legend(loc='upper left')
+            ax.grid()
+            ax.set_xlim(-10, 0)
+            ax.set_ylim(*(panel.ylim or (0, panel.ystep)))
+            self.axes.append(ax)
+        figure.tight_layout()
+        self._background = None
+        self.full_draws = 0
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        # Cada dibujo completo guarda el fondo nuevo y pinta las líneas encima
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for line in self.lines.values():
+            line.axes.draw_artist(line)
+
+    def update(self, data):
+        # data = {métrica: (x, y)}; x en segundos relativos al último punto
+        limits_changed = False
+        for ax, panel in zip(self.axes, self.panels):
+            xmin = 0.0
+            ymin, ymax = math.inf, -math.inf
+            for metric, _ in panel.lines:
+                if metric not in data:
+                    continue
+                x, y = data[metric]
+                if len(y) > self.max_points:
+                    x, y = minmax_decimate(x, y, self.max_points)
+                self.lines[metric].set_data(x, y)
+                if len(x):
+                    xmin = min(xmin, float(x[0]))
+                if len(y) and not np.all(np.isnan(y)):
+                    ymin = min(ymin, float(np.nanmin(y)))
+                    ymax = max(ymax, float(np.nanmax(y)))
+
+            xlim = (-_nice_span(-xmin), 0)
+            if panel.ylim is not None:
+                ylim = panel.ylim
+            elif ymin <= ymax:
+                step = panel.ystep
+                ylim = (math.floor(ymin / step) * step, math.ceil(ymax / step) * step + step)
+            else:
+                ylim = ax.get_ylim()
+            if tuple(ax.get_xlim()) != xlim or tuple(ax.get_ylim()) != tuple(ylim):
+                ax.set_xlim(*xlim)
+                ax.set_ylim(*ylim)
+                limits_changed = True
+
+        if limits_changed or self._background is None:
+            # Los ejes cambiaron: dibujo completo, _on_draw guarda el fondo
+            self.full_draws += 1
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+        self.canvas.blit(self.figure.bbox)
+
+    def update_from_history(self, history, n=None):
+        timestamps = history.timestamps(n)
+        if len(timestamps) == 0:
+            return
+        x = timestamps - timestamps[-1]
+        self.update({metric: (x, history.series(metric, n)) for metric in self.lines
+                     if metric in history.metrics})
+
+    def update_from_rollups(self, rollups, seconds, max_points=1000, now=None):
+        # Ventanas largas (horas o días) desde el historial resumido
+        data = {}
+        for metric in self.lines:
+            if metric in rollups.metrics:
+                starts, values = rollups.query(metric, seconds, max_points=max_points, now=now)
+                if len(starts):
+                    data[metric] = (starts - starts[-1], values)
+        if data:
+            self.update(data)
@@ -0,0 +1,233 @@
+import collections
+import operator
+import re
+import sys
+
+# Árbol de procesos y agrupación por aplicación sobre la tabla persistente de
+# rendimiento.procesos. Un navegador con 40 procesos hijos o un pool de 64
+# trabajadores iguales no aparece en el top por PID aunque sea lo que más
+# consume; agrupados sí. Modos de agrupación:
+#   - 'name': por nombre del ejecutable;
+#   - 'tree': por el ancestro más alto con el mismo nombre (el proceso
+#     principal del navegador con sus hijos, el maestro con sus trabajadores);
+#   - 'cmdline': por el primer patrón (nombre, regex) que coincide con la línea
+#     de comandos; los que no coinciden se agrupan por nombre;
+#   - 'cgroup': por el cgroup de Linux (servicio o scope de systemd); fuera de
+#     Linux o sin permisos se agrupan por nombre.
+# El grupo de cada proceso se decide una vez, cuando entra a la tabla. Cada
+# tick las sumas de los grupos se corrigen con la diferencia entre los valores
+# actuales y los que aportó la vez anterior, sólo para las filas que
+# ProcessRegistry.update() reporta como cambiadas (si se perdió algún update
+# se revisan todas), y al terminar un proceso se resta lo que aportaba. Cada
+# resync_every ticks se recalculan desde cero para que el redondeo de los
+# flotantes no se acumule.
+
+GROUP_MODES = ('name', 'tree', 'cmdline', 'cgroup')
+
+# Campos de ProcessRow que se suman por grupo (cubren los de RANKING_KEYS)
+GROUP_FIELDS = ('cpu_percent', 'memory_percent', 'rss', 'io_bytes', 'gpu_percent', 'gpu_memory_mb',
+                'read_rate', 'write_rate', 'num_threads', 'num_fds', 'ctx_switch_rate')
+
+_values = operator.attrgetter(*GROUP_FIELDS)
+_ZEROS = (0,) * len(GROUP_FIELDS)
+
+
+class ProcessGroup:
+    __slots__ = ('key', 'name', 'count', 'pids') + GROUP_FIELDS
+
+    def __init__(self, key, name):
+        self.key = key
+        self.name = name
+        self.count = 0
+        self.pids = set()
+        for field in GROUP_FIELDS:
+            setattr(self, field, 0)
+
+    def __repr__(self):
+        return (f"ProcessGroup(name={self.name!r}, count={self.count}, cpu_percent={self.cpu_percent:.1f}, "
+                f"memory_percent={self.memory_percent:.1f})")
+
+
+class ProcessTree:
+    # Hijos por PID, mantenidos con los eventos de arranque y salida de la
+    # tabla en lugar de recorrerla completa cada vez
+
+    def __init__(self, registry):
+        self._registry = registry
+        self._children = collections.defaultdict(set)
+        for row in registry.rows():
+            self._add(row)
+        registry.on_start.append(self._add)
+        registry.on_exit.append(self._remove)
+
+    def _add(self, row):
+        self._children[row.ppid].add(row.pid)
+
+    def _remove(self, row):
+        children = self._children.get(row.ppid)
+        if children is not None:
+            children.discard(row.pid)
+            if not children:
+                del self._children[row.ppid]
+
+    def parent(self, row):
+        parent = self._registry.get(row.ppid)
+        # Un PID reutilizado después de que terminó el padre real no cuenta
+        if parent is None or parent is row or parent.create_time > row.create_time:
+            return None
+        return parent
+
+    def children(self, row):
+        children = []
+        for pid in self._children.get(row.pid, ()):
+            child = self._registry.get(pid)
+            if child is not None and self.parent(child) is row:
+                children.append(child)
+        return children
+
+    def roots(self):
+        return [row for row in self._registry.rows() if self.parent(row) is None]
+
+    def walk(self, row, depth=0):
+        # (profundidad, fila) en preorden
+        yield depth, row
+        for child in sorted(self.children(row), key=operator.attrgetter('pid')):
+            yield from self.walk(child, depth + 1)
+
+
+def _read_cgroup(pid):
+    # En cgroup v2 una sola línea "0::/user.slice/.../app.scope"; en v1 se
+    # toma la jerarquía que nombra al servicio
+    try:
+        with open(f'/proc/{pid}/cgroup', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+    except OSError:
+        return None
+    paths = {}
+    for line in lines:
+        _, controllers, path = line.split(':', 2)
+        paths[controllers] = path
+    path = paths.get('') or paths.get('name=systemd')
+    if path is None and paths:
+        path = next(iter(paths.values()))
+    return None if path in (None, '/') else path
+
+
+class ProcessGroups:
+
+    def __init__(self, registry, mode='name', patterns=(), resync_every=3600):
+        if mode not in GROUP_MODES:
+            raise ValueError(f"mode debe ser uno de {GROUP_MODES}")
+        self._registry = registry
+        self.mode = mode
+        self.patterns = [(name, re.compile(pattern)) for name, pattern in patterns]
+        self.resync_every = resync_every
+        self.tree = ProcessTree(registry)
+        self._groups = {}
+        # fila -> [grupo, tupla con los valores que aportó]
+        self._members = {}
+        self._ticks = 0
+        # ProcessRegistry.updates visto en el último update()
+        self._seen = registry.updates
+        # Las filas que ya están en la tabla entran con sus valores actuales
+        self.resync()
+        registry.on_start.append(self._join)
+        registry.on_exit.append(self._leave)
+
+    def __len__(self):
+        return len(self._groups)
+
+    def groups(self):
+        return self._groups.values()
+
+    def group_of(self, row):
+        member = self._members.get(row)
+        return None if member is None else member[0]
+
+    def _group_key(self, row):
+        if self.mode == 'tree':
+            top = row
+            parent = self.tree.parent(top)
+            while parent is not None and parent.name == row.name:
+                top = parent
+                parent = self.tree.parent(top)
+            return ('tree', top.pid, top.create_time), f'{row.name} ({top.pid})'
+        if self.mode == 'cmdline' and self.patterns:
+            try:
+                cmdline = ' '.join(row.process.cmdline())
+            except Exception:
+                cmdline = ''
+            for name, pattern in self.patterns:
+                if pattern.search(cmdline):
+                    return ('cmdline', name), name
+        if self.mode == 'cgroup' and sys.platform.startswith('linux'):
+            path = _read_cgroup(row.pid)
+            if path is not None:
+                return ('cgroup', path), path.rsplit('/', 1)[-1]
+        return ('name', row.name), row.name
+
+    def _join(self, row):
+        key, name = self._group_key(row)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = ProcessGroup(key, name)
+        group.count += 1
+        group.pids.add(row.pid)
+        # Aporta cero hasta el siguiente update(), que suma sus valores
+        self._members[row] = [group, _ZEROS]
+
+    def _leave(self, row):
+        member = self._members.pop(row, None)
+        if member is None:
+            return
+        group, last = member
+        group.count -= 1
+        group.pids.discard(row.pid)
+        if not group.count:
+            del self._groups[group.key]
+            return
+        for field, value in zip(GROUP_FIELDS, last):
+            if value:
+                setattr(group, field, getattr(group, field) - value)
+
+    def update(self):
+        # Llamar después de cada ProcessRegistry.update()
+        self._ticks += 1
+        registry = self._registry
+        in_step = registry.updates == self._seen + 1
+        self._seen = registry.updates
+        if self.resync_every and self._ticks % self.resync_every == 0:
+            self.resync()
+            return
+        members = self._members
+        rows = registry.events.changed if in_step else registry.rows()
+        for row in rows:
+            member = members.get(row)
+            if member is None:
+                # Filas de antes de suscribirse a los eventos
+                self._join(row)
+                member = members[row]
+            values = _values(row)
+            last = member[1]
+            if values == last:
+                continue
+            group = member[0]
+            for field, value, previous in zip(GROUP_FIELDS, values, last):
+                if value != previous:
+                    setattr(group, field, getattr(group, field) + value - previous)
+            member[1] = values
+
+    def resync(self):
+        for group in self._groups.values():
+            for field in GROUP_FIELDS:
+                setattr(group, field, 0)
+        for row in self._registry.rows():
+            member = self._members.get(row)
+            if member is None:
+                self._join(row)
+                member = self._members[row]
+            values = _values(row)
+            group = member[0]
+            for field, value in zip(GROUP_FIELDS, values):
+                setattr(group, field, getattr(group, field) + value)
+            member[1] = values
@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+
+# Historial de métricas en un buffer circular de NumPy con capacidad fija.
+# Cada muestra se escribe dos veces, en la posición i y en i + capacidad, de
+# modo que las últimas n muestras siempre forman un bloque contiguo y se
+# pueden regresar como vista sin copiar para graficar. La memoria se reserva
+# una sola vez: 2 * capacidad * métricas valores float32 más los timestamps
+# (86 400 puntos de 48 métricas ocupan unos 35 MB).
+
+
+class MetricHistory:
+
+    def __init__(self, metrics, capacity=50, dtype=np.float32, clock=time.time):
+        if capacity <= 0:
+            raise ValueError("capacity debe ser mayor que cero")
+        self.metrics = tuple(metrics)
+        self.capacity = capacity
+        self._columns = {name: i for i, name in enumerate(self.metrics)}
+        self._clock = clock
+        # Una fila por métrica para que la serie de cada una sea contigua
+        self._values = np.full((len(self.metrics), 2 * capacity), np.nan, dtype=dtype)
+        self._timestamps = np.full(2 * capacity, np.nan, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, values, timestamp=None):
+        # values es un dict {métrica: valor} o una secuencia en el orden de
+        # self.metrics; None y las métricas que falten se guardan como NaN
+        if timestamp is None:
+            timestamp = self._clock()
+        i = self._next
+        j = i + self.capacity
+        if isinstance(values, dict):
+            column = self._values[:, i]
+            column.fill(np.nan)
+            for name, value in values.items():
+                if value is not None:
+                    column[self._columns[name]] = value
+        else:
+            self._values[:, i] = [np.nan if value is None else value for value in values]
+        self._values[:, j] = self._values[:, i]
+        self._timestamps[i] = self._timestamps[j] = timestamp
+        self._next = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _bounds(self, n):
+        n = self._count if n is None else min(n, self._count)
+        # El bloque [next + capacity - n, next + capacity) contiene las
+        # últimas n muestras en orden cronológico
+        end = self._next + self.capacity
+        return end - n, end
+
+    def series(self, name, n=None):
+        start, end = self._bounds(n)
+        return self._values[self._columns[name], start:end]
+
+    def timestamps(self, n=None):
+        start, end = self._bounds(n)
+        return self._timestamps[start:end]
+
+    def window(self, n=None):
+        # Vista (métricas x n) y sus timestamps, sin copiar
+        start, end = self._bounds(n)
+        return self._timestamps[start:end], self._values[:, start:end]
+
+    def latest(self, name):
+        if self._count == 0:
+            return None
+        value = self._values[self._columns[name], self._next + self.capacity - 1]
+        return None if np.isnan(value) else float(value)
@@ -0,0 +1,181 @@
+import array
+import collections
+import contextlib
+import functools
+import threading
+import time
+
+import psutil
+
+# Instrumentación del propio monitor. Cada tramo (un colector, una etapa de la
+# interfaz) se mide con perf_counter_ns y se guarda en un buffer circular con
+# las últimas `window` duraciones; los percentiles p50/p95/p99 se calculan
+# sólo cuando alguien los pide (el overlay, el exportador), así medir un tramo
+# cuesta dos lecturas del reloj y una escritura en un array. Dos hilos que
+# registran el mismo tramo a la vez pueden pisar una muestra; para una
+# estadística de ventana no importa y evita un candado en el camino caliente.
+#
+# SelfMonitor reporta el CPU (de un núcleo, como top) y la memoria del propio
+# proceso, y RunProfiler junta un cProfile por hilo (cProfile sólo perfila el
+# hilo que lo activa) en un solo archivo de pstats.
+
+SpanSummary = collections.namedtuple('SpanSummary', ('count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_s'))
+
+SelfSample = collections.namedtuple('SelfSample', ('cpu_percent', 'rss_mb', 'threads'))
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class SpanRecorder:
+    __slots__ = ('samples', 'index', 'count', 'total_ns')
+
+    def __init__(self, window):
+        self.samples = array.array('q', bytes(8 * window))
+        self.index = 0
+        self.count = 0
+        self.total_ns = 0
+
+    def add(self, ns):
+        samples = self.samples
+        samples[self.index] = ns
+        self.index = (self.index + 1) % len(samples)
+        self.count += 1
+        self.total_ns += ns
+
+    def summary(self):
+        window = sorted(self.samples[:min(self.count, len(self.samples))])
+        if not window:
+            return SpanSummary(0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        last = len(window) - 1
+
+        def percentile(p):
+            return window[min(last, int(p * len(window)))] / 1e6
+
+        return SpanSummary(self.count, percentile(0.50), percentile(0.95), percentile(0.99),
+                           window[-1] / 1e6, self.total_ns / 1e9)
+
+
+class _Span:
+    __slots__ = ('_recorder', '_start')
+
+    def __init__(self, recorder):
+        self._recorder = recorder
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._recorder.add(time.perf_counter_ns() - self._start)
+        return False
+
+
+class Instrumentation:
+
+    def __init__(self, window=1024, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._recorders = {}
+        self._lock = threading.Lock()
+
+    def _recorder(self, name):
+        recorder = self._recorders.get(name)
+        if recorder is None:
+            with self._lock:
+                recorder = self._recorders.setdefault(name, SpanRecorder(self.window))
+        return recorder
+
+    def span(self, name):
+        # with instrumentation.span('ui.labels'): ...
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self._recorder(name))
+
+    def record(self, name, ns):
+        if self.enabled:
+            self._recorder(name).add(ns)
+
+    def lap(self, name, start):
+        # Etapas seguidas sin anidar bloques with:
+        #   t = time.perf_counter_ns(); ...; t = instrumentation.lap('etapa', t)
+        now = time.perf_counter_ns()
+        if self.enabled:
+            self._recorder(name).add(now - start)
+        return now
+
+    def wrap(self, name, func):
+        recorder = self._recorder(name)
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.add(time.perf_counter_ns() - start)
+
+        return timed
+
+    def summary(self):
+        return {name: recorder.summary() for name, recorder in list(self._recorders.items())}
+
+
+def format_summary(summary, limit=None):
+    # Líneas de texto ordenadas por p95, para el overlay y la consola
+    items = sorted(summary.items(), key=lambda item: item[1].p95_ms, reverse=True)[:limit]
+    width = max((len(name) for name, _ in items), default=0)
+    return [f"{name:<{width}}  p50 {stats.p50_ms:7.2f}  p95 {stats.p95_ms:7.2f}  "
+            f"p99 {stats.p99_ms:7.2f} ms  n={stats.count}"
+            for name, stats in items]
+
+
+class SelfMonitor:
+
+    def __init__(self, process=None, clock=time.monotonic, cpu_clock=time.process_time):
+        self._process = process or psutil.Process()
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+        self._last = (clock(), cpu_clock())
+
+    def sample(self):
+        now, cpu = self._clock(), self._cpu_clock()
+        last_now, last_cpu = self._last
+        self._last = (now, cpu)
+        elapsed = now - last_now
+        cpu_percent = (cpu - last_cpu) / elapsed * 100 if elapsed > 0 else 0.0
+        return SelfSample(round(cpu_percent, 2), round(self._process.memory_info().rss / 1024**2, 1),
+                          threading.active_count())
+
+
+class RunProfiler:
+    # enable_thread() en cada hilo que se quiera perfilar (el principal, el
+    # del loop y los del pool como initializer); dump() al terminar, con los
+    # hilos ya detenidos
+
+    def __init__(self):
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def enable_thread(self):
+        # cProfile y pstats sólo se importan si se pidió un perfil
+        import cProfile
+
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def dump(self, path):
+        import pstats
+
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        return stats
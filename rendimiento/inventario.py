@@ -0,0 +1,248 @@
+import glob
+import hashlib
+import json
+import os
+import platform
+import struct
+import sys
+
+import psutil
+
+# Inventario de hardware: valores que no cambian mientras corre el proceso
+# (modelo de CPU y GPU, RAM instalada y su velocidad). Se consultan una sola
+# vez al arrancar, se guardan en disco junto con una huella de la máquina y
+# se sirven desde memoria en cada tick.
+
+INVENTORY_FIELDS = ('cpu_model', 'gpu_model', 'total_ram', 'ram_speed')
+
+
+class HardwareInventory:
+    __slots__ = INVENTORY_FIELDS
+
+    def __init__(self, cpu_model=None, gpu_model=None, total_ram=None, ram_speed=None):
+        self.cpu_model = cpu_model
+        self.gpu_model = gpu_model
+        # RAM instalada en GB y velocidad máxima de los módulos en MHz
+        self.total_ram = total_ram
+        self.ram_speed = ram_speed
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in INVENTORY_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in INVENTORY_FIELDS})
+
+    def __repr__(self):
+        campos = ', '.join(f"{field}={getattr(self, field)!r}" for field in INVENTORY_FIELDS)
+        return f"HardwareInventory({campos})"
+
+
+# Backend de Linux
+
+def _read_text(path):
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _linux_cpu_model(cpuinfo_path='/proc/cpuinfo'):
+    cpuinfo = _read_text(cpuinfo_path)
+    if cpuinfo is None:
+        return None
+    # x86 usa "model name"; algunas placas ARM sólo reportan "Hardware" o "Processor"
+    for key in ('model name', 'Hardware', 'Processor'):
+        for line in cpuinfo.splitlines():
+            name, sep, value = line.partition(':')
+            if sep and name.strip() == key and value.strip():
+                return value.strip()
+    return None
+
+
+def _linux_gpu_model(nvidia_path='/proc/driver/nvidia/gpus'):
+    for information in sorted(glob.glob(os.path.join(nvidia_path, '*', 'information'))):
+        for line in (_read_text(information) or '').splitlines():
+            name, sep, value = line.partition(':')
+            if sep and name.strip() == 'Model':
+                return value.strip()
+    return None
+
+
+def _smbios_structures(data, wanted_type):
+    # Recorre la tabla SMBIOS cruda (lo mismo que lee dmidecode): cada
+    # estructura tiene una parte formateada seguida de cadenas terminadas en
+    # doble NUL
+    offset = 0
+    while offset + 4 <= len(data):
+        struct_type, length = data[offset], data[offset + 1]
+        if struct_type == 127 or length < 4:
+            break
+        end = data.find(b'\0\0', offset + length)
+        if end < 0:
+            break
+        if struct_type == wanted_type:
+            yield data[offset:offset + length]
+        offset = end + 2
+
+
+def _smbios_memory_devices(dmi_path='/sys/firmware/dmi/tables/DMI'):
+    try:
+        with open(dmi_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+
+    modules = []
+    for device in _smbios_structures(data, 17):
+        if len(device) < 0x17:
+            continue
+        size, = struct.unpack_from('<H', device, 0x0C)
+        if size in (0, 0xFFFF):
+            # Ranura vacía o tamaño desconocido
+            continue
+        if size == 0x7FFF and len(device) >= 0x20:
+            size_bytes = struct.unpack_from('<I', device, 0x1C)[0] * 1024**2
+        elif size & 0x8000:
+            size_bytes = (size & 0x7FFF) * 1024
+        else:
+            size_bytes = size * 1024**2
+
+        speed, = struct.unpack_from('<H', device, 0x15)
+        if speed == 0xFFFF and len(device) >= 0x58:
+            speed = struct.unpack_from('<I', device, 0x54)[0]
+        modules.append((size_bytes, speed or None))
+    return modules
+
+
+def _linux_online_memory(memory_path='/sys/devices/system/memory'):
+    block_size = _read_text(os.path.join(memory_path, 'block_size_bytes'))
+    if block_size is None:
+        return None
+    online = 0
+    for state in glob.glob(os.path.join(memory_path, 'memory*', 'state')):
+        if (_read_text(state) or '').strip() == 'online':
+            online += 1
+    if online == 0:
+        return None
+    return int(block_size.strip(), 16) * online
+
+
+def probe_linux():
+    modules = _smbios_memory_devices()
+    if modules:
+        total_bytes = sum(size for size, _ in modules)
+    else:
+        total_bytes = _linux_online_memory() or psutil.virtual_memory().total
+    speeds = [speed for _, speed in modules if speed]
+    return HardwareInventory(
+        cpu_model=_linux_cpu_model(),
+        gpu_model=_linux_gpu_model(),
+        total_ram=total_bytes / 1024**3,
+        ram_speed=max(speeds) if speeds else None,
+    )
+
+
+# Backend de Windows (WMI + NVML), las mismas consultas que hacían los scripts
+# pero sobre las sesiones persistentes de rendimiento.sesiones
+
+def probe_windows(wmi_session=None, nvml_session=None):
+    from rendimiento.sesiones import NvmlSession, WmiSession
+
+    wmi_session = wmi_session or WmiSession()
+    cpu_model = wmi_session.query('Win32_Processor')[0].Name
+    ram_modules = wmi_session.query('Win32_PhysicalMemory')
+    total_ram = sum(int(module.Capacity) for module in ram_modules) / 1024**3
+    ram_speeds = [int(module.Speed) for module in ram_modules if module.Speed]
+
+    nvml_session = nvml_session or NvmlSession()
+    try:
+        gpu_model = nvml_session.call('nvmlDeviceGetName', 0)
+        if isinstance(gpu_model, bytes):
+            gpu_model = gpu_model.decode()
+    except Exception:
+        # Sin GPU NVIDIA o sin driver
+        gpu_model = None
+
+    return HardwareInventory(
+        cpu_model=cpu_model,
+        gpu_model=gpu_model,
+        total_ram=total_ram,
+        ram_speed=max(ram_speeds) if ram_speeds else None,
+    )
+
+
+def probe(wmi_session=None, nvml_session=None):
+    if sys.platform.startswith('win'):
+        return probe_windows(wmi_session, nvml_session)
+    return probe_linux()
+
+
+def fingerprint():
+    # Datos baratos de obtener que cambian si cambia la máquina o su
+    # hardware; si no coinciden se vuelve a consultar el inventario
+    partes = (
+        platform.node(),
+        platform.system(),
+        platform.machine(),
+        str(psutil.cpu_count()),
+        str(psutil.virtual_memory().total),
+    )
+    return hashlib.sha256('|'.join(partes).encode()).hexdigest()
+
+
+def default_cache_path():
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'rendimiento', 'inventario.json')
+
+
+class InventoryCache:
+
+    def __init__(self, path=None, probe=probe, fingerprint=fingerprint):
+        # path=False desactiva el guardado en disco
+        self.path = default_cache_path() if path is None else path
+        self._probe = probe
+        self._fingerprint = fingerprint
+        self._inventory = None
+
+    def get(self):
+        if self._inventory is None:
+            self._inventory = self._load() or self.refresh()
+        return self._inventory
+
+    def refresh(self):
+        # Para eventos de hot-plug: vuelve a consultar el hardware y
+        # reescribe la copia en disco
+        self._inventory = self._probe()
+        self._save(self._inventory)
+        return self._inventory
+
+    def _load(self):
+        if not self.path:
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('fingerprint') != self._fingerprint():
+            return None
+        return HardwareInventory.from_dict(data.get('inventory', {}))
+
+    def _save(self, inventory):
+        if not self.path:
+            return
+        data = {'fingerprint': self._fingerprint(), 'inventory': inventory.to_dict()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Sin caché en disco el inventario sigue sirviéndose desde memoria
+            pass
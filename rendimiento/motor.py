@@ -0,0 +1,116 @@
+import collections
+import threading
+import time
+from types import MappingProxyType
+
+# Motor de recolección en segundo plano. Cada colector corre con su propio
+# periodo (ver rendimiento.asincrono); los resultados se publican como una
+# instantánea inmutable que se reemplaza completa (copy-on-write), así el hilo
+# de la interfaz sólo lee la referencia más reciente sin bloquearse. Un
+# colector que rebasa su timeout se marca como obsoleto (stale) con su último
+# valor y no se vuelve a lanzar hasta que termine, para no acumular hilos
+# colgados.
+
+Reading = collections.namedtuple('Reading', ('value', 'timestamp', 'duration', 'stale', 'error'))
+
+
+class Collector:
+
+    def __init__(self, name, func, period=1.0, timeout=None, cost=0.01):
+        # period=None: se ejecuta una sola vez al arrancar. cost es el tiempo
+        # estimado por llamada en segundos; los colectores baratos corren
+        # directamente en el loop y los caros en el pool de hilos
+        self.name = name
+        self.func = func
+        self.period = period
+        self.timeout = timeout if timeout is not None else max(2 * (period or 1.0), 5.0)
+        self.cost = cost
+
+    def __repr__(self):
+        return f"Collector({self.name!r}, period={self.period}, timeout={self.timeout})"
+
+
+class Snapshot:
+    __slots__ = ('readings', 'sequence', 'timestamp')
+
+    def __init__(self, readings, sequence, timestamp):
+        self.readings = MappingProxyType(readings)
+        self.sequence = sequence
+        self.timestamp = timestamp
+
+    def value(self, name, default=None):
+        reading = self.readings.get(name)
+        return default if reading is None or reading.value is None else reading.value
+
+    def is_stale(self, name):
+        reading = self.readings.get(name)
+        return reading is None or reading.stale
+
+
+EMPTY_SNAPSHOT = Snapshot({}, 0, 0.0)
+
+
+class SnapshotPublisher:
+    # Los escritores se serializan con un candado; los lectores sólo leen
+    # self.latest, que se reemplaza en una sola asignación
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.latest = EMPTY_SNAPSHOT
+        self._listeners = []
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def publish(self, name, reading):
+        with self._lock:
+            readings = dict(self.latest.readings)
+            readings[name] = reading
+            snapshot = Snapshot(readings, self.latest.sequence + 1, self._clock())
+            self.latest = snapshot
+        for callback in self._listeners:
+            callback(snapshot)
+        return snapshot
+
+    def mark_stale(self, name, error=None):
+        previous = self.latest.readings.get(name)
+        value = previous.value if previous else None
+        timestamp = previous.timestamp if previous else None
+        return self.publish(name, Reading(value, timestamp, None, True, error))
+
+
+class CollectionEngine:
+    # Corre el núcleo de asyncio (rendimiento.asincrono) en un hilo propio
+    # para que la interfaz Tk sólo tenga que leer latest()
+
+    def __init__(self, collectors, max_workers=4, publisher=None, instrumentation=None, thread_initializer=None):
+        from rendimiento.asincrono import AsyncCollectionCore
+
+        self.core = AsyncCollectionCore(collectors, publisher, max_workers, instrumentation=instrumentation,
+                                        thread_initializer=thread_initializer)
+        self.publisher = self.core.publisher
+        self.collectors = {collector.name: collector for collector in self.core.collectors}
+        self._loop = None
+        self._thread = None
+
+    def latest(self):
+        return self.publisher.latest
+
+    def start(self):
+        # asyncio se importa aquí: Collector y Snapshot se usan también en
+        # modos que no arrancan el motor y no deben pagar su importación
+        import asyncio
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self.core.run(),),
+                                        name='motor-recoleccion', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self.core.stop)
+        if wait:
+            self._thread.join()
+            self._loop.close()
@@ -0,0 +1,69 @@
+import collections
+import math
+import time
+
+# Planificador periódico sobre root.after de Tkinter. Cada ejecución se
+# programa contra un horario fijo (inicio + k * intervalo) y no contra el fin
+# de la anterior, así el tiempo de recolección no se acumula como deriva. Si
+# una ejecución tarda más de un intervalo se saltan los ticks perdidos en lugar
+# de encadenarlos. El retraso de cada tick respecto a su horario (jitter) se
+# guarda en una ventana para mostrarlo o exportarlo.
+
+
+class TkScheduler:
+
+    def __init__(self, root, interval, callback, *args, clock=time.monotonic, jitter_window=120):
+        self.root = root
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self._clock = clock
+        self._deadline = None
+        self._after_id = None
+        self._last_start = None
+        self._lateness = collections.deque(maxlen=jitter_window)
+        self._periods = collections.deque(maxlen=jitter_window)
+        self.ticks = 0
+        self.skipped = 0
+
+    def start(self):
+        self._deadline = self._clock()
+        self._after_id = self.root.after(0, self._run)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _run(self):
+        start = self._clock()
+        self._lateness.append(start - self._deadline)
+        if self._last_start is not None:
+            self._periods.append(start - self._last_start)
+        self._last_start = start
+        self.ticks += 1
+        try:
+            self.callback(*self.args)
+        finally:
+            self._deadline += self.interval
+            now = self._clock()
+            if now > self._deadline:
+                missed = math.floor((now - self._deadline) / self.interval) + 1
+                self._deadline += missed * self.interval
+                self.skipped += missed
+            delay_ms = max(0, round((self._deadline - now) * 1000))
+            self._after_id = self.root.after(delay_ms, self._run)
+
+    def jitter(self):
+        # Retraso respecto al horario en ms: promedio, p95 y máximo
+        if not self._lateness:
+            return {'mean_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        lateness = sorted(abs(value) * 1000 for value in self._lateness)
+        p95 = lateness[min(len(lateness) - 1, math.ceil(len(lateness) * 0.95) - 1)]
+        return {'mean_ms': sum(lateness) / len(lateness), 'p95_ms': p95, 'max_ms': lateness[-1]}
+
+    def period(self):
+        # Periodo real promedio en segundos
+        if not self._periods:
+            return self.interval
+        return sum(self._periods) / len(self._periods)
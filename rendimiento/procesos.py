@@ -0,0 +1,319 @@
+import collections
+import heapq
+import operator
+import time
+
+import psutil
+
+# Tabla de procesos persistente. Cada proceso se identifica por
+# (pid, create_time) para no confundir un PID reutilizado, y su objeto
+# psutil.Process se conserva entre ticks: así cpu_percent() mide contra la
+# lectura anterior en lugar de regresar 0.0, y cada tick sólo se actualizan
+# los valores de las filas existentes en lugar de crear tuplas y dicts nuevos.
+#
+# Además de CPU y memoria, cada fila puede llevar el detalle de E/S (bytes/s
+# leídos y escritos), hilos, descriptores abiertos (handles en Windows) y
+# cambios de contexto por segundo. Modos de detalle:
+#   - 'basic': sólo CPU, memoria y bytes de E/S acumulados;
+#   - 'full': todo, para cada proceso, dentro del mismo oneshot();
+#   - 'adaptive': CPU y memoria para todos; el detalle sólo para los
+#     candidatos (los K primeros por CPU y RSS de este tick, los K primeros de
+#     cada campo de detalle del tick anterior y los procesos nuevos) y después
+#     para los demás en turno rotativo mientras quede presupuesto de CPU
+#     (detail_budget segundos de process_time por tick). Las tasas de un
+#     proceso que se detalla cada varios ticks se calculan sobre todo el
+#     intervalo desde su lectura anterior. Si en un tick el turno alcanzó a
+#     todos los procesos dentro del presupuesto, los siguientes leen el
+#     detalle dentro del mismo oneshot() como 'full' (más barato que la
+#     segunda pasada) mientras el costo por proceso medido en ese turno,
+#     por el número de procesos, quepa en el presupuesto.
+
+# Filas que entraron, salieron y cambiaron de valores en un update()
+ProcessEvents = collections.namedtuple('ProcessEvents', ('started', 'exited', 'changed'))
+
+DETAIL_MODES = ('basic', 'full', 'adaptive')
+
+_GONE = (psutil.NoSuchProcess, psutil.ZombieProcess)
+
+# Descriptores en POSIX, handles en Windows
+_COUNT_FDS = 'num_fds' if hasattr(psutil.Process, 'num_fds') else 'num_handles'
+
+# Campos de detalle que deciden quién es candidato en el modo adaptativo
+_DETAIL_FIELDS = ('read_rate', 'write_rate', 'num_threads', 'num_fds', 'ctx_switch_rate')
+
+
+class ProcessRow:
+    __slots__ = ('pid', 'ppid', 'create_time', 'name', 'cpu_percent', 'memory_percent', 'rss',
+                 'io_bytes', 'gpu_percent', 'gpu_memory_mb', 'process',
+                 'read_rate', 'write_rate', 'num_threads', 'num_fds', 'ctx_switch_rate',
+                 '_io_read', '_io_write', '_ctx_switches', '_detail_at')
+
+    def __init__(self, pid, create_time, name, process=None, ppid=None):
+        self.pid = pid
+        # Padre al arrancar; no se sigue si el proceso se re-asigna a otro
+        self.ppid = ppid
+        self.create_time = create_time
+        self.name = name
+        self.cpu_percent = 0.0
+        self.memory_percent = 0.0
+        self.rss = 0
+        self.io_bytes = 0
+        self.gpu_percent = 0.0
+        self.gpu_memory_mb = 0.0
+        self.process = process
+        # Detalle: bytes/s, hilos, descriptores y cambios de contexto/s
+        self.read_rate = 0.0
+        self.write_rate = 0.0
+        self.num_threads = 0
+        self.num_fds = 0
+        self.ctx_switch_rate = 0.0
+        # Contadores de la lectura de detalle anterior
+        self._io_read = None
+        self._io_write = None
+        self._ctx_switches = None
+        self._detail_at = None
+
+    @property
+    def key(self):
+        return (self.pid, self.create_time)
+
+    def __repr__(self):
+        return (f"ProcessRow(pid={self.pid}, name={self.name!r}, cpu_percent={self.cpu_percent}, "
+                f"memory_percent={self.memory_percent:.1f})")
+
+
+class ProcessRegistry:
+
+    def __init__(self, pids=psutil.pids, process_factory=psutil.Process,
+                 virtual_memory=psutil.virtual_memory, detail='basic', detail_k=10,
+                 detail_budget=0.005, clock=time.monotonic, cpu_clock=time.process_time):
+        if detail not in DETAIL_MODES:
+            raise ValueError(f"detail debe ser uno de {DETAIL_MODES}")
+        self._pids = pids
+        self._process_factory = process_factory
+        self._virtual_memory = virtual_memory
+        self.detail = detail
+        self.detail_k = detail_k
+        self.detail_budget = detail_budget
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+        self._rows = {}
+        # Turno rotativo del modo adaptativo y cuántos se detallaron
+        self._detail_cursor = 0
+        self.detailed = 0
+        # Modo adaptativo con el detalle dentro del recorrido principal, y
+        # el costo de detallar un proceso medido en el último turno
+        self._inline_detail = False
+        self._detail_cost = 0.0
+        # PIDs que no se pudieron abrir (AccessDenied); no se reintentan
+        # mientras sigan vivos
+        self._denied = set()
+        # Callbacks que reciben la fila al iniciar o terminar un proceso
+        self.on_start = []
+        self.on_exit = []
+        # Eventos del último update() y cuántos updates van, para que
+        # ProcessGroups sepa si vio todos
+        self.events = ProcessEvents([], [], [])
+        self.updates = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def rows(self):
+        return self._rows.values()
+
+    def get(self, pid):
+        return self._rows.get(pid)
+
+    def update(self, gpu_usage_by_pid=None):
+        gpu_usage_by_pid = gpu_usage_by_pid or {}
+        total_memory = self._virtual_memory().total
+        current = set(self._pids())
+        now = self._clock()
+        adaptive = self.detail == 'adaptive'
+        inline = self.detail == 'full' or (adaptive and self._inline_detail)
+        basic = self.detail == 'basic'
+        started = []
+        exited = []
+        changed = []
+
+        # Procesos que ya no están en la lista de PIDs
+        for pid in self._rows.keys() - current:
+            exited.append(self._rows.pop(pid))
+        self._denied &= current
+
+        for pid in current:
+            row = self._rows.get(pid)
+            fresh = row is None
+            if fresh:
+                if pid in self._denied:
+                    continue
+                row = self._start(pid)
+                if row is None:
+                    continue
+                started.append(row)
+            try:
+                with row.process.oneshot():
+                    if fresh:
+                        # _start() acaba de leer cpu_percent como referencia
+                        cpu_percent = row.cpu_percent
+                    elif not row.process.is_running():
+                        # psutil guarda create_time(): is_running() lo vuelve
+                        # a leer y detecta que otro proceso reutilizó el PID
+                        raise psutil.NoSuchProcess(pid)
+                    else:
+                        cpu_percent = row.process.cpu_percent()
+                    rss = row.process.memory_info().rss
+                    dirty = cpu_percent != row.cpu_percent or rss != row.rss
+                    row.cpu_percent = cpu_percent
+                    row.rss = rss
+                    if inline:
+                        self._read_detail(row, now)
+                        dirty = True
+                    elif basic:
+                        # En el modo adaptativo la E/S va con el detalle
+                        try:
+                            io = row.process.io_counters()
+                            io_bytes = io.read_bytes + io.write_bytes
+                            dirty = dirty or io_bytes != row.io_bytes
+                            row.io_bytes = io_bytes
+                        except (psutil.AccessDenied, AttributeError, NotImplementedError):
+                            pass
+            except _GONE:
+                exited.append(self._rows.pop(pid))
+                replacement = self._start(pid)
+                if replacement is not None:
+                    started.append(replacement)
+                continue
+            except psutil.AccessDenied:
+                # Una parte de la fila pudo cambiar antes del error
+                changed.append(row)
+                continue
+            memory_percent = rss / total_memory * 100
+            if memory_percent != row.memory_percent:
+                row.memory_percent = memory_percent
+                dirty = True
+
+            gpu_usage = gpu_usage_by_pid.get(pid)
+            if gpu_usage is not None:
+                if row.gpu_percent != gpu_usage.sm_util or row.gpu_memory_mb != gpu_usage.memory_mb:
+                    row.gpu_percent = gpu_usage.sm_util
+                    row.gpu_memory_mb = gpu_usage.memory_mb
+                    dirty = True
+            elif row.gpu_percent or row.gpu_memory_mb:
+                row.gpu_percent = 0.0
+                row.gpu_memory_mb = 0.0
+                dirty = True
+            if dirty:
+                changed.append(row)
+
+        if inline and adaptive:
+            self.detailed = len(self._rows)
+            # Si ya no cabe el detalle de todos se vuelve a los candidatos y
+            # al turno rotativo
+            self._inline_detail = len(self._rows) * self._detail_cost < self.detail_budget
+        elif adaptive:
+            self._inline_detail = self._adaptive_detail(now, changed)
+
+        for callback in self.on_exit:
+            for row in exited:
+                callback(row)
+        for callback in self.on_start:
+            for row in started:
+                callback(row)
+        self.events = ProcessEvents(started, exited, changed)
+        self.updates += 1
+        return self.events
+
+    def _read_detail(self, row, now):
+        # Se llama dentro de oneshot(); cada campo puede fallar por permisos
+        # sin perder los demás
+        process = row.process
+        elapsed = None if row._detail_at is None else now - row._detail_at
+        try:
+            io = process.io_counters()
+        except (psutil.AccessDenied, AttributeError, NotImplementedError):
+            io = None
+        if io is not None:
+            row.io_bytes = io.read_bytes + io.write_bytes
+            if elapsed and row._io_read is not None:
+                row.read_rate = max(0, io.read_bytes - row._io_read) / elapsed
+                row.write_rate = max(0, io.write_bytes - row._io_write) / elapsed
+            row._io_read = io.read_bytes
+            row._io_write = io.write_bytes
+        try:
+            row.num_threads = process.num_threads()
+            switches = process.num_ctx_switches()
+        except (psutil.AccessDenied, NotImplementedError):
+            switches = None
+        if switches is not None:
+            total = switches.voluntary + switches.involuntary
+            if elapsed and row._ctx_switches is not None:
+                row.ctx_switch_rate = max(0, total - row._ctx_switches) / elapsed
+            row._ctx_switches = total
+        try:
+            row.num_fds = getattr(process, _COUNT_FDS)()
+        except (psutil.AccessDenied, NotImplementedError):
+            pass
+        row._detail_at = now
+
+    def _detail(self, row, now):
+        try:
+            with row.process.oneshot():
+                self._read_detail(row, now)
+        except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+            # Si terminó, el siguiente update lo saca de la tabla
+            return False
+        return True
+
+    def _adaptive_detail(self, now, changed):
+        # Agrega a changed las filas que detalla. Regresa True si el turno
+        # alcanzó a todos los procesos sin agotar el presupuesto
+        rows = list(self._rows.values())
+        if not rows:
+            return False
+        k = self.detail_k
+        candidates = {}
+        for key in ('cpu_percent', 'rss') + _DETAIL_FIELDS:
+            for row in heapq.nlargest(k, rows, key=operator.attrgetter(key)):
+                candidates[row.pid] = row
+        for row in rows:
+            if row._detail_at is None:
+                candidates[row.pid] = row
+
+        start = self._cpu_clock()
+        detailed = 0
+        for row in candidates.values():
+            detailed += self._detail(row, now)
+        changed.extend(candidates.values())
+        # El resto en turno rotativo mientras alcance el presupuesto
+        count = len(rows)
+        cursor = self._detail_cursor % count
+        visited = 0
+        while visited < count and self._cpu_clock() - start < self.detail_budget:
+            row = rows[(cursor + visited) % count]
+            visited += 1
+            if row.pid not in candidates:
+                detailed += self._detail(row, now)
+                changed.append(row)
+        self._detail_cursor = cursor + visited
+        self.detailed = detailed
+        elapsed = self._cpu_clock() - start
+        if detailed:
+            self._detail_cost = elapsed / detailed
+        return visited == count and elapsed < self.detail_budget
+
+    def _start(self, pid):
+        try:
+            process = self._process_factory(pid)
+            with process.oneshot():
+                row = ProcessRow(pid, process.create_time(), process.name(), process, process.ppid())
+                # Primera lectura de referencia para cpu_percent
+                process.cpu_percent()
+        except psutil.AccessDenied:
+            self._denied.add(pid)
+            return None
+        except _GONE:
+            return None
+        self._rows[pid] = row
+        return row
@@ -0,0 +1,45 @@
+import heapq
+import operator
+
+# Ranking de procesos en una sola pasada: se recorre la tabla de procesos una
+# vez y se mantiene un heap acotado de tamaño K por cada criterio (CPU, RSS,
+# IO, GPU), en lugar de ordenar la lista completa una vez por criterio. Las
+# filas son rendimiento.procesos.ProcessRow o cualquier objeto con los mismos
+# atributos, como los grupos de rendimiento.grupos.ProcessGroups.
+
+RANKING_KEYS = {
+    'cpu': operator.attrgetter('cpu_percent'),
+    'rss': operator.attrgetter('rss'),
+    'io': operator.attrgetter('io_bytes'),
+    'gpu': operator.attrgetter('gpu_percent'),
+    # Requieren detail='full' o 'adaptive' en ProcessRegistry
+    'io_rate': lambda row: row.read_rate + row.write_rate,
+    'threads': operator.attrgetter('num_threads'),
+    'fds': operator.attrgetter('num_fds'),
+    'ctx': operator.attrgetter('ctx_switch_rate'),
+}
+
+
+def rank_processes(rows, k, keys=tuple(RANKING_KEYS)):
+    # Un heap de mínimos por criterio: la raíz es el peor de los K mejores y
+    # sólo se toca el heap cuando la fila la supera. El índice negado hace
+    # que en un empate gane la fila que se vio primero.
+    heaps = {name: [] for name in keys}
+    pairs = [(heaps[name], RANKING_KEYS[name]) for name in keys]
+    if k <= 0:
+        return {name: [] for name in keys}
+    for index, row in enumerate(rows):
+        for heap, key in pairs:
+            score = key(row)
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -index, row))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, -index, row))
+    return {name: [row for _, _, row in sorted(heap, reverse=True)] for name, heap in heaps.items()}
+
+
+def top_processes(registry, k, keys=tuple(RANKING_KEYS), gpu_usage_by_pid=None):
+    # Actualiza la tabla persistente (un solo recorrido con oneshot()) y
+    # regresa los rankings pedidos
+    registry.update(gpu_usage_by_pid)
+    return rank_processes(registry.rows(), k, keys)
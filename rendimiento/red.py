@@ -0,0 +1,92 @@
+import collections
+import time
+
+import psutil
+
+# Tasas de red por interfaz. Se guarda la lectura anterior de
+# net_io_counters(pernic=True) y cada muestra calcula bytes/s, paquetes/s,
+# errores/s y descartes/s con el reloj monotónico. Los contadores que dan la
+# vuelta (32 bits en Windows y en algunos drivers) se corrigen; si la
+# diferencia no es creíble se toma como reinicio del contador. Una interfaz
+# que desaparece en el mismo tick en que aparece otra con contadores mayores o
+# iguales se considera renombrada y conserva su historial.
+
+NIC_FIELDS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+              'errin', 'errout', 'dropin', 'dropout')
+
+NicRates = collections.namedtuple('NicRates', NIC_FIELDS)
+NetworkSample = collections.namedtuple('NetworkSample', ('total', 'per_nic', 'interval'))
+
+ZERO_RATES = NicRates(*([0.0] * len(NIC_FIELDS)))
+
+# Interfaces que no cuentan en el total
+LOOPBACK_NAMES = ('lo', 'Loopback Pseudo-Interface 1')
+
+_WRAP_32 = 2**32
+
+
+def _delta(new, old):
+    if new >= old:
+        return new - old
+    if old < _WRAP_32:
+        wrapped = new + _WRAP_32 - old
+        if wrapped < _WRAP_32 // 2:
+            return wrapped
+    # Contador reiniciado (interfaz recreada, driver recargado)
+    return new
+
+
+class NetworkRateCollector:
+
+    def __init__(self, net_io_counters=psutil.net_io_counters, clock=time.monotonic,
+                 exclude=LOOPBACK_NAMES):
+        self._net_io_counters = net_io_counters
+        self._clock = clock
+        self._exclude = frozenset(exclude)
+        self._previous = self._read()
+        self._previous_time = clock()
+
+    def _read(self):
+        # snetio de psutil ya es una tupla con los campos de NIC_FIELDS
+        return self._net_io_counters(pernic=True, nowrap=False)
+
+    def sample(self):
+        current = self._read()
+        now = self._clock()
+        interval = now - self._previous_time
+        previous = self._previous
+        renamed = self._match_renames(previous, current)
+
+        per_nic = {}
+        totals = [0.0] * len(NIC_FIELDS)
+        for name, counters in current.items():
+            old = previous.get(name) or renamed.get(name)
+            if old is None or interval <= 0 or old == counters:
+                # Interfaz nueva (esta lectura sólo sirve de referencia) o
+                # sin tráfico, el caso común de las interfaces virtuales
+                per_nic[name] = ZERO_RATES
+                continue
+            rates = NicRates(*[_delta(new, last) / interval for new, last in zip(counters, old)])
+            per_nic[name] = rates
+            if name not in self._exclude:
+                for i, value in enumerate(rates):
+                    totals[i] += value
+
+        self._previous = current
+        self._previous_time = now
+        return NetworkSample(NicRates(*totals), per_nic, interval)
+
+    def _match_renames(self, previous, current):
+        gone = [name for name in previous if name not in current]
+        if not gone:
+            return {}
+        renamed = {}
+        for name in current:
+            if name in previous:
+                continue
+            candidates = [old for old in gone
+                          if all(new >= last for new, last in zip(current[name], previous[old]))]
+            if len(candidates) == 1:
+                renamed[name] = previous[candidates[0]]
+                gone.remove(candidates[0])
+        return renamed
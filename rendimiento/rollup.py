@@ -0,0 +1,198 @@
+import math
+import time
+
+import numpy as np
+
+# Historial en varias resoluciones (1 s, 10 s, 1 min, 1 h). Cada nivel guarda
+# min, max, promedio y último valor por intervalo en un buffer circular; cada
+# muestra actualiza el intervalo en curso de todos los niveles en O(1), sin
+# recalcular nada. Para graficar, query() escoge el nivel más fino que cubre
+# la ventana pedida y decimate() limita los puntos que se le pasan a
+# matplotlib sin importar el tamaño de la ventana.
+
+ROLLUP_STATS = ('min', 'max', 'mean', 'last')
+
+# (segundos por intervalo, intervalos guardados)
+DEFAULT_LEVELS = (
+    (1, 3600),           # 1 hora a 1 s
+    (10, 8640),          # 1 día a 10 s
+    (60, 10080),         # 1 semana a 1 min
+    (3600, 24 * 90),     # 90 días a 1 h
+)
+
+
+class RollupLevel:
+
+    def __init__(self, num_metrics, resolution, capacity):
+        self.resolution = resolution
+        self.capacity = capacity
+        # Misma técnica que MetricHistory: cada intervalo se escribe en i y
+        # en i + capacidad para que cualquier ventana sea contigua
+        self._stats = np.full((len(ROLLUP_STATS), num_metrics, 2 * capacity), np.nan, dtype=np.float32)
+        self._starts = np.full(2 * capacity, np.nan, dtype=np.float64)
+        self._slot = -1
+        self._count = 0
+        self._bucket = None
+        # Acumuladores del intervalo en curso
+        self._min = np.empty(num_metrics)
+        self._max = np.empty(num_metrics)
+        self._sum = np.empty(num_metrics)
+        self._n = np.empty(num_metrics)
+        self._last = np.empty(num_metrics)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, timestamp, values):
+        bucket = math.floor(timestamp / self.resolution)
+        if bucket != self._bucket:
+            if self._bucket is not None and bucket < self._bucket:
+                # Reloj hacia atrás: se acumula en el intervalo actual
+                bucket = self._bucket
+            else:
+                self._open(bucket)
+
+        valid = ~np.isnan(values)
+        np.fmin(self._min, values, out=self._min)
+        np.fmax(self._max, values, out=self._max)
+        self._sum[valid] += values[valid]
+        self._n += valid
+        self._last[valid] = values[valid]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self._sum / self._n
+        i = self._slot
+        for column in (i, i + self.capacity):
+            self._stats[0, :, column] = self._min
+            self._stats[1, :, column] = self._max
+            self._stats[2, :, column] = mean
+            self._stats[3, :, column] = self._last
+
+    def _open(self, bucket):
+        self._bucket = bucket
+        self._slot = (self._slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        start = bucket * self.resolution
+        self._starts[self._slot] = self._starts[self._slot + self.capacity] = start
+        self._min.fill(np.nan)
+        self._max.fill(np.nan)
+        self._sum.fill(0.0)
+        self._n.fill(0.0)
+        self._last.fill(np.nan)
+
+    def oldest_start(self):
+        if self._count == 0:
+            return None
+        return float(self._starts[self._slot + self.capacity - self._count + 1])
+
+    def window(self, stat, metric_index, since=None):
+        # Inicios de intervalo y valores de una estadística desde `since`
+        end = self._slot + self.capacity + 1
+        start = end - self._count
+        starts = self._starts[start:end]
+        if since is not None:
+            start += int(np.searchsorted(starts, since, side='left'))
+        return self._starts[start:end], self._stats[ROLLUP_STATS.index(stat), metric_index, start:end]
+
+
+class MultiResolutionHistory:
+
+    def __init__(self, metrics, levels=DEFAULT_LEVELS, clock=time.time):
+        self.metrics = tuple(metrics)
+        self._columns = {name: i for i, name in enumerate(self.metrics)}
+        self._clock = clock
+        self.levels = [RollupLevel(len(self.metrics), resolution, capacity)
+                       for resolution, capacity in sorted(levels)]
+        self._row = np.empty(len(self.metrics))
+
+    def append(self, values, timestamp=None):
+        # Mismo formato que MetricHistory.append: dict o secuencia
+        if timestamp is None:
+            timestamp = self._clock()
+        row = self._row
+        if isinstance(values, dict):
+            row.fill(np.nan)
+            for name, value in values.items():
+                if value is not None:
+                    row[self._columns[name]] = value
+        else:
+            row[:] = [np.nan if value is None else value for value in values]
+        for level in self.levels:
+            level.add(timestamp, row)
+
+    def level_for(self, seconds, max_points=None, now=None):
+        # El nivel más fino que todavía tiene datos de toda la ventana y que
+        # no rebasa max_points intervalos; si ninguno cubre la ventana
+        # completa se usa el de mayor alcance
+        now = self._clock() if now is None else now
+        since = now - seconds
+        for level in self.levels:
+            if max_points is not None and seconds / level.resolution > max_points * 4:
+                continue
+            oldest = level.oldest_start()
+            if oldest is not None and oldest <= since:
+                return level
+        return self.levels[-1]
+
+    def query(self, name, seconds, stat='mean', max_points=None, now=None):
+        now = self._clock() if now is None else now
+        level = self.level_for(seconds, max_points, now)
+        starts, values = level.window(stat, self._columns[name], since=now - seconds)
+        if max_points is not None and len(starts) > max_points:
+            return decimate(starts, values, max_points)
+        return starts, values
+
+
+def minmax_decimate(x, y, max_points):
+    # Se parte la serie en max_points / 2 bloques y de cada uno se conservan
+    # el mínimo y el máximo en orden temporal: los picos no se pierden
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    bins = max(max_points // 2, 1)
+    if n <= max_points:
+        return x, y
+    size = math.ceil(n / bins)
+    pad = bins * size - n
+    low = np.concatenate([np.where(np.isnan(y), np.inf, y), np.full(pad, np.inf)]).reshape(bins, size)
+    high = np.concatenate([np.where(np.isnan(y), -np.inf, y), np.full(pad, -np.inf)]).reshape(bins, size)
+    offsets = np.arange(bins) * size
+    index = np.stack([low.argmin(axis=1) + offsets, high.argmax(axis=1) + offsets], axis=1)
+    index.sort(axis=1)
+    index = np.unique(index.ravel())
+    index = index[index < n]
+    return x[index], y[index]
+
+
+def lttb(x, y, max_points):
+    # Largest-Triangle-Three-Buckets: conserva la forma visual de la serie
+    # con max_points puntos. Los NaN se descartan antes de decimar.
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return x, y
+
+    index = np.empty(max_points, dtype=np.int64)
+    index[0], index[-1] = 0, n - 1
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        ax, ay = x[selected], y[selected]
+        area = np.abs((ax - avg_x) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y - ay))
+        selected = start + int(area.argmax())
+        index[i + 1] = selected
+    return x[index], y[index]
+
+
+def decimate(x, y, max_points, method='minmax'):
+    if method == 'lttb':
+        return lttb(x, y, max_points)
+    return minmax_decimate(x, y, max_points)
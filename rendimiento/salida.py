@@ -0,0 +1,127 @@
+import csv
+import json
+import math
+import struct
+
+# Escritores de registros para el modo sin interfaz. Cada registro es
+# {'ts': segundos, colector: valor, ...}; las namedtuples y el inventario se
+# convierten en diccionarios. Todos escriben a un archivo con buffer propio y
+# sólo vacían el buffer cuando se llena, al cerrar o, con line_buffered, en
+# cada registro.
+#   - jsonl: una línea JSON por registro, con la estructura completa.
+#   - csv: columnas escalares aplanadas (network.total.bytes_recv, ...); las
+#     columnas se fijan con el primer registro.
+#   - binary: cabecera "RNDB" + longitud + JSON con las columnas, luego un
+#     registro float64 por tick en ese orden (NaN cuando falta el valor).
+
+BINARY_MAGIC = b'RNDB'
+
+
+def to_plain(value):
+    if hasattr(value, '_asdict'):
+        return {key: to_plain(item) for key, item in value._asdict().items()}
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def flatten(record, prefix=''):
+    # {'a': {'b': 1}} -> {'a.b': 1}; las listas usan el índice como clave
+    flat = {}
+    items = record.items() if isinstance(record, dict) else enumerate(record)
+    for key, value in items:
+        name = f'{prefix}{key}'
+        if isinstance(value, (dict, list)):
+            flat.update(flatten(value, name + '.'))
+        else:
+            flat[name] = value
+    return flat
+
+
+class JsonLinesWriter:
+
+    def __init__(self, stream, line_buffered=False):
+        self.stream = stream
+        self.line_buffered = line_buffered
+
+    def write(self, record):
+        self.stream.write(json.dumps(to_plain(record), ensure_ascii=False, separators=(',', ':')) + '\n')
+        if self.line_buffered:
+            self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+
+class CsvWriter:
+
+    def __init__(self, stream, line_buffered=False):
+        self.stream = stream
+        self.line_buffered = line_buffered
+        self._writer = None
+
+    def write(self, record):
+        row = flatten(to_plain(record))
+        if self._writer is None:
+            # Las columnas quedan fijas desde el primer registro; las que
+            # aparezcan después (un disco nuevo) se ignoran
+            self._writer = csv.DictWriter(self.stream, fieldnames=list(row), extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(row)
+        if self.line_buffered:
+            self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+
+class BinaryWriter:
+
+    def __init__(self, stream, line_buffered=False):
+        self.stream = stream
+        self.line_buffered = line_buffered
+        self.columns = None
+        self._record = None
+
+    def write(self, record):
+        row = {key: value for key, value in flatten(to_plain(record)).items()
+               if isinstance(value, (int, float)) or value is None}
+        if self.columns is None:
+            self.columns = list(row)
+            self._record = struct.Struct(f'<{len(self.columns)}d')
+            header = json.dumps({'columns': self.columns}).encode('utf-8')
+            self.stream.write(BINARY_MAGIC + struct.pack('<I', len(header)) + header)
+        values = [row.get(column) for column in self.columns]
+        self.stream.write(self._record.pack(*[math.nan if value is None else value for value in values]))
+        if self.line_buffered:
+            self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+
+def read_binary(stream):
+    # (columnas, iterador de tuplas) de un archivo escrito por BinaryWriter
+    if stream.read(4) != BINARY_MAGIC:
+        raise ValueError("no es un archivo binario de rendimiento")
+    size, = struct.unpack('<I', stream.read(4))
+    columns = json.loads(stream.read(size))['columns']
+    record = struct.Struct(f'<{len(columns)}d')
+
+    def rows():
+        while True:
+            data = stream.read(record.size)
+            if len(data) < record.size:
+                return
+            yield record.unpack(data)
+
+    return columns, rows()
+
+
+WRITERS = {'jsonl': JsonLinesWriter, 'csv': CsvWriter, 'binary': BinaryWriter}
@@ -0,0 +1,226 @@
+import collections
+import glob
+import os
+import re
+import sys
+
+# Proveedores de sensores (temperaturas, ventiladores, voltajes) con una
+# interfaz común:
+#   sensors()          -> SensorInfo de cada sensor disponible
+#   read()             -> {clave: valor} de todos los sensores
+#   read_one(clave)    -> valor de un solo sensor
+#   cpu_temperature()  -> temperatura del paquete del CPU o None
+#   close()
+# En Linux, HwmonProvider resuelve al arrancar las rutas exactas de
+# /sys/class/hwmon y /sys/class/thermal, deja los archivos abiertos y en cada
+# tick sólo hace un pread por sensor. En Windows, WmiSensorProvider usa
+# OpenHardwareMonitor con un índice nombre -> Identifier que se arma una vez;
+# cada tick pide sólo Identifier y Value, o un solo sensor por su clave, en
+# lugar de recorrer todos los objetos Sensor buscando 'CPU Package'.
+
+SensorInfo = collections.namedtuple('SensorInfo', ('key', 'kind', 'label', 'chip'))
+
+SENSOR_KINDS = ('temperature', 'fan', 'voltage', 'power', 'current')
+
+# prefijo de hwmon: (tipo, divisor para llevarlo a °C, RPM, V, W o A)
+_HWMON_PREFIXES = {
+    'temp': ('temperature', 1000.0),
+    'fan': ('fan', 1.0),
+    'in': ('voltage', 1000.0),
+    'power': ('power', 1000000.0),
+    'curr': ('current', 1000.0),
+}
+_HWMON_INPUT = re.compile(r'^(temp|fan|in|power|curr)(\d+)_(input|average)$')
+
+# Sensores que representan la temperatura del paquete del CPU, en orden de
+# preferencia: (chip, etiqueta)
+CPU_PACKAGE_SENSORS = (
+    ('coretemp', 'Package id 0'),
+    ('k10temp', 'Tctl'),
+    ('k10temp', 'Tdie'),
+    ('zenpower', 'Tdie'),
+    ('thermal', 'x86_pkg_temp'),
+    ('cpu_thermal', 'temp1'),
+    ('thermal', 'cpu-thermal'),
+    ('OpenHardwareMonitor', 'CPU Package'),
+)
+
+
+class SensorProvider:
+    # Base común; los proveedores llenan self._sensors y definen read_one
+
+    def __init__(self):
+        self._sensors = ()
+        self.cpu_key = None
+
+    def sensors(self):
+        return self._sensors
+
+    def read(self):
+        return {sensor.key: self.read_one(sensor.key) for sensor in self._sensors}
+
+    def read_one(self, key):
+        raise NotImplementedError
+
+    def cpu_temperature(self):
+        return None if self.cpu_key is None else self.read_one(self.cpu_key)
+
+    def _resolve_cpu_key(self):
+        by_label = {(sensor.chip, sensor.label): sensor.key for sensor in self._sensors
+                    if sensor.kind == 'temperature'}
+        for candidate in CPU_PACKAGE_SENSORS:
+            if candidate in by_label:
+                return by_label[candidate]
+        return None
+
+    def close(self):
+        pass
+
+
+class NullSensorProvider(SensorProvider):
+    # Sin sensores (plataforma sin backend o sin permisos)
+
+    def read_one(self, key):
+        return None
+
+
+def _read_text(path):
+    try:
+        with open(path, encoding='utf-8', errors='replace') as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+class HwmonProvider(SensorProvider):
+
+    def __init__(self, hwmon_root='/sys/class/hwmon', thermal_root='/sys/class/thermal'):
+        super().__init__()
+        self._fds = {}
+        self._scales = {}
+        sensors = []
+        chips = set()
+        for directory in sorted(glob.glob(os.path.join(hwmon_root, 'hwmon*'))):
+            chip = _read_text(os.path.join(directory, 'name')) or os.path.basename(directory)
+            chips.add(chip)
+            for filename in sorted(os.listdir(directory)):
+                match = _HWMON_INPUT.match(filename)
+                if match is None:
+                    continue
+                prefix, index, _ = match.groups()
+                kind, scale = _HWMON_PREFIXES[prefix]
+                label = _read_text(os.path.join(directory, f'{prefix}{index}_label')) or f'{prefix}{index}'
+                sensor = self._open(sensors, os.path.join(directory, filename), kind, label, chip, scale)
+                if sensor is not None:
+                    sensors.append(sensor)
+        # Las zonas térmicas que ya aparecen como hwmon (acpitz, ...) se omiten
+        for directory in sorted(glob.glob(os.path.join(thermal_root, 'thermal_zone*'))):
+            label = _read_text(os.path.join(directory, 'type')) or os.path.basename(directory)
+            if label in chips:
+                continue
+            sensor = self._open(sensors, os.path.join(directory, 'temp'), 'temperature', label, 'thermal', 1000.0)
+            if sensor is not None:
+                sensors.append(sensor)
+        self._sensors = tuple(sensors)
+        self.cpu_key = self._resolve_cpu_key()
+
+    def _open(self, sensors, path, kind, label, chip, scale):
+        key = f'{chip}/{label}'
+        taken = {sensor.key for sensor in sensors}
+        suffix = 2
+        while key in taken:
+            key = f'{chip}/{label} #{suffix}'
+            suffix += 1
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        # Sensores que fallan al arrancar (ENODATA, EIO) no se incluyen
+        if self._pread(fd, scale) is None:
+            os.close(fd)
+            return None
+        self._fds[key] = fd
+        self._scales[key] = scale
+        return SensorInfo(key, kind, label, chip)
+
+    @staticmethod
+    def _pread(fd, scale):
+        # sysfs genera el valor de nuevo en cada lectura desde el offset 0
+        try:
+            return int(os.pread(fd, 32, 0)) / scale
+        except (OSError, ValueError):
+            return None
+
+    def read_one(self, key):
+        fd = self._fds.get(key)
+        return None if fd is None else self._pread(fd, self._scales[key])
+
+    def read(self):
+        pread = self._pread
+        scales = self._scales
+        return {key: pread(fd, scales[key]) for key, fd in self._fds.items()}
+
+    def close(self):
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+
+_WMI_KINDS = {'Temperature': 'temperature', 'Fan': 'fan', 'Voltage': 'voltage', 'Power': 'power'}
+
+
+class WmiSensorProvider(SensorProvider):
+
+    def __init__(self, wmi_session, namespace="root/OpenHardwareMonitor"):
+        super().__init__()
+        self._session = wmi_session
+        self._namespace = namespace
+        # Índice clave -> Identifier de OpenHardwareMonitor, una sola vez
+        self._identifiers = {}
+        sensors = []
+        for sensor in wmi_session.query('Sensor', namespace=namespace):
+            kind = _WMI_KINDS.get(sensor.SensorType)
+            if kind is None:
+                continue
+            # El mismo nombre se repite entre tipos ('CPU Package' es
+            # temperatura y también potencia), así que el tipo va en la clave
+            key = f"{sensor.Parent.strip('/')}/{kind}/{sensor.Name}"
+            if key in self._identifiers:
+                continue
+            self._identifiers[key] = sensor.Identifier
+            sensors.append(SensorInfo(key, kind, sensor.Name, 'OpenHardwareMonitor'))
+        self._keys_by_identifier = {identifier: key for key, identifier in self._identifiers.items()}
+        self._sensors = tuple(sensors)
+        self.cpu_key = self._resolve_cpu_key()
+
+    def read_one(self, key):
+        identifier = self._identifiers.get(key)
+        if identifier is None:
+            return None
+        rows = self._session.wql(f"SELECT Value FROM Sensor WHERE Identifier = '{identifier}'",
+                                 namespace=self._namespace)
+        return rows[0].Value if rows else None
+
+    def read(self):
+        values = dict.fromkeys(self._identifiers)
+        for row in self._session.wql('SELECT Identifier, Value FROM Sensor', namespace=self._namespace):
+            key = self._keys_by_identifier.get(row.Identifier)
+            if key is not None:
+                values[key] = row.Value
+        return values
+
+
+def default_provider(wmi_session=None):
+    # El backend de la plataforma; si no hay sensores, uno vacío
+    try:
+        if sys.platform.startswith('linux'):
+            provider = HwmonProvider()
+            if provider.sensors():
+                return provider
+            provider.close()
+        elif sys.platform.startswith('win') and wmi_session is not None:
+            return WmiSensorProvider(wmi_session)
+    except Exception:
+        # Sin OpenHardwareMonitor corriendo o sin permisos para leer sysfs
+        pass
+    return NullSensorProvider()
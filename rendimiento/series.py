@@ -0,0 +1,338 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+# Almacén de series de tiempo en disco, sólo de escritura al final. Los datos
+# se guardan en segmentos; cada segmento tiene una cabecera y bloques de
+# block_records registros. Dentro de un bloque las columnas son contiguas:
+#   [timestamps float64 x B][métrica 0 float32 x B]...[métrica M-1 float32 x B]
+# Con B = 1024 cada columna de métricas ocupa exactamente una página de 4 KB,
+# así que cada página se escribe casi una sola vez y una consulta sólo toca
+# las páginas de la columna que pide. Las escrituras se acumulan en memoria y
+# se bajan al archivo cada flush_every registros (sólo los bytes nuevos de
+# cada columna); el contador de registros de la cabecera se actualiza después
+# de los datos, así un corte deja un prefijo consistente. Las lecturas usan
+# mmap y np.searchsorted sobre el primer timestamp de cada bloque, sin cargar
+# el archivo en memoria. Se cambia de segmento por tamaño o por tiempo, y cada
+# sesión empieza un segmento nuevo.
+
+MAGIC = b'RTS1'
+VERSION = 1
+# magic, versión, registros por bloque, bloques, registros escritos, inicio,
+# inicio de los datos
+_HEADER = struct.Struct('<4sIIIIdI')
+_COUNT = struct.Struct('<I')
+_COUNT_OFFSET = 16
+PAGE = 4096
+
+
+def process_columns(k, fields=('pid', 'cpu', 'memory', 'gpu', 'gpu_memory')):
+    # Columnas fijas para los K procesos principales: proc0_pid, proc0_cpu, ...
+    return tuple(f'proc{i}_{field}' for i in range(k) for field in fields)
+
+
+class Segment:
+    # Segmento abierto sólo para lectura
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            header = file.read(_HEADER.size)
+            magic, version, self.block_records, self.blocks, count, self.start, data_offset = \
+                _HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} no es un segmento de series")
+            names_size = data_offset - _HEADER.size
+            self.metrics = tuple(json.loads(file.read(names_size).rstrip(b'\0')))
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._columns = {name: i for i, name in enumerate(self.metrics)}
+        self._data_offset = data_offset
+        self.block_bytes = self.block_records * (8 + 4 * len(self.metrics))
+        self.count = count
+
+    def refresh(self):
+        # El segmento que se está escribiendo crece; se relee el contador
+        self.count = _COUNT.unpack_from(self._map, _COUNT_OFFSET)[0]
+
+    def _view(self, column, dtype, blocks):
+        # Vista (bloques x B) de una columna, sin copiar
+        itemsize = np.dtype(dtype).itemsize
+        offset = self._data_offset
+        if column is not None:
+            offset += self.block_records * (8 + 4 * column)
+        return np.ndarray((blocks, self.block_records), dtype=dtype, buffer=self._map,
+                          offset=offset, strides=(self.block_bytes, itemsize))
+
+    @property
+    def used_blocks(self):
+        return -(-self.count // self.block_records)
+
+    def first_timestamp(self):
+        return float(self._view(None, '<f8', 1)[0, 0]) if self.count else None
+
+    def last_timestamp(self):
+        if not self.count:
+            return None
+        block, position = divmod(self.count - 1, self.block_records)
+        return float(self._view(None, '<f8', block + 1)[block, position])
+
+    def _positions(self, start, end):
+        # Índices [lo, hi) de los registros con start <= t < end
+        blocks = self.used_blocks
+        timestamps = self._view(None, '<f8', blocks)
+        firsts = timestamps[:, 0]
+
+        def locate(value):
+            block = max(0, int(np.searchsorted(firsts, value, side='left')) - 1)
+            length = min(self.block_records, self.count - block * self.block_records)
+            inside = int(np.searchsorted(timestamps[block, :length], value, side='left'))
+            if inside == length and block + 1 < blocks:
+                return (block + 1) * self.block_records
+            return block * self.block_records + inside
+
+        lo = 0 if start is None else locate(start)
+        hi = self.count if end is None else locate(end)
+        return lo, max(lo, hi)
+
+    def read(self, names, start=None, end=None):
+        if not self.count:
+            return np.empty(0), {name: np.empty(0, dtype=np.float32) for name in names}
+        lo, hi = self._positions(start, end)
+        first_block = lo // self.block_records
+        last_block = -(-hi // self.block_records)
+        skip = lo - first_block * self.block_records
+        length = hi - lo
+
+        def column(index, dtype):
+            view = self._view(index, dtype, last_block)[first_block:last_block]
+            if len(view) == 1:
+                # Se copia para no dejar vistas sobre el mmap
+                return view[0, skip:skip + length].copy()
+            # ravel copia sólo los bloques del rango pedido
+            return view.ravel()[skip:skip + length]
+
+        values = {}
+        for name in names:
+            index = self._columns.get(name)
+            if index is None:
+                values[name] = np.full(length, np.nan, dtype=np.float32)
+            else:
+                values[name] = column(index, '<f4')
+        return column(None, '<f8'), values
+
+    def close(self):
+        self._map.close()
+
+
+class _SegmentWriter:
+
+    def __init__(self, path, metrics, block_records, blocks, start):
+        self.path = path
+        self.metrics = metrics
+        self.block_records = block_records
+        self.blocks = blocks
+        self.start = start
+        self.count = 0
+        self.block_bytes = block_records * (8 + 4 * len(metrics))
+        names = json.dumps(list(metrics)).encode('utf-8')
+        self.data_offset = -(-(_HEADER.size + len(names)) // PAGE) * PAGE
+        self._file = open(path, 'w+b', buffering=0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, block_records, blocks, 0, start, self.data_offset))
+        self._file.write(names)
+        # Archivo del tamaño final; en NTFS y ext4 queda disperso hasta que se
+        # escriben los bloques
+        self._file.truncate(self.data_offset + blocks * self.block_bytes)
+        self._timestamps = np.full(block_records, np.nan, dtype='<f8')
+        self._values = np.full((len(metrics), block_records), np.nan, dtype='<f4')
+        self._flushed = 0
+
+    @property
+    def full(self):
+        return self.count >= self.blocks * self.block_records
+
+    def append(self, timestamp, values):
+        position = self.count % self.block_records
+        self._timestamps[position] = timestamp
+        self._values[:, position] = values
+        self.count += 1
+        if position + 1 == self.block_records:
+            self.flush()
+
+    def flush(self):
+        pending = self.count - self._flushed
+        if not pending:
+            return
+        block, lo = divmod(self._flushed, self.block_records)
+        hi = lo + pending
+        base = self.data_offset + block * self.block_bytes
+        self._file.seek(base + lo * 8)
+        self._file.write(self._timestamps[lo:hi].tobytes())
+        for i in range(len(self.metrics)):
+            self._file.seek(base + self.block_records * (8 + 4 * i) + lo * 4)
+            self._file.write(self._values[i, lo:hi].tobytes())
+        # El contador va después de los datos
+        self._file.seek(_COUNT_OFFSET)
+        self._file.write(_COUNT.pack(self.count))
+        self._flushed = self.count
+        if hi == self.block_records:
+            self._timestamps.fill(np.nan)
+            self._values.fill(np.nan)
+
+    def close(self):
+        self.flush()
+        # Se recorta el espacio que quedó sin usar
+        used_blocks = -(-self.count // self.block_records)
+        self._file.truncate(self.data_offset + used_blocks * self.block_bytes)
+        self._file.close()
+
+
+def default_store_path():
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'rendimiento', 'series')
+
+
+class TimeSeriesStore:
+
+    def __init__(self, directory, metrics, block_records=1024, segment_records=86400,
+                 segment_seconds=86400, flush_every=60, clock=time.time):
+        self.directory = directory
+        self.metrics = tuple(metrics)
+        self._columns = {name: i for i, name in enumerate(self.metrics)}
+        self.block_records = block_records
+        self.segment_blocks = -(-segment_records // block_records)
+        self.segment_seconds = segment_seconds
+        self.flush_every = flush_every
+        self._clock = clock
+        os.makedirs(directory, exist_ok=True)
+        self._segments = []
+        for path in sorted(glob.glob(os.path.join(directory, '*.seg'))):
+            try:
+                self._segments.append(Segment(path))
+            except (OSError, ValueError, struct.error):
+                # Segmento vacío o dañado: se ignora
+                continue
+        self._writer = None
+        self._writer_segment = None
+        self._last_timestamp = self._segments[-1].last_timestamp() if self._segments else None
+        self._row = np.full(len(self.metrics), np.nan, dtype=np.float32)
+        self._labels_path = os.path.join(directory, 'labels.jsonl')
+        self.labels = self._load_labels()
+
+    def _load_labels(self):
+        labels = {}
+        try:
+            with open(self._labels_path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        key, value = json.loads(line)
+                    except ValueError:
+                        continue
+                    labels[key] = value
+        except FileNotFoundError:
+            pass
+        return labels
+
+    def set_label(self, key, value):
+        # Textos que no caben en una columna float32 (el nombre de cada PID);
+        # sólo se escribe una línea cuando cambian
+        key = str(key)
+        if self.labels.get(key) == value:
+            return
+        self.labels[key] = value
+        with open(self._labels_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps([key, value]) + '\n')
+
+    def _rotate(self, timestamp):
+        self._close_writer()
+        path = os.path.join(self.directory, f'{timestamp:015.3f}.seg')
+        self._writer = _SegmentWriter(path, self.metrics, self.block_records, self.segment_blocks, timestamp)
+
+    def _close_writer(self):
+        if self._writer is None:
+            return
+        if self._writer_segment is not None:
+            # Hay que soltar el mmap antes de recortar el archivo (Windows)
+            self._writer_segment.close()
+            self._segments.remove(self._writer_segment)
+            self._writer_segment = None
+        self._writer.close()
+        if self._writer.count:
+            self._segments.append(Segment(self._writer.path))
+        else:
+            os.remove(self._writer.path)
+        self._writer = None
+
+    def append(self, values, timestamp=None):
+        # values es un dict {métrica: valor} o una secuencia en el orden de
+        # self.metrics, igual que MetricHistory.append
+        if timestamp is None:
+            timestamp = self._clock()
+        # Los timestamps deben ser no decrecientes para buscar por rango; si
+        # el reloj del sistema retrocede se repite el último
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            timestamp = self._last_timestamp
+        writer = self._writer
+        if writer is None or writer.full or timestamp - writer.start >= self.segment_seconds:
+            self._rotate(timestamp)
+            writer = self._writer
+        row = self._row
+        if isinstance(values, dict):
+            row.fill(np.nan)
+            for name, value in values.items():
+                if value is not None:
+                    row[self._columns[name]] = value
+        else:
+            row[:] = [np.nan if value is None else value for value in values]
+        writer.append(timestamp, row)
+        self._last_timestamp = timestamp
+        if writer.count - writer._flushed >= self.flush_every:
+            writer.flush()
+
+    def flush(self):
+        if self._writer is not None:
+            self._writer.flush()
+
+    def _readable_segments(self):
+        if self._writer is not None and self._writer.count:
+            self._writer.flush()
+            if self._writer_segment is None:
+                self._writer_segment = Segment(self._writer.path)
+                self._segments.append(self._writer_segment)
+            self._writer_segment.refresh()
+        return self._segments
+
+    def query(self, name, start=None, end=None):
+        timestamps, values = self.query_many((name,), start, end)
+        return timestamps, values[name]
+
+    def query_many(self, names, start=None, end=None):
+        # Registros con start <= t < end de los segmentos que se traslapan
+        parts = []
+        for segment in self._readable_segments():
+            if not segment.count:
+                continue
+            if end is not None and segment.first_timestamp() >= end:
+                continue
+            if start is not None and segment.last_timestamp() < start:
+                continue
+            parts.append(segment.read(names, start, end))
+        if not parts:
+            return np.empty(0), {name: np.empty(0, dtype=np.float32) for name in names}
+        if len(parts) == 1:
+            return parts[0]
+        timestamps = np.concatenate([part[0] for part in parts])
+        return timestamps, {name: np.concatenate([part[1][name] for part in parts]) for name in names}
+
+    def close(self):
+        self._close_writer()
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
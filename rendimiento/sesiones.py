@@ -0,0 +1,169 @@
+import threading
+import time
+
+# Sesiones persistentes con WMI y NVML. Antes cada función abría su propia
+# conexión COM o llamaba a nvmlInit en cada tick; ahora una sesión por
+# proceso guarda las conexiones y los handles de las GPUs, se reconecta sólo
+# cuando algo falla y se cierra al salir. Los módulos wmi y pynvml se pueden
+# inyectar para probar con backends falsos (ver rendimiento.falsos).
+#
+# Las conexiones COM de WMI pertenecen al hilo que las creó, así que
+# WmiSession guarda una conexión por hilo e inicializa COM en los hilos
+# secundarios (por ejemplo los del motor de recolección).
+
+# Errores de NVML después de los cuales hay que volver a inicializar
+_NVML_RECONNECT_ERRORS = (
+    'NVML_ERROR_UNINITIALIZED',
+    'NVML_ERROR_DRIVER_NOT_LOADED',
+    'NVML_ERROR_GPU_IS_LOST',
+    'NVML_ERROR_LIB_RM_VERSION_MISMATCH',
+)
+
+
+class WmiSession:
+
+    def __init__(self, wmi_module=None, retry_delay=5.0, clock=time.monotonic):
+        self._wmi = wmi_module
+        self._local = threading.local()
+        self._retry_delay = retry_delay
+        self._clock = clock
+
+    def _module(self):
+        if self._wmi is None:
+            import wmi
+            self._wmi = wmi
+        return self._wmi
+
+    def _thread_state(self):
+        # (conexiones, fallos) del hilo actual
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            _co_initialize()
+            state = self._local.state = ({}, {})
+        return state
+
+    def connection(self, namespace="root/CIMV2"):
+        connections, failed_at = self._thread_state()
+        conn = connections.get(namespace)
+        if conn is not None:
+            return conn
+        failed = failed_at.get(namespace)
+        if failed is not None and self._clock() - failed < self._retry_delay:
+            raise ConnectionError(f"WMI namespace {namespace} no disponible")
+        try:
+            conn = self._module().WMI(namespace=namespace)
+        except Exception:
+            failed_at[namespace] = self._clock()
+            raise
+        failed_at.pop(namespace, None)
+        connections[namespace] = conn
+        return conn
+
+    def query(self, class_name, namespace="root/CIMV2"):
+        return self._run(namespace, lambda conn: getattr(conn, class_name)())
+
+    def wql(self, query, namespace="root/CIMV2"):
+        # Consulta WQL directa; permite pedir sólo algunas propiedades o un
+        # objeto por su clave
+        return self._run(namespace, lambda conn: conn.query(query))
+
+    def _run(self, namespace, call):
+        conn = self.connection(namespace)
+        try:
+            return call(conn)
+        except Exception:
+            # La conexión COM quedó inservible: se descarta y la siguiente
+            # consulta abre una nueva
+            connections, failed_at = self._thread_state()
+            connections.pop(namespace, None)
+            failed_at[namespace] = self._clock()
+            raise
+
+    def close(self):
+        # Sólo se pueden soltar las conexiones del hilo que llama; las de
+        # los demás hilos se liberan cuando esos hilos terminan
+        connections, failed_at = self._thread_state()
+        connections.clear()
+        failed_at.clear()
+
+
+def _co_initialize():
+    if threading.current_thread() is threading.main_thread():
+        return
+    try:
+        import pythoncom
+    except ImportError:
+        return
+    pythoncom.CoInitialize()
+
+
+class NvmlSession:
+
+    def __init__(self, nvml_module=None, retry_delay=5.0, clock=time.monotonic):
+        self._nvml = nvml_module
+        self._handles = None
+        self._retry_delay = retry_delay
+        self._clock = clock
+        self._failed_at = None
+
+    @property
+    def nvml(self):
+        if self._nvml is None:
+            import pynvml
+            self._nvml = pynvml
+        return self._nvml
+
+    def _ensure(self):
+        if self._handles is not None:
+            return self._handles
+        if self._failed_at is not None and self._clock() - self._failed_at < self._retry_delay:
+            raise ConnectionError("NVML no disponible")
+        try:
+            nvml = self.nvml
+            nvml.nvmlInit()
+            count = nvml.nvmlDeviceGetCount()
+            self._handles = [nvml.nvmlDeviceGetHandleByIndex(i) for i in range(count)]
+        except Exception:
+            self._failed_at = self._clock()
+            self._shutdown()
+            raise
+        self._failed_at = None
+        return self._handles
+
+    def handles(self):
+        return list(self._ensure())
+
+    def device_count(self):
+        return len(self._ensure())
+
+    def call(self, function_name, index=0, *args):
+        # Llama a nvmlDevice<...>(handle, *args) con el handle guardado de la GPU
+        handle = self._ensure()[index]
+        return self.call_with_handle(function_name, handle, *args)
+
+    def call_with_handle(self, function_name, handle, *args):
+        nvml = self.nvml
+        try:
+            return getattr(nvml, function_name)(handle, *args)
+        except nvml.NVMLError as error:
+            if self._needs_reconnect(error):
+                self._failed_at = self._clock()
+                self._shutdown()
+            raise
+
+    def _needs_reconnect(self, error):
+        nvml = self.nvml
+        codes = {getattr(nvml, name) for name in _NVML_RECONNECT_ERRORS if hasattr(nvml, name)}
+        return getattr(error, 'value', None) in codes
+
+    def _shutdown(self):
+        self._handles = None
+        try:
+            self.nvml.nvmlShutdown()
+        except Exception:
+            pass
+
+    def close(self):
+        if self._handles is not None:
+            self._shutdown()
+        self._failed_at = None
@@ -0,0 +1,667 @@
+import builtins
+import collections
+import contextlib
+import ctypes
+import gzip
+import json
+import marshal
+import struct
+import threading
+import time
+import weakref
+
+import psutil
+
+from rendimiento.colectores import Backends
+from rendimiento.motor import Collector, Reading
+
+# Grabación y reproducción de sesiones. TraceRecorder se pone entre los
+# colectores y sus fuentes (psutil, el módulo wmi, pynvml, el proveedor de
+# sensores, los relojes) y guarda cada llamada con sus argumentos y su
+# resultado, o la excepción que lanzó, en una traza binaria. TraceReplayer da
+# unas fuentes con la misma forma que contestan desde la traza, así el mismo
+# código (Resources, los colectores, el exportador, la interfaz) corre en
+# Linux sin WMI ni NVIDIA y da exactamente los mismos valores.
+#
+# Cada respuesta se guarda bajo (colector, canal, argumentos); al reproducir,
+# cada colector consume sus propias respuestas en orden, sin importar cómo se
+# intercalaron los hilos al grabar. Como los relojes también se graban, las
+# tasas (red, disco, procesos) salen idénticas. Si el código pide algo que no
+# se grabó (otra versión del colector), se repite la última respuesta de esa
+# llamada o, si nunca se grabó, se lanza TraceMissing.
+#
+# Formato (dentro de gzip de nivel 1: la tabla de procesos se repite mucho
+# entre ticks y comprime unas 9 veces por menos de 1 ms por tick): "RTRC",
+# versión, longitud y JSON con los metadatos; luego registros
+# [tipo u8][longitud u32][marshal]. Los nombres de canales y
+# colectores y los tipos de namedtuple se definen una vez con su propio
+# registro y después se usan por número. Al terminar cada colector se escribe
+# una marca con el tiempo de pared, para reproducir en el mismo orden y al
+# ritmo original (1x) o tan rápido como se pueda, y al cerrar otra con la
+# hora de cierre para que el último registro del intervalo también salga.
+
+MAGIC = b'RTRC'
+VERSION = 1
+_HEADER = struct.Struct('<4sHI')
+_RECORD = struct.Struct('<BI')
+
+# Tipos de registro
+_NAME, _TYPE, _CONST, _CALL, _END, _CLOSE = range(1, 7)
+
+# Marcas de los valores que marshal no sabe guardar
+_TUPLE = b'\x00T'
+_OBJECT = b'\x00O'
+_REF = b'\x00R'
+_ERROR = b'\x00E'
+
+# Métodos que no se graban: al reproducir no hacen nada
+_PASSTHROUGH = {'oneshot': contextlib.nullcontext, 'close': lambda: None}
+# Llamadas que regresan un objeto cuyos métodos también hay que grabar
+_FACTORIES = ('Process', 'WMI')
+
+_SCALARS = frozenset((type(None), bool, int, float, str, bytes))
+
+
+def _key(args, kwargs):
+    # Argumentos ya codificados, como se guardan en la traza
+    return (args, tuple(sorted(kwargs.items())) if kwargs else ())
+
+
+def _hashable(key):
+    # Las claves leídas pueden traer listas y diccionarios; la versión 2 de
+    # marshal no usa referencias internas, así dos claves iguales dan los
+    # mismos bytes
+    return marshal.dumps(key, 2)
+
+
+def _is_constant(name):
+    return name.isupper()
+
+
+def _is_exception(name):
+    return name.endswith('Error')
+
+
+class TraceMissing(LookupError):
+    pass
+
+
+class TraceError(Exception):
+    # Excepción grabada que no es de psutil (NVMLError, errores de COM);
+    # conserva el nombre original y el código `value` de NVML
+    def __init__(self, message, name=None, value=None):
+        super().__init__(message)
+        self.name = name
+        self.value = value
+
+
+class TraceObject:
+    # Objeto grabado por sus atributos: estructuras de ctypes de NVML, filas
+    # de WMI, el inventario. Conserva su forma grabada para poder pasarlo
+    # como argumento (un handle de FakeNvml) y buscar la respuesta con él
+    __slots__ = ('_encoded', '__dict__')
+
+    def __init__(self, encoded, fields):
+        self._encoded = encoded
+        self.__dict__.update(fields)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __eq__(self, other):
+        return isinstance(other, TraceObject) and other._encoded == self._encoded
+
+    def __hash__(self):
+        return hash(marshal.dumps(self._encoded, 2))
+
+    def __repr__(self):
+        campos = ', '.join(f"{name}={value!r}" for name, value in self.__dict__.items())
+        return f"TraceObject({campos})"
+
+
+class TraceRef:
+    # Objeto opaco grabado por identidad (un handle de NVML)
+    __slots__ = ('ref',)
+
+    def __init__(self, ref):
+        self.ref = ref
+
+    def __eq__(self, other):
+        return isinstance(other, TraceRef) and other.ref == self.ref
+
+    def __hash__(self):
+        return hash(self.ref)
+
+    def __repr__(self):
+        return f"TraceRef({self.ref})"
+
+
+class TraceRecorder:
+
+    def __init__(self, path, meta=None, flush_every=1.0, wall_clock=time.time):
+        # Cada flush_every segundos se vacía el compresor (Z_SYNC_FLUSH): si
+        # el monitor muere sin cerrar la traza, se pierde a lo más eso
+        self.path = path
+        self.flush_every = flush_every
+        self._wall_clock = wall_clock
+        self._file = gzip.open(path, 'wb', compresslevel=1)
+        self._flushed_at = wall_clock()
+        meta = dict(meta or {}, started=self._flushed_at)
+        header = json.dumps(meta).encode('utf-8')
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(header)) + header)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._names = {}
+        self._types = {}
+        # id(objeto) -> número de referencia, mientras el objeto viva
+        self._refs = {}
+        self._ref_count = 0
+        self._pinned = []
+        self._constants = set()
+        self.records = 0
+
+    # -- escritura
+
+    def _write(self, kind, payload):
+        if self._file.closed:
+            # Un hilo del pool que termina después de cerrar la sesión
+            return
+        data = marshal.dumps(payload)
+        self._file.write(_RECORD.pack(kind, len(data)) + data)
+        self.records += 1
+
+    def _name(self, name):
+        # Se llama con el candado tomado
+        number = self._names.get(name)
+        if number is None:
+            number = self._names[name] = len(self._names) + 1
+            self._write(_NAME, (number, name))
+        return number
+
+    def encode(self, value):
+        if type(value) in _SCALARS:
+            return value
+        if type(value) is tuple:
+            return tuple([self.encode(item) for item in value])
+        if isinstance(value, (bool, int, float, str, bytes)):
+            return value
+        if isinstance(value, tuple):
+            fields = getattr(type(value), '_fields', None)
+            if fields is None:
+                return tuple(self.encode(item) for item in value)
+            kind = self._types.get(type(value))
+            if kind is None:
+                kind = self._types[type(value)] = len(self._types) + 1
+                self._write(_TYPE, (kind, type(value).__name__, tuple(fields)))
+            return (_TUPLE, kind, tuple(self.encode(item) for item in value))
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, dict):
+            return {self.encode(key): self.encode(item) for key, item in value.items()}
+        if isinstance(value, (set, frozenset)):
+            return [self.encode(item) for item in value]
+        if isinstance(value, ctypes._Pointer) or callable(value):
+            return self._ref(value)
+        # Estructuras de ctypes (NVML), objetos de WMI y objetos simples
+        names = [field[0] for field in getattr(value, '_fields_', ())]
+        if not names and isinstance(getattr(value, 'properties', None), dict):
+            names = list(value.properties)
+        if not names and hasattr(value, '__dict__'):
+            names = [name for name in vars(value) if not name.startswith('_')]
+        if not names:
+            names = [name for name in getattr(type(value), '__slots__', ()) if not name.startswith('_')]
+        if not names:
+            return self._ref(value)
+        return (_OBJECT, {name: self.encode(getattr(value, name, None)) for name in names})
+
+    def _ref(self, value):
+        key = id(value)
+        number = self._refs.get(key)
+        if number is None:
+            self._ref_count += 1
+            number = self._refs[key] = self._ref_count
+            # La entrada se borra cuando el objeto muere: la tabla no crece
+            # con los objetos temporales y un id reutilizado recibe un número
+            # nuevo
+            try:
+                weakref.finalize(value, self._refs.pop, key, None)
+            except TypeError:
+                # Sin weakref se guarda el objeto para que su id no se
+                # reutilice
+                self._pinned.append(value)
+        return (_REF, number)
+
+    def _encode_error(self, error):
+        if isinstance(error, psutil.Error):
+            message = getattr(error, 'msg', '') or ''
+            return (_ERROR, 'psutil', type(error).__name__, getattr(error, 'pid', None), message)
+        module = 'builtins' if type(error).__module__ == 'builtins' else ''
+        return (_ERROR, module, type(error).__name__, getattr(error, 'value', None), str(error))
+
+    # -- grabación
+
+    def call(self, channel, func, args=(), kwargs=None, prefix=()):
+        try:
+            result = func(*args, **kwargs) if kwargs else func(*args)
+        except Exception as error:
+            self._record(channel, prefix + args, kwargs, 1, error)
+            raise
+        self._record(channel, prefix + args, kwargs, 0, result)
+        return result
+
+    def _record(self, channel, args, kwargs, status, value):
+        collector = getattr(self._local, 'collector', 0)
+        with self._lock:
+            key = _key(self.encode(args), self.encode(kwargs) if kwargs else None)
+            encoded = self._encode_error(value) if status else self.encode(value)
+            self._write(_CALL, (collector, self._name(channel), key, status, encoded))
+
+    def constant(self, channel, value):
+        with self._lock:
+            if channel not in self._constants:
+                self._constants.add(channel)
+                self._write(_CONST, (self._name(channel), self.encode(value)))
+        return value
+
+    def function(self, channel, func):
+        def recorded(*args, **kwargs):
+            return self.call(channel, func, args, kwargs)
+        return recorded
+
+    def proxy(self, channel, load):
+        # load es una función sin argumentos que regresa el objeto real; así
+        # wmi y pynvml se importan hasta que se usan
+        return _RecordingProxy(self, channel, load)
+
+    def collectors(self, collectors):
+        # Copias de los colectores que marcan inicio y fin de cada llamada y
+        # asocian a ese colector las llamadas que hace
+        return [Collector(collector.name, self._marked(collector), period=collector.period,
+                          timeout=collector.timeout, cost=collector.cost)
+                for collector in collectors]
+
+    def _marked(self, collector):
+        def marked():
+            with self._lock:
+                number = self._name(collector.name)
+            previous = getattr(self._local, 'collector', 0)
+            self._local.collector = number
+            start = time.perf_counter()
+            ok = False
+            try:
+                value = collector.func()
+                ok = True
+                return value
+            finally:
+                self._local.collector = previous
+                now = self._wall_clock()
+                with self._lock:
+                    self._write(_END, (number, now, time.perf_counter() - start, ok))
+                    if now - self._flushed_at >= self.flush_every and not self._file.closed:
+                        self._file.flush()
+                        self._flushed_at = now
+        return marked
+
+    def backends(self, base=None):
+        return _RecordingBackends(self, base or Backends())
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._write(_CLOSE, (self._wall_clock(),))
+                self._file.close()
+
+
+class _RecordingProxy:
+
+    def __init__(self, recorder, channel, load, prefix=()):
+        self._recorder = recorder
+        self._channel = channel
+        self._loader = load
+        self._prefix = prefix
+        self._loaded = None
+
+    def _load(self):
+        if self._loaded is None:
+            self._loaded = self._loader()
+        return self._loaded
+
+    def __getattr__(self, name):
+        # Lo que se resuelve aquí se guarda en la instancia: la siguiente vez
+        # (cada proceso en cada tick) ya no pasa por __getattr__
+        channel = f'{self._channel}.{name}'
+        if name in _PASSTHROUGH or _is_exception(name):
+            value = getattr(self._load(), name)
+        elif _is_constant(name):
+            value = self._recorder.constant(channel, getattr(self._load(), name))
+        else:
+            value = self._recorded(channel, name)
+        self.__dict__[name] = value
+        return value
+
+    def _recorded(self, channel, name):
+        recorder = self._recorder
+        prefix = self._prefix
+
+        def func(*args, **kwargs):
+            # El atributo se busca dentro de la llamada grabada: si importar
+            # wmi o pynvml falla, la traza guarda el error
+            return getattr(self._load(), name)(*args, **kwargs)
+
+        if name not in _FACTORIES:
+            return lambda *args, **kwargs: recorder.call(channel, func, args, kwargs, prefix)
+
+        def factory(*args, **kwargs):
+            result = recorder.call(channel, func, args, kwargs, prefix)
+            # Los métodos del objeto se graban con los argumentos de su
+            # creación como prefijo: Process.cpu_percent(pid)
+            return _RecordingProxy(recorder, name, lambda: result,
+                                   prefix=(args + tuple(sorted(kwargs.items())),))
+        return factory
+
+
+class _RecordingBackends(Backends):
+
+    def __init__(self, recorder, base):
+        super().__init__(psutil_module=recorder.proxy('psutil', lambda: base.psutil),
+                         wmi_module=recorder.proxy('wmi', base.load_wmi),
+                         nvml_module=recorder.proxy('nvml', base.load_nvml),
+                         clock=recorder.function('clock', base.clock),
+                         cpu_clock=recorder.function('cpu_clock', base.cpu_clock))
+        self._recorder = recorder
+        self._base = base
+
+    def wrap(self, channel, factory):
+        value = self._base.wrap(channel, factory)
+        return self._recorder.proxy(channel, lambda: value)
+
+    def collectors(self, collectors):
+        return self._recorder.collectors(self._base.collectors(collectors))
+
+
+def _read_header(file):
+    try:
+        magic, version, size = _HEADER.unpack(file.read(_HEADER.size))
+    except (struct.error, EOFError):
+        raise ValueError("traza vacía o cortada antes de la cabecera")
+    if magic != MAGIC:
+        raise ValueError("no es una traza de rendimiento")
+    if version != VERSION:
+        raise ValueError(f"versión de traza no soportada: {version}")
+    return json.loads(file.read(size))
+
+
+class TraceReplayer:
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, 'rb')
+        self.meta = _read_header(self._file)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._names = {}
+        self._numbers = {}
+        self._types = {}
+        self._constants = {}
+        self._queues = collections.defaultdict(collections.deque)
+        self._last = {}
+        self._events = collections.deque()
+        self._eof = False
+        self._stopped = False
+        # Tiempo de pared de la última lectura reproducida, para usarlo como
+        # reloj del SnapshotPublisher
+        self.now = self.meta.get('started', 0.0)
+        self.records = 0
+
+    # -- lectura
+
+    def _read_record(self):
+        # Lee un registro y lo acomoda; False al llegar al final
+        if self._eof:
+            return False
+        try:
+            head = self._file.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                self._eof = True
+                return False
+            kind, size = _RECORD.unpack(head)
+            data = self._file.read(size)
+        except EOFError:
+            data = b''
+            size = 1
+        if len(data) < size:
+            # Traza cortada (el monitor terminó sin cerrarla)
+            self._eof = True
+            return False
+        payload = marshal.loads(data)
+        self.records += 1
+        if kind == _CALL:
+            collector, channel, key, status, value = payload
+            self._queues[(collector, channel, _hashable(key))].append((status, value))
+        elif kind == _NAME:
+            number, name = payload
+            self._names[number] = name
+            self._numbers[name] = number
+        elif kind == _TYPE:
+            number, name, fields = payload
+            self._types[number] = collections.namedtuple(name, fields)
+        elif kind == _CONST:
+            channel, value = payload
+            self._constants[self._names[channel]] = value
+        elif kind == _END:
+            number, timestamp, duration, ok = payload
+            self._events.append((self._names[number], timestamp, duration, ok))
+        elif kind == _CLOSE:
+            self._events.append((None, payload[0], 0.0, True))
+        return True
+
+    def decode(self, value):
+        if isinstance(value, tuple):
+            if value and value[0] == _TUPLE:
+                return self._types[value[1]](*(self.decode(item) for item in value[2]))
+            if value and value[0] == _OBJECT:
+                return TraceObject(value, {name: self.decode(item) for name, item in value[1].items()})
+            if value and value[0] == _REF:
+                return TraceRef(value[1])
+            return tuple(self.decode(item) for item in value)
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if isinstance(value, dict):
+            return {self.decode(key): self.decode(item) for key, item in value.items()}
+        return value
+
+    def _error(self, encoded):
+        _, module, name, value, message = encoded
+        if module == 'psutil':
+            cls = getattr(psutil, name, psutil.Error)
+            if cls in (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                return cls(value, msg=message or None)
+            return psutil.Error(message)
+        if module == 'builtins':
+            # AttributeError, NotImplementedError, OSError: los colectores
+            # atrapan algunos por tipo
+            cls = getattr(builtins, name, None)
+            if isinstance(cls, type) and issubclass(cls, Exception):
+                return cls(message)
+        return TraceError(message, name, value)
+
+    # -- reproducción
+
+    def serve(self, channel, args=(), kwargs=None, prefix=()):
+        key = _hashable(_key(self._encode_key(prefix + args), self._encode_key(kwargs) if kwargs else None))
+        with self._lock:
+            collector = getattr(self._local, 'collector', 0)
+            queue_key = (collector, self._numbers.get(channel), key)
+            queue = self._queues.get(queue_key)
+            while not queue:
+                if not self._read_record():
+                    break
+                if queue_key[1] is None:
+                    queue_key = (collector, self._numbers.get(channel), key)
+                queue = self._queues.get(queue_key)
+            if queue:
+                status, value = queue.popleft()
+                self._last[queue_key] = (status, value)
+            elif queue_key in self._last:
+                status, value = self._last[queue_key]
+            else:
+                raise TraceMissing(f"{channel}{prefix + args} no está en la traza")
+        if status:
+            raise self._error(value)
+        return self.decode(value)
+
+    def _encode_key(self, value):
+        # Los argumentos como los codificó TraceRecorder.encode
+        if type(value) in _SCALARS:
+            return value
+        if isinstance(value, TraceRef):
+            return (_REF, value.ref)
+        if isinstance(value, TraceObject):
+            return value._encoded
+        if isinstance(value, tuple):
+            return tuple([self._encode_key(item) for item in value])
+        if isinstance(value, list):
+            return [self._encode_key(item) for item in value]
+        if isinstance(value, dict):
+            return {self._encode_key(key): self._encode_key(item) for key, item in value.items()}
+        return value
+
+    def constant(self, channel):
+        with self._lock:
+            while channel not in self._constants:
+                if not self._read_record():
+                    raise TraceMissing(f"{channel} no está en la traza")
+            return self.decode(self._constants[channel])
+
+    def function(self, channel):
+        return lambda *args, **kwargs: self.serve(channel, args, kwargs)
+
+    def proxy(self, channel):
+        return _ReplayProxy(self, channel)
+
+    def collectors(self, collectors):
+        return [Collector(collector.name, self._scoped(collector), period=collector.period,
+                          timeout=collector.timeout, cost=collector.cost)
+                for collector in collectors]
+
+    def _scoped(self, collector):
+        def scoped():
+            with self._lock:
+                number = self._numbers.get(collector.name)
+                while number is None and self._read_record():
+                    number = self._numbers.get(collector.name)
+            previous = getattr(self._local, 'collector', 0)
+            self._local.collector = number or 0
+            try:
+                return collector.func()
+            finally:
+                self._local.collector = previous
+        return scoped
+
+    def backends(self):
+        return _ReplayBackends(self)
+
+    def _next_event(self):
+        with self._lock:
+            while not self._events:
+                if not self._read_record():
+                    return None
+            return self._events.popleft()
+
+    def run(self, collectors, publisher, speed=0.0, consumers=(), sleep=time.sleep, clock=time.monotonic):
+        # Reproduce los colectores en el orden en que terminaron al grabar y
+        # publica cada lectura con su tiempo original. speed=1 respeta el
+        # ritmo original, 2 va al doble y 0 tan rápido como se pueda. Los
+        # consumidores (callback, periodo, retraso) se llaman cada `periodo`
+        # segundos de la traza a partir de `retraso`, como add_consumer del
+        # núcleo. Regresa cuántas lecturas publicó.
+        by_name = {collector.name: collector for collector in self.collectors(collectors)}
+        first = self.now
+        deadlines = [first + delay for _, _, delay in consumers]
+        wall_start = clock()
+        published = 0
+        while not self._stopped:
+            event = self._next_event()
+            if event is None:
+                break
+            name, timestamp, _, _ = event
+            if speed:
+                delay = (timestamp - first) / speed - (clock() - wall_start)
+                if delay > 0:
+                    sleep(delay)
+            for index, (callback, period, _) in enumerate(consumers):
+                while deadlines[index] <= timestamp and not self._stopped:
+                    self.now = deadlines[index]
+                    callback(publisher.latest)
+                    deadlines[index] += period
+            self.now = timestamp
+            collector = by_name.get(name)
+            if collector is None:
+                continue
+            start = time.perf_counter()
+            try:
+                value = collector.func()
+            except Exception as error:
+                publisher.mark_stale(name, repr(error))
+                continue
+            publisher.publish(name, Reading(value, timestamp, time.perf_counter() - start, False, None))
+            published += 1
+        return published
+
+    def stop(self):
+        self._stopped = True
+
+    def close(self):
+        self._file.close()
+
+
+class _ReplayProxy:
+
+    def __init__(self, replayer, channel, prefix=()):
+        self._replayer = replayer
+        self._channel = channel
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        channel = f'{self._channel}.{name}'
+        if name in _PASSTHROUGH:
+            value = _PASSTHROUGH[name]
+        elif _is_constant(name):
+            value = self._replayer.constant(channel)
+        elif _is_exception(name):
+            value = TraceError
+        else:
+            value = self._replayed(channel, name)
+        self.__dict__[name] = value
+        return value
+
+    def _replayed(self, channel, name):
+        replayer = self._replayer
+        prefix = self._prefix
+        if name not in _FACTORIES:
+            return lambda *args, **kwargs: replayer.serve(channel, args, kwargs, prefix)
+
+        def factory(*args, **kwargs):
+            replayer.serve(channel, args, kwargs, prefix)
+            return _ReplayProxy(replayer, name, prefix=(args + tuple(sorted(kwargs.items())),))
+        return factory
+
+
+class _ReplayBackends(Backends):
+
+    def __init__(self, replayer):
+        super().__init__(psutil_module=replayer.proxy('psutil'), wmi_module=replayer.proxy('wmi'),
+                         nvml_module=replayer.proxy('nvml'), clock=replayer.function('clock'),
+                         cpu_clock=replayer.function('cpu_clock'))
+        self._replayer = replayer
+
+    def wrap(self, channel, factory):
+        # No se crea el objeto real (ni WMI ni sysfs): todo sale de la traza
+        return self._replayer.proxy(channel)
+
+    def collectors(self, collectors):
+        return self._replayer.collectors(collectors)
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from rendimiento.almacenamiento import disk_name, windows_disk_map
+from rendimiento.falsos import FakeWmi, default_wmi_classes
+from rendimiento.sesiones import WmiSession
+
+
+def test_windows_drives_map_to_physical_disks():
+    classes = default_wmi_classes()
+    # El módulo wmi real puede entregar la referencia como ruta de texto
+    classes['root/CIMV2']['Win32_LogicalDiskToPartition'].append(SimpleNamespace(
+        Antecedent=r'\\PC\root\cimv2:Win32_DiskPartition.DeviceID="Disk #1, Partition #0"',
+        Dependent=r'\\PC\root\cimv2:Win32_LogicalDisk.DeviceID="D:"'))
+    disk_map = windows_disk_map(WmiSession(FakeWmi(classes)))
+    assert disk_map == {'C:': 'PhysicalDrive0', 'D:': 'PhysicalDrive1'}
+    assert disk_name('C:\\', disk_map) == 'PhysicalDrive0'
+    assert disk_name('d:\\', disk_map) == 'PhysicalDrive1'
+    assert disk_name('E:\\', disk_map) is None
+
+
+def test_linux_devices_use_basename():
+    assert disk_name('/dev/nvme0n1p2') == 'nvme0n1p2'
+
+
+def test_disk_map_is_empty_without_wmi():
+    class NoWmi:
+        def WMI(self, namespace):
+            raise OSError("sin WMI")
+
+    assert windows_disk_map(WmiSession(NoWmi())) == {}
@@ -0,0 +1,20 @@
+import asyncio
+
+import pytest
+
+from rendimiento.asincrono import AsyncCollectionCore
+from rendimiento.motor import Collector
+
+
+def test_consumer_error_stops_the_core_and_is_raised_from_run():
+    calls = []
+
+    def consumer(snapshot):
+        calls.append(snapshot)
+        raise OSError('disco lleno')
+
+    core = AsyncCollectionCore([Collector('tick', lambda: 1, period=0.01, cost=0.0)])
+    core.add_consumer(consumer, 0.01)
+    with pytest.raises(OSError, match='disco lleno'):
+        asyncio.run(core.run(duration=5.0))
+    assert len(calls) == 1
@@ -0,0 +1,78 @@
+import os
+import threading
+
+import pytest
+
+from rendimiento.base_datos import SqliteSink
+
+
+def test_repeated_timestamp_is_counted_once(tmp_path):
+    sink = SqliteSink(os.path.join(tmp_path, 'metricas.db'), retention_seconds=None)
+    sink.append({'cpu': 10.0}, timestamp=60.0)
+    sink.append({'cpu': 20.0}, timestamp=61.0)
+    sink.flush()
+    # Repetido contra un lote anterior y dentro del mismo lote
+    sink.append({'cpu': 30.0}, timestamp=61.0)
+    sink.append({'cpu': 40.0}, timestamp=62.0)
+    sink.append({'cpu': 50.0}, timestamp=62.0)
+    sink.flush()
+    assert sink.query('cpu', 0) == [(60.0, 10.0), (61.0, 20.0), (62.0, 40.0)]
+    assert sink.query_rollup('cpu', 60, 0) == [(60.0, 70.0 / 3, 10.0, 40.0)]
+    assert sink.rows_written == 3
+    sink.close()
+
+
+def test_writer_survives_unexpected_errors(tmp_path):
+    sink = SqliteSink(os.path.join(tmp_path, 'metricas.db'), retention_seconds=None)
+    sink.append({'cpu': object()}, timestamp=1.0)
+    sink.flush(timeout=5)
+    assert 'TypeError' in sink.last_error
+    sink.append({'cpu': 1.0}, timestamp=2.0)
+    sink.flush(timeout=5)
+    assert sink.query('cpu', 0) == [(2.0, 1.0)]
+    sink.close()
+
+
+def test_failed_batch_leaves_nothing_behind(tmp_path):
+    sink = SqliteSink(os.path.join(tmp_path, 'metricas.db'), retention_seconds=None)
+    sink.append({'cpu': 1.0}, timestamp=1.0)
+    sink.flush()
+
+    def fail(connection):
+        raise RuntimeError('falla después de insertar')
+
+    # Con el id de la métrica ya en caché el lote no empieza con un INSERT
+    sink._trim = fail
+    sink.append({'cpu': 2.0}, timestamp=2.0)
+    sink.flush(timeout=5)
+    assert 'RuntimeError' in sink.last_error
+    assert sink.query('cpu', 0) == [(1.0, 1.0)]
+    assert sink.query_rollup('cpu', 60, 0) == [(0.0, 1.0, 1.0, 1.0)]
+    sink.close()
+
+
+def test_trim_reaches_metrics_from_earlier_runs(tmp_path):
+    path = os.path.join(tmp_path, 'metricas.db')
+    sink = SqliteSink(path, retention_seconds=None)
+    sink.append({'gpu': 1.0}, timestamp=1.0)
+    sink.close()
+    sink = SqliteSink(path, retention_seconds=10, clock=lambda: 1000.0)
+    sink.append({'cpu': 1.0}, timestamp=1000.0)
+    sink.flush()
+    assert sink.query('gpu', 0) == []
+    assert sink.rows_trimmed == 1
+    sink.close()
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_flush_returns_when_writer_dies(tmp_path):
+    sink = SqliteSink(os.path.join(tmp_path, 'metricas.db'))
+
+    def die():
+        raise SystemExit
+
+    sink._drain = die
+    done = threading.Event()
+    threading.Thread(target=lambda: (sink.flush(), done.set()), daemon=True).start()
+    assert done.wait(5)
+    sink.close()
@@ -0,0 +1,49 @@
+import collections
+import gzip
+import time
+import urllib.request
+
+from rendimiento.exportador import CONTENT_TYPE, MetricsExporter
+from rendimiento.motor import Reading, SnapshotPublisher
+
+Rates = collections.namedtuple('Rates', ('read_mb_s', 'write_mb_s'))
+
+
+def scrape(port, gzip_ok=False):
+    request = urllib.request.Request(f'http://127.0.0.1:{port}/metrics')
+    if gzip_ok:
+        request.add_header('Accept-Encoding', 'gzip')
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.headers, response.read()
+
+
+def test_scrape_serves_the_cached_render():
+    publisher = SnapshotPublisher(clock=lambda: 100.0)
+    exporter = MetricsExporter(publisher, port=0, min_interval=0.0)
+    port = exporter.start()
+    try:
+        assert port != 0
+        publisher.publish('cpu', Reading(12.5, 100.0, 0.002, False, None))
+        publisher.publish('disk_io', Reading({'sda': Rates(1.5, 0.5)}, 100.0, 0.001, False, None))
+        deadline = time.monotonic() + 5
+        while exporter._rendered_sequence != publisher.latest.sequence and time.monotonic() < deadline:
+            time.sleep(0.01)
+        renders = exporter.renders
+
+        headers, body = scrape(port)
+        assert headers['Content-Type'] == CONTENT_TYPE
+        text = body.decode('utf-8')
+        assert '# TYPE rendimiento_cpu gauge\nrendimiento_cpu 12.5\n' in text
+        assert 'rendimiento_disk_io_read_mb_s{device="sda"} 1.5\n' in text
+        assert 'rendimiento_collector_stale{collector="cpu"} 0\n' in text
+
+        # Sin instantáneas nuevas, los scrapes copian el mismo buffer
+        cached = exporter.cached
+        headers, compressed = scrape(port, gzip_ok=True)
+        assert headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed) == body
+        assert scrape(port)[1] == body
+        assert exporter.cached is cached
+        assert exporter.renders == renders
+    finally:
+        exporter.stop()
@@ -0,0 +1,47 @@
+from rendimiento.falsos import FakeGpu, FakeNvml
+from rendimiento.gpu_procesos import GpuProcessAccounting
+from rendimiento.sesiones import NvmlSession
+
+
+def fake_gpus(num_gpus, num_procesos):
+    gpus = []
+    for index in range(num_gpus):
+        pids = range(1000 + index, 1000 + num_procesos, num_gpus)
+        gpus.append(FakeGpu(
+            name=f'Fake GPU {index}',
+            compute_processes=[(pid, 256 * 1024**2) for pid in pids],
+            graphics_processes=[(pid, 64 * 1024**2) for pid in pids[::2]],
+            process_samples=[(pid, 1000, pid % 100, pid % 50) for pid in pids],
+        ))
+    return gpus
+
+
+def test_three_nvml_calls_per_gpu_regardless_of_processes():
+    for num_gpus, num_procesos in ((1, 10), (1, 600), (2, 600)):
+        nvml = FakeNvml(fake_gpus(num_gpus, num_procesos))
+        session = NvmlSession(nvml)
+        accounting = GpuProcessAccounting(session)
+        accounting.collect()
+        nvml.calls.clear()
+        ticks = 20
+        for _ in range(ticks):
+            usage = accounting.collect()
+        assert sum(nvml.calls.values()) == 3 * num_gpus * ticks
+        assert len(usage) == num_procesos
+
+
+def test_usage_is_indexed_by_pid():
+    nvml = FakeNvml(fake_gpus(1, 4))
+    usage = GpuProcessAccounting(NvmlSession(nvml)).collect()
+    # Cómputo y gráfico a la vez cuenta una vez, con el mayor de los dos
+    assert usage[1000].memory_bytes == 256 * 1024**2
+    assert usage[1000].sm_util == 0.0 or usage[1000].sm_util == float(1000 % 100)
+    assert usage[1003].memory_util == float(1003 % 50)
+
+
+def test_no_nvml_means_no_gpu_usage():
+    class Broken(FakeNvml):
+        def nvmlInit(self):
+            raise self.NVMLError(self.NVML_ERROR_DRIVER_NOT_LOADED)
+
+    assert GpuProcessAccounting(NvmlSession(Broken())).collect() == {}
@@ -0,0 +1,57 @@
+import pytest
+
+from rendimiento.falsos import FakePsutil
+from rendimiento.grupos import GROUP_FIELDS, ProcessGroups
+from rendimiento.procesos import ProcessRegistry
+
+
+def sums(groups):
+    return {group.key: (group.count,) + tuple(getattr(group, field) for field in GROUP_FIELDS)
+            for group in groups.groups()}
+
+
+def assert_close(left, right):
+    assert left.keys() == right.keys()
+    for key in left:
+        assert left[key] == pytest.approx(right[key])
+
+
+@pytest.mark.parametrize('detail', ['basic', 'adaptive', 'full'])
+def test_changed_rows_keep_the_group_sums(detail):
+    fake = FakePsutil(num_processes=300, churn=3)
+    registry = ProcessRegistry(pids=fake.pids, process_factory=fake.Process, virtual_memory=fake.virtual_memory,
+                               detail=detail, detail_k=5, clock=fake.clock)
+    registry.update()
+    groups = ProcessGroups(registry, mode='tree', resync_every=0)
+    for _ in range(20):
+        fake.advance()
+        registry.update()
+        groups.update()
+        incremental = sums(groups)
+        groups.resync()
+        assert_close(incremental, sums(groups))
+
+
+def test_unchanged_rows_are_not_reported():
+    fake = FakePsutil(num_processes=300, churn=0)
+    registry = ProcessRegistry(pids=fake.pids, process_factory=fake.Process, virtual_memory=fake.virtual_memory,
+                               clock=fake.clock)
+    registry.update()
+    registry.update()
+    # Sin avanzar el reloj falso ningún valor cambia
+    assert registry.update().changed == []
+
+
+def test_missed_update_rescans_every_row():
+    fake = FakePsutil(num_processes=300, churn=3)
+    registry = ProcessRegistry(pids=fake.pids, process_factory=fake.Process, virtual_memory=fake.virtual_memory,
+                               clock=fake.clock)
+    registry.update()
+    groups = ProcessGroups(registry, mode='name', resync_every=0)
+    for _ in range(3):
+        fake.advance()
+        registry.update()
+    groups.update()
+    incremental = sums(groups)
+    groups.resync()
+    assert_close(incremental, sums(groups))
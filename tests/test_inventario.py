@@ -0,0 +1,46 @@
+import os
+
+from rendimiento.falsos import smbios_memory_device, write_fake_dmi
+from rendimiento.inventario import HardwareInventory, InventoryCache, _smbios_memory_devices
+
+
+def test_smbios_memory_devices_decode_every_size_encoding(tmp_path):
+    path = write_fake_dmi(os.path.join(tmp_path, 'DMI'), [
+        smbios_memory_device(8192, 3200),
+        # Ranura vacía
+        smbios_memory_device(0, 0),
+        # 32 GB y 8400 MT/s sólo caben en los campos extendidos
+        smbios_memory_device(0x7FFF, 0xFFFF, extended_size=32768, extended_speed=8400),
+        # Bit 15: el tamaño va en KB; velocidad desconocida
+        smbios_memory_device(0x8000 | 512, 0),
+        # SMBIOS 2.0: la estructura no llega al campo de velocidad
+        smbios_memory_device(4096, 0, length=0x15),
+    ])
+    assert _smbios_memory_devices(path) == [(8192 * 1024**2, 3200), (32768 * 1024**2, 8400), (512 * 1024, None)]
+
+
+def test_smbios_without_table_returns_nothing(tmp_path):
+    assert _smbios_memory_devices(os.path.join(tmp_path, 'no-existe')) == []
+
+
+def test_cache_is_probed_again_when_the_fingerprint_changes(tmp_path):
+    path = os.path.join(tmp_path, 'inventario.json')
+    machine = ['a']
+    probes = []
+
+    def probe():
+        probes.append(machine[0])
+        return HardwareInventory('CPU ' + machine[0], None, 16.0, 3200)
+
+    InventoryCache(path, probe=probe, fingerprint=lambda: machine[0]).get()
+    # Otro proceso en la misma máquina lee la copia en disco
+    inventory = InventoryCache(path, probe=probe, fingerprint=lambda: machine[0]).get()
+    assert probes == ['a']
+    assert inventory.to_dict() == {'cpu_model': 'CPU a', 'gpu_model': None, 'total_ram': 16.0, 'ram_speed': 3200}
+
+    machine[0] = 'b'
+    inventory = InventoryCache(path, probe=probe, fingerprint=lambda: machine[0]).get()
+    assert probes == ['a', 'b']
+    assert inventory.cpu_model == 'CPU b'
+    assert InventoryCache(path, probe=probe, fingerprint=lambda: machine[0]).get().cpu_model == 'CPU b'
+    assert probes == ['a', 'b']
@@ -0,0 +1,50 @@
+from rendimiento.falsos import FakePsutil
+from rendimiento.procesos import ProcessRegistry
+
+
+def registry(fake, budget):
+    return ProcessRegistry(pids=fake.pids, process_factory=fake.Process, virtual_memory=fake.virtual_memory,
+                           detail='adaptive', detail_k=5, detail_budget=budget, clock=fake.clock)
+
+
+def test_adaptive_reads_everything_inline_when_the_budget_allows():
+    fake = FakePsutil(num_processes=200, churn=2)
+    table = registry(fake, budget=10.0)
+    for _ in range(5):
+        fake.advance()
+        table.update()
+    assert table._inline_detail
+    assert table.detailed == len(table)
+    assert all(row._detail_at == fake.clock() for row in table.rows())
+
+
+def test_adaptive_returns_to_candidates_when_the_budget_shrinks():
+    fake = FakePsutil(num_processes=200, churn=2)
+    table = registry(fake, budget=10.0)
+    for _ in range(3):
+        fake.advance()
+        table.update()
+    table.detail_budget = 0.0
+    for _ in range(3):
+        fake.advance()
+        table.update()
+    assert not table._inline_detail
+    assert table.detailed < len(table)
+
+
+def test_reused_pid_reports_one_exit_and_one_start():
+    fake = FakePsutil(num_processes=50)
+    table = registry(fake, budget=10.0)
+    fake.advance()
+    table.update()
+    before = table.get(120)
+    fake.reuse(120)
+    fake.advance()
+    table.update()
+    assert [row.pid for row in table.events.exited] == [120]
+    assert [row.pid for row in table.events.started] == [120]
+    assert table.events.exited[0] is before
+    assert table.get(120).create_time != before.create_time
+    fake.advance()
+    table.update()
+    assert not table.events.exited and not table.events.started
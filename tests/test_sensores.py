@@ -0,0 +1,14 @@
+from rendimiento.falsos import FakeWmi, default_wmi_classes
+from rendimiento.sensores import WmiSensorProvider
+from rendimiento.sesiones import WmiSession
+
+
+def test_wmi_keeps_sensors_that_share_a_name_across_types():
+    provider = WmiSensorProvider(WmiSession(FakeWmi(default_wmi_classes())))
+    kinds = {(sensor.kind, sensor.label) for sensor in provider.sensors()}
+    assert ('power', 'CPU Package') in kinds
+    assert ('temperature', 'CPU Package') in kinds
+    assert provider.cpu_temperature() == 47.0
+    values = provider.read()
+    assert values['intelcpu/0/power/CPU Package'] == 35.0
+    assert values['intelcpu/0/temperature/CPU Package'] == 47.0
@@ -0,0 +1,63 @@
+from rendimiento.falsos import FakeNvml, FakeWmi
+from rendimiento.sesiones import NvmlSession, WmiSession
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_wmi_session_opens_one_connection_per_namespace():
+    wmi = FakeWmi()
+    session = WmiSession(wmi)
+    for _ in range(50):
+        session.query('Sensor', namespace="root/OpenHardwareMonitor")
+        session.wql("SELECT Identifier, Value FROM Sensor", namespace="root/OpenHardwareMonitor")
+        session.query('Win32_Processor')
+    assert wmi.calls['WMI'] == 2
+    assert wmi.calls[("root/OpenHardwareMonitor", 'Sensor')] == 50
+    assert wmi.calls[("root/OpenHardwareMonitor", 'query', 'Sensor')] == 50
+    session.close()
+
+
+def test_nvml_session_initializes_once():
+    nvml = FakeNvml()
+    session = NvmlSession(nvml)
+    for _ in range(50):
+        session.call('nvmlDeviceGetTemperature', 0, nvml.NVML_TEMPERATURE_GPU)
+        session.call('nvmlDeviceGetName', 0)
+    assert nvml.calls['nvmlInit'] == 1
+    assert nvml.calls['nvmlDeviceGetHandleByIndex'] == 1
+    assert nvml.calls['nvmlDeviceGetTemperature'] == 50
+    session.close()
+    assert nvml.calls['nvmlShutdown'] == 1
+
+
+def test_nvml_session_reconnects_after_gpu_is_lost():
+    nvml = FakeNvml()
+    clock = FakeClock()
+    session = NvmlSession(nvml, retry_delay=5.0, clock=clock)
+    session.call('nvmlDeviceGetName', 0)
+    nvml.fail_next = nvml.NVML_ERROR_GPU_IS_LOST
+    try:
+        session.call('nvmlDeviceGetName', 0)
+    except nvml.NVMLError:
+        pass
+    else:
+        raise AssertionError("se esperaba NVMLError")
+    # Dentro del retraso no se reintenta nvmlInit
+    clock.now = 1.0
+    try:
+        session.call('nvmlDeviceGetName', 0)
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("se esperaba ConnectionError")
+    assert nvml.calls['nvmlInit'] == 1
+    clock.now = 10.0
+    assert session.call('nvmlDeviceGetName', 0) == nvml.gpus[0].name
+    assert nvml.calls['nvmlInit'] == 2
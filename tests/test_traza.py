@@ -0,0 +1,90 @@
+import ctypes
+import gc
+import json
+import os
+import tracemalloc
+
+import pytest
+
+from rendimiento.__main__ import main
+from rendimiento.colectores import DEFAULT_COLLECTORS, Backends, Resources, build_collectors
+from rendimiento.falsos import FakePsutil
+from rendimiento.traza import TraceRecorder, TraceRef, TraceReplayer
+
+
+class Library:
+    # Como pynvml: cada llamada regresa un apuntador de ctypes nuevo
+
+    def handle(self, index):
+        return ctypes.pointer(ctypes.c_int(index))
+
+    def name(self, handle):
+        return f'gpu{handle.contents.value}'
+
+
+def record(recorder, lib, ticks):
+    for _ in range(ticks):
+        lib.name(lib.handle(0))
+
+
+def test_recorder_memory_stays_flat(tmp_path):
+    recorder = TraceRecorder(os.path.join(tmp_path, 'sesion.rtr'))
+    lib = recorder.proxy('lib', Library)
+    record(recorder, lib, 1000)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    record(recorder, lib, 5000)
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    recorder.close()
+    # Sólo queda la referencia de los objetos vivos
+    assert len(recorder._refs) <= 1
+    assert after - before < 64 * 1024
+
+
+def test_refs_replay_as_arguments(tmp_path):
+    path = os.path.join(tmp_path, 'sesion.rtr')
+    recorder = TraceRecorder(path)
+    lib = recorder.proxy('lib', Library)
+    handles = [lib.handle(index) for index in range(3)]
+    names = [lib.name(handle) for handle in handles]
+    recorder.close()
+
+    replayer = TraceReplayer(path)
+    lib = replayer.proxy('lib')
+    handles = [lib.handle(index) for index in range(3)]
+    assert all(isinstance(handle, TraceRef) for handle in handles)
+    assert [lib.name(handle) for handle in handles] == names
+    replayer.close()
+
+
+def test_gui_trace_replays_through_the_cli(tmp_path):
+    # La interfaz graba con su propia meta; replay usa los valores de collect
+    # para lo que falte
+    path = os.path.join(tmp_path, 'sesion.rtr')
+    output = os.path.join(tmp_path, 'registros.jsonl')
+    fake = FakePsutil(num_processes=50, churn=1)
+    recorder = TraceRecorder(path, meta={'source': 'gui'}, wall_clock=lambda: 1000.0 + fake.clock())
+    resources = Resources(backends=recorder.backends(Backends(psutil_module=fake, clock=fake.clock)))
+    resources.prime(DEFAULT_COLLECTORS)
+    collectors = resources.backends.collectors(build_collectors(DEFAULT_COLLECTORS, 1, resources))
+    for _ in range(6):
+        fake.advance()
+        for collector in collectors:
+            collector.func()
+    resources.close()
+    recorder.close()
+
+    main(['replay', path, '--format', 'jsonl', '-o', output])
+    with open(output, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == 5
+    assert all(set(DEFAULT_COLLECTORS) <= record.keys() for record in records)
+
+
+def test_collect_exits_with_an_error_when_the_output_fails():
+    # /dev/full responde ENOSPC a cada escritura
+    with pytest.raises(SystemExit, match='no se pudo escribir la salida'):
+        main(['collect', '-c', 'cpu', '-i', '0.05', '-d', '5', '--line-buffered', '-o', '/dev/full'])